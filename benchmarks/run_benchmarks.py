@@ -0,0 +1,256 @@
+"""
+Benchmark suite for geometry generation, SVG export and plot planning.
+
+Sweeps sol11 line spacing, canvas size and frame count (plus the christmas
+tree), and for each case measures:
+- generation time (best of several repeats) and peak Python memory
+- SVG export time and output file size
+- planning time (polyline joining and ordering) and simulated plot time
+- host-side streaming time: the planned polylines sent through the streaming
+  executor to an OfflinePlotter and its FakeEBB, with every simulated delay
+  turned off, so only host work is timed
+
+Everything runs offline; no plotter is needed. Results are written as JSON,
+and compared against a saved baseline when one exists:
+
+    python benchmarks/run_benchmarks.py                   # run, compare to baseline
+    python benchmarks/run_benchmarks.py --save-baseline   # run, store as new baseline
+    python benchmarks/run_benchmarks.py --quick           # small sweep
+
+The exit status is 1 when any metric regresses by more than the threshold.
+"""
+
+import argparse
+from collections.abc import Callable
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "msnextdraw"))
+
+from fakeplotter import OfflinePlotter  # noqa: E402
+from ordering import optimize_polylines  # noqa: E402
+from paths import MIN_GAP_INCHES, build_polylines  # noqa: E402
+from pipeline import centered_offset, estimate, plan_drawing  # noqa: E402
+from simulate import MachineConfig, simulate_polylines  # noqa: E402
+from sol11 import LINE_STYLE, Sol11Drawing  # noqa: E402
+from streaming import stream_polylines  # noqa: E402
+from svgstream import SVGStreamWriter  # noqa: E402
+from tree import (  # noqa: E402
+    ChristmasTree,
+    generate_christmas_tree_paths,
+    generate_christmas_tree_svg,
+)
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS = os.path.join(BENCH_DIR, "results.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+# Metrics where larger is worse, compared against the baseline
+TIMED_METRICS = ("generate_s", "export_s", "plan_s", "stream_s")
+SIZE_METRICS = ("peak_memory_bytes", "svg_bytes", "simulated_plot_ms")
+
+
+def best_time(fn: Callable[[], object], repeats: int) -> float:
+    """Best wall-clock time of fn over repeats, in seconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(fn: Callable[[], object]) -> int:
+    """Peak traced Python memory while running fn, in bytes."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def stream_time(polylines: list[np.ndarray], units: int, repeats: int) -> float:
+    """Best host-side time to stream polylines to an OfflinePlotter with no simulated delays."""
+
+    def stream():
+        nd = OfflinePlotter(call_latency=0.0, vertex_latency=0.0)
+        nd.options.units = units
+        nd.connect()
+        stream_polylines(nd, polylines)
+
+    return best_time(stream, repeats)
+
+
+def bench_sol11(size_inches: float, spacing_mm: float, frames: int, repeats: int) -> dict:
+    """Benchmark one sol11 case; canvas units are mm, as in the svg and plotter modes."""
+    size_mm = size_inches * 25.4
+    drawing = Sol11Drawing(width=size_mm, height=size_mm, line_spacing=spacing_mm)
+
+    def generate():
+        for frame in range(frames):
+            drawing.set_frame(frame)
+            drawing.get_all_lines_array()
+
+    result = {
+        "size_inches": size_inches,
+        "spacing_mm": spacing_mm,
+        "frames": frames,
+        "generate_s": best_time(generate, repeats),
+        "peak_memory_bytes": peak_memory(generate),
+    }
+
+    drawing.set_frame(0)
+    lines = np.concatenate([drawing.get_quadrant_dividers_array(), drawing.get_all_lines_array()])
+    result["lines_per_frame"] = len(lines)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sol11.svg")
+
+        def export():
+            # One layer per frame, as written by the frames --frames-as-layers mode
+            with SVGStreamWriter(path, size_mm, size_mm, units="mm") as svg:
+                for frame in range(frames):
+                    drawing.set_frame(frame)
+                    with svg.layer(f"frame {frame}", **LINE_STYLE):
+                        svg.write_segments(drawing.get_quadrant_dividers_array())
+                        svg.write_segments(drawing.get_all_lines_array())
+
+        result["export_s"] = best_time(export, repeats)
+        result["svg_bytes"] = os.path.getsize(path)
+
+    planned = {}
+
+    def plan():
+        polylines = build_polylines(lines, MIN_GAP_INCHES * 25.4)
+        planned["polylines"], _ = optimize_polylines(polylines)
+
+    result["plan_s"] = best_time(plan, max(1, repeats // 2))
+    estimate = simulate_polylines(planned["polylines"], MachineConfig(units=2))
+    result["simulated_plot_ms"] = estimate.time_ms
+    result["lifts"] = estimate.lift_count
+    result["stream_s"] = stream_time(planned["polylines"], 2, repeats)
+    return result
+
+
+def bench_tree(repeats: int) -> dict:
+    """Benchmark the christmas tree generator and SVG export."""
+    result = {
+        "generate_s": best_time(generate_christmas_tree_paths, repeats),
+        "peak_memory_bytes": peak_memory(generate_christmas_tree_paths),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tree.svg")
+        with open(os.devnull, "w") as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                result["export_s"] = best_time(lambda: generate_christmas_tree_svg(path), repeats)
+            finally:
+                sys.stdout = stdout
+        result["svg_bytes"] = os.path.getsize(path)
+
+    # Planned as the pipeline plots it: scaled from px to mm and centered on the page
+    drawing = ChristmasTree()
+    offset = centered_offset(drawing)
+    planned = plan_drawing(drawing, offset, split_layers=False)
+    result["simulated_plot_ms"] = estimate(planned, offset=offset).time_ms
+    polylines = [p for layer in planned for p in layer.polylines]
+    result["stream_s"] = stream_time(polylines, 2, repeats)
+    return result
+
+
+def run_suite(quick: bool, repeats: int) -> dict[str, dict]:
+    """Run every case; returns {case name: metrics}."""
+    sizes = (6.0,) if quick else (6.0, 11.0)
+    spacings = (10.0, 2.0) if quick else (10.0, 2.0, 0.5)
+    frame_counts = (1, 10) if quick else (1, 30)
+
+    results = {}
+    for size, spacing, frames in itertools.product(sizes, spacings, frame_counts):
+        name = f"sol11/size={size:g}in/spacing={spacing:g}mm/frames={frames}"
+        print(f"  {name}", flush=True)
+        results[name] = bench_sol11(size, spacing, frames, repeats)
+    print("  tree", flush=True)
+    results["tree"] = bench_tree(repeats)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """List metrics that are more than threshold (a fraction) worse than the baseline."""
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in TIMED_METRICS + SIZE_METRICS:
+            new, old = metrics.get(metric), base.get(metric)
+            if new is None or not old:
+                continue
+            change = new / old - 1
+            if change > threshold:
+                regressions.append(f"{name} {metric}: {old:.4g} -> {new:.4g} (+{change:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Offline benchmarks for msnextdraw geometry, SVG export and planning"
+    )
+    parser.add_argument("--quick", action="store_true", help="Run a small sweep")
+    parser.add_argument("--repeats", type=int, default=3, help="Timing repeats (default: 3)")
+    parser.add_argument("--output", default=DEFAULT_RESULTS, help="Results JSON path")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON path")
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Store these results as the new baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Fractional slowdown that counts as a regression (default: 0.25)",
+    )
+    args = parser.parse_args()
+
+    print("Running benchmarks...")
+    results = run_suite(args.quick, args.repeats)
+    document = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"Results saved to: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"Baseline saved to: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against (use --save-baseline to create one)")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) against {args.baseline}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+import pytest
+
+# run_benchmarks puts src/msnextdraw on the path, so its imports are reused here
+from run_benchmarks import ChristmasTree, bench_tree, centered_offset, estimate, plan_drawing
+
+
+def test_tree_estimate_matches_the_pipeline():
+    result = bench_tree(repeats=1)
+    drawing = ChristmasTree()
+    offset = centered_offset(drawing)
+    expected = estimate(plan_drawing(drawing, offset, split_layers=False), offset=offset)
+    assert result["simulated_plot_ms"] == pytest.approx(expected.time_ms, rel=0.01)
+    # The tree is about 10 x 13 cm: well under a minute to plot, not hours
+    assert 10_000 < result["simulated_plot_ms"] < 60_000
@@ -0,0 +1,80 @@
+"""
+Bounded least-recently-used cache for generated geometry.
+
+Like functools.lru_cache, but keyed explicitly, shareable between objects, and
+with its hit/miss counters exposed so callers can report them.
+"""
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from typing import Any, NamedTuple
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.hits} hits, {self.misses} misses ({self.hit_rate:.0%} hit rate), "
+            f"{self.currsize}/{self.maxsize} entries"
+        )
+
+
+def combine_info(infos: Iterable[CacheInfo]) -> CacheInfo:
+    """Total counters and sizes of several caches, e.g. one per worker process."""
+    total = CacheInfo(0, 0, 0, 0)
+    for info in infos:
+        total = CacheInfo(*(a + b for a, b in zip(total, info, strict=True)))
+    return total
+
+
+class LRUCache:
+    """Map keys to computed values, evicting the least recently used beyond maxsize."""
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            value = compute()
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return value
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def info(self) -> CacheInfo:
+        """Current counters and size."""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,94 @@
+"""
+Checkpoint journal for resumable plotting.
+
+While a job plots, the journal records how many draw commands (one per
+polyline, in plotting order) have completed, rewriting a small JSON file every
+few commands and once more when the plot stops, finished or not. Plans are
+deterministic, so a resumed run regenerates the same commands, checks them
+against the journal's job fingerprint, and skips the ones already drawn.
+
+The file is replaced atomically, so an interruption while it is being written
+leaves the previous checkpoint in place.
+"""
+
+from collections.abc import Iterable
+from contextlib import suppress
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+DEFAULT_CHECKPOINT_PATH = "plot_checkpoint.json"
+DEFAULT_CHECKPOINT_INTERVAL = 50
+
+
+def job_fingerprint(polylines: Iterable[np.ndarray], offset: tuple[float, float]) -> str:
+    """Hash of the exact commands of a job, in plotting order."""
+    digest = hashlib.sha256()
+    digest.update(np.asarray(offset, dtype=np.float64).tobytes())
+    for polyline in polylines:
+        points = np.ascontiguousarray(polyline, dtype=np.float64)
+        digest.update(len(points).to_bytes(8, "little"))
+        digest.update(points.tobytes())
+    return digest.hexdigest()
+
+
+@dataclass
+class Checkpoint:
+    """Progress of one job: completed of total commands."""
+
+    job: str
+    completed: int
+    total: int
+    updated: float = 0.0
+
+
+class CheckpointJournal:
+    """Record completed commands to a file, at most once per interval commands."""
+
+    def __init__(
+        self,
+        path: str,
+        job: str,
+        total: int,
+        interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+        completed: int = 0,
+    ):
+        if interval < 1:
+            raise ValueError("checkpoint interval must be at least 1")
+        self.path = path
+        self.interval = interval
+        self.checkpoint = Checkpoint(job, completed, total)
+        self._written = completed
+
+    @staticmethod
+    def load(path: str) -> Checkpoint | None:
+        """The checkpoint stored at path, or None when there is none."""
+        try:
+            with open(path) as f:
+                return Checkpoint(**json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def record(self, completed: int):
+        """Note that the first completed commands are drawn; writes every interval."""
+        self.checkpoint.completed = completed
+        if completed - self._written >= self.interval:
+            self.flush()
+
+    def flush(self):
+        """Write the current checkpoint now."""
+        self.checkpoint.updated = time.time()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(asdict(self.checkpoint), f)
+        os.replace(tmp_path, self.path)
+        self._written = self.checkpoint.completed
+
+    def finish(self):
+        """The job is done; remove the journal."""
+        with suppress(FileNotFoundError):
+            os.remove(self.path)
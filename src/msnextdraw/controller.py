@@ -0,0 +1,195 @@
+"""
+asyncio front end for an interactive NextDraw session.
+
+The interactive API blocks its caller for the whole plot. PlotterController
+runs the session (connect, moveto/lineto, the streaming draw_path loop,
+disconnect) on one dedicated worker thread and exposes it to an event loop:
+draw_paths batches are awaitable, progress is published as events, and a
+batch can be cancelled between two draw_path calls, leaving the pen up. The
+loop stays free meanwhile, for example to generate the next job:
+
+    async with PlotterController(offline=True) as plotter:
+        job = asyncio.create_task(plotter.draw_paths(polylines, offset))
+        next_polylines = await asyncio.to_thread(build_next_job)
+        stats = await job
+
+Another task can follow progress with `async for event in plotter.events()`.
+Batches run one at a time, in the order they were started.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import threading
+
+import numpy as np
+
+from pipeline import connect_plotter
+from streaming import StreamStats, stream_polylines
+
+# Progress events kept for a slow consumer; older ones are dropped first
+EVENT_QUEUE_SIZE = 1000
+
+
+@dataclass
+class ProgressEvent:
+    """Progress of one draw_paths batch, after a draw_path call returned (or at the end)."""
+
+    job: int
+    paths: int
+    total_paths: int
+    segments: int
+    total_segments: int
+    done: bool = False
+    cancelled: bool = False
+
+    def __str__(self) -> str:
+        state = " (cancelled)" if self.cancelled else " (done)" if self.done else ""
+        return (
+            f"Job {self.job}: {self.paths}/{self.total_paths} paths, "
+            f"{self.segments}/{self.total_segments} lines{state}"
+        )
+
+
+class PlotCancelled(Exception):
+    """A batch stopped by PlotterController.cancel(), after paths draw_path calls."""
+
+    def __init__(self, job: int, paths: int):
+        super().__init__(f"Job {job} cancelled after {paths} paths")
+        self.job = job
+        self.paths = paths
+
+
+class PlotterController:
+    """Own a NextDraw session on a worker thread and drive it from asyncio."""
+
+    def __init__(self, offline: bool = False):
+        self.offline = offline
+        self.nd = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._events: asyncio.Queue[ProgressEvent] | None = None
+        self._active: dict[int, threading.Event] = {}
+        self._jobs = 0
+
+    async def __aenter__(self) -> "PlotterController":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        """Connect to the plotter (or the offline stand-in) on the worker thread."""
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nextdraw")
+        self._events = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self.nd = await self._run(connect_plotter, self.offline)
+        if self.nd is None:
+            self._executor.shutdown()
+            self._executor = None
+            raise RuntimeError("Could not connect to NextDraw plotter")
+
+    async def close(self):
+        """Cancel running batches, return home and disconnect."""
+        if self._executor is None:
+            return
+        self.cancel()
+        nd = self.nd
+
+        def finish():
+            nd.moveto(0, 0)
+            nd.disconnect()
+
+        try:
+            await self._run(finish)
+        finally:
+            self._executor.shutdown()
+            self._executor = None
+            self.nd = None
+
+    async def _run(self, fn, *args):
+        """Run fn(*args) on the worker thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def call(self, method: str, *args):
+        """Call any session method, such as moveto, penup or usb_query, on the worker thread."""
+        self._require_session()
+        return await self._run(getattr(self.nd, method), *args)
+
+    async def draw_paths(
+        self, polylines: Sequence[np.ndarray], offset: tuple[float, float] = (0.0, 0.0)
+    ) -> StreamStats:
+        """
+        Draw polylines, one draw_path each, through the streaming executor.
+
+        Cancelling the awaiting task, or calling cancel(), stops the batch
+        after the draw_path in progress; the first re-raises CancelledError
+        once the worker is idle, the second raises PlotCancelled.
+        """
+        self._require_session()
+        loop = asyncio.get_running_loop()
+        self._jobs += 1
+        job = self._jobs
+        cancel = threading.Event()
+        self._active[job] = cancel
+        segments = np.cumsum([0] + [len(p) - 1 for p in polylines]).tolist()
+        total_paths, total_segments = len(polylines), segments[-1]
+
+        def on_command(paths: int):
+            loop.call_soon_threadsafe(
+                self._publish,
+                ProgressEvent(job, paths, total_paths, segments[paths], total_segments),
+            )
+            if cancel.is_set():
+                raise PlotCancelled(job, paths)
+
+        def work() -> StreamStats:
+            if cancel.is_set():
+                raise PlotCancelled(job, 0)
+            return stream_polylines(self.nd, polylines, offset, on_command=on_command)
+
+        def publish_end(paths: int, cancelled: bool):
+            self._publish(
+                ProgressEvent(
+                    job, paths, total_paths, segments[paths], total_segments, True, cancelled
+                )
+            )
+
+        future = loop.run_in_executor(self._executor, work)
+        try:
+            stats = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Let the worker stop before the task ends, so the next batch starts idle
+            cancel.set()
+            try:
+                stats = await future
+                publish_end(stats.paths, cancelled=False)
+            except PlotCancelled as exc:
+                publish_end(exc.paths, cancelled=True)
+            raise
+        except PlotCancelled as exc:
+            publish_end(exc.paths, cancelled=True)
+            raise
+        finally:
+            del self._active[job]
+        publish_end(stats.paths, cancelled=False)
+        return stats
+
+    def cancel(self):
+        """Stop every running or waiting batch after its current draw_path call."""
+        for event in self._active.values():
+            event.set()
+
+    async def events(self) -> AsyncIterator[ProgressEvent]:
+        """Progress events as they are published."""
+        while True:
+            yield await self._events.get()
+
+    def _publish(self, event: ProgressEvent):
+        if self._events.full():
+            self._events.get_nowait()
+        self._events.put_nowait(event)
+
+    def _require_session(self):
+        if self.nd is None:
+            raise RuntimeError("PlotterController is not started")
@@ -0,0 +1,139 @@
+"""
+Common interface for drawing generators, and a registry to look them up by name.
+
+A generator is anything with a canvas size, a canvas unit and a layers() method
+returning Layer objects, each holding polylines as (K, 2) float64 arrays. The
+shared pipeline (see pipeline.py: joining, ordering, SVG export, simulation and
+plotting) only ever sees that interface, so it serves every generator.
+
+Generators are registered under a name. The built-in ones are sol11 and tree;
+other packages can add theirs through the "msnextdraw.drawings" entry point
+group, for example in their pyproject.toml:
+
+    [project.entry-points."msnextdraw.drawings"]
+    spiral = "my_package.spiral:SpiralDrawing"
+
+The entry point must load a callable (usually the class) that accepts keyword
+parameters and returns a Drawing.
+"""
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+import importlib
+from importlib.metadata import entry_points
+from typing import Protocol, runtime_checkable
+
+import numpy as np
+
+ENTRY_POINT_GROUP = "msnextdraw.drawings"
+
+# Canvas units understood by the pipeline, in mm per unit (px at 96 per inch)
+MM_PER_UNIT = {"mm": 1.0, "cm": 10.0, "in": 25.4, "px": 25.4 / 96}
+
+
+@dataclass
+class Layer:
+    """
+    One pen's worth of geometry.
+
+    paths is a sequence of (K, 2) polylines: a list of arrays, or a single
+    (N, K, 2) array when every polyline has K vertices. style holds the SVG
+    attributes of the layer, e.g. {"stroke": "black", "fill": "none"}.
+
+    A layer may also carry curves, (3n + 1, 2) cubic Bezier control points
+    per path, which SVG export writes instead of the polylines. Planning,
+    simulation and plotting always use the polylines.
+    """
+
+    name: str
+    paths: Sequence[np.ndarray] = field(default_factory=list)
+    style: dict = field(default_factory=dict)
+    curves: Sequence[np.ndarray] | None = None
+
+    @classmethod
+    def from_segments(cls, name: str, segments: np.ndarray, style: dict | None = None) -> "Layer":
+        """Wrap an (N, 4) segment array as N two-vertex polylines, without copying."""
+        segments = np.asarray(segments, dtype=np.float64).reshape(-1, 2, 2)
+        return cls(name, segments, dict(style or {}))
+
+    @property
+    def segments(self) -> np.ndarray | None:
+        """The paths as an (N, 4) array when they are all single segments, else None."""
+        if isinstance(self.paths, np.ndarray) and self.paths.shape[1:] == (2, 2):
+            return self.paths.reshape(-1, 4)
+        return None
+
+    @property
+    def segment_count(self) -> int:
+        """Number of straight segments across every path."""
+        return sum(max(len(p) - 1, 0) for p in self.paths)
+
+
+@runtime_checkable
+class Drawing(Protocol):
+    """What every drawing generator provides."""
+
+    width: float
+    height: float
+    units: str  # a key of MM_PER_UNIT
+
+    def layers(self) -> list[Layer]:
+        """The drawing's geometry, one Layer per pen."""
+        ...
+
+
+_BUILTIN_DRAWINGS = {
+    "sol11": "sol11:sol11_drawing",
+    "tree": "tree:ChristmasTree",
+}
+_registry: dict[str, Callable[..., Drawing]] = {}
+
+
+def register_drawing(name: str, factory: Callable[..., Drawing] | None = None):
+    """
+    Register a drawing factory under name.
+
+    Usable directly, register_drawing("spiral", SpiralDrawing), or as a class
+    decorator, @register_drawing("spiral").
+    """
+
+    def decorator(f: Callable[..., Drawing]) -> Callable[..., Drawing]:
+        _registry[name] = f
+        return f
+
+    return decorator(factory) if factory is not None else decorator
+
+
+def _load(target: str) -> Callable[..., Drawing]:
+    module_name, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _discover() -> dict[str, object]:
+    """Name -> "module:attr" target or entry point, for built-in and installed drawings."""
+    found: dict[str, object] = dict(_BUILTIN_DRAWINGS)
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        found.setdefault(ep.name, ep)
+    return found
+
+
+def available_drawings() -> list[str]:
+    """Names of every registered, built-in or installed drawing."""
+    return sorted(set(_registry) | set(_discover()))
+
+
+def get_drawing_factory(name: str) -> Callable[..., Drawing]:
+    """Look up (and on first use, import) the factory registered under name."""
+    if name not in _registry:
+        source = _discover().get(name)
+        if source is None:
+            raise KeyError(
+                f"Unknown drawing {name!r}; available: {', '.join(available_drawings())}"
+            )
+        _registry[name] = _load(source) if isinstance(source, str) else source.load()
+    return _registry[name]
+
+
+def create_drawing(name: str, **params) -> Drawing:
+    """Create the drawing registered under name with the given parameters."""
+    return get_drawing_factory(name)(**params)
@@ -0,0 +1,432 @@
+"""
+Offline stand-ins for the NextDraw interactive API and the EBB behind it.
+
+FakeEBB models the EiBotBoard motion controller at the level of its serial
+command set: the commands sent through `usb_command` and `usb_query` (V, QS,
+CS, SM, XM, HM, SP, EM, QM, ...) are parsed, answered as the firmware would,
+and recorded with timestamps. Each command costs a configurable round-trip
+latency, and motion commands go through a FIFO of configurable depth: a move
+is accepted as soon as there is room behind the one executing, and the host
+blocks, as it would on the real link, while the FIFO is full.
+
+OfflinePlotter accepts the same interactive-mode calls as `nextdraw.NextDraw`
+(`interactive`, `connect`, `moveto`, `lineto`, `draw_path`, `usb_command`,
+`usb_query`, `disconnect`), sleeps for a configurable per-call and per-vertex
+latency to mimic the host-side work, records every call, and drives its FakeEBB
+with the pen and step commands each call turns into, timed by the lookahead
+planner (motion.py). Together they let plotting code run, and its host-side
+throughput be measured and regression-tested, with no plotter attached.
+
+    nd = OfflinePlotter(ebb=FakeEBB(command_latency=0.001, fifo_depth=2))
+    nd.interactive()
+    nd.connect()
+    nd.draw_path([(10, 10), (20, 10), (20, 20)])
+    print(nd.usb_query("QS"), nd.ebb.stats)
+"""
+
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import math
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from motion import plan_polyline
+from simulate import UNITS_PER_INCH, MachineConfig
+
+FIRMWARE_VERSION = "EBBv13_and_above EB Firmware Version 3.0.2"
+
+
+@dataclass
+class EBBCommand:
+    """One recorded command: host time sent (s), the command line, and the reply."""
+
+    time: float
+    command: str
+    response: str
+
+
+@dataclass
+class EBBStats:
+    """Counters for a FakeEBB session."""
+
+    commands: int = 0
+    moves: int = 0
+    steps: int = 0
+    motion_time: float = 0.0  # total duration of the queued moves, s
+    blocked_time: float = 0.0  # time the host waited on a full FIFO, s
+    max_fifo: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.commands} commands, {self.moves} moves ({self.steps} steps, "
+            f"{self.motion_time:.2f}s of motion), blocked {self.blocked_time:.2f}s, "
+            f"FIFO peak {self.max_fifo}"
+        )
+
+
+@dataclass
+class _Move:
+    """A queued move: when it starts and ends (host clock), and its motor steps."""
+
+    start: float
+    end: float
+    steps1: int
+    steps2: int
+
+
+class FakeEBB:
+    """In-process model of an EBB: command parsing, latency, motion FIFO and step position."""
+
+    def __init__(
+        self,
+        command_latency: float = 0.001,
+        fifo_depth: int = 1,
+        time_scale: float = 1.0,
+        clock: Callable[[], float] = time.perf_counter,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        command_latency is the serial round trip per command (s); fifo_depth is
+        how many moves can wait behind the one executing; time_scale multiplies
+        every simulated delay (0 runs as fast as the host can send).
+        """
+        if fifo_depth < 0:
+            raise ValueError("fifo_depth must not be negative")
+        self.command_latency = command_latency
+        self.fifo_depth = fifo_depth
+        self.time_scale = time_scale
+        self.clock = clock
+        self.sleep = sleep
+        self.log: list[EBBCommand] = []
+        self.stats = EBBStats()
+        self.pen_up = True
+        self.motors_enabled = False
+        self._moves: deque[_Move] = deque()
+        self._position = [0, 0]  # motor steps of the moves already finished
+        self._handlers = {
+            "V": self._version,
+            "QS": self._query_steps,
+            "CS": self._clear_steps,
+            "SM": self._stepper_move,
+            "XM": self._mixed_move,
+            "HM": self._home_move,
+            "SP": self._set_pen,
+            "TP": self._toggle_pen,
+            "QP": self._query_pen,
+            "EM": self._enable_motors,
+            "QE": self._query_enable,
+            "QM": self._query_motors,
+            "QB": lambda args: "0",
+            "ES": self._stop,
+            "R": self._reset,
+            "SC": lambda args: "",
+            "SR": lambda args: "",
+        }
+
+    # Host side ----------------------------------------------------------
+
+    def command(self, line: str) -> str:
+        """Send one command line; returns the reply without the trailing OK."""
+        name, *args = line.strip().split(",")
+        handler = self._handlers.get(name.upper())
+        if handler is None:
+            raise ValueError(f"!8 Err: Unknown command '{name}'")
+        if self.command_latency > 0 and self.time_scale > 0:
+            self.sleep(self.command_latency * self.time_scale)
+        response = handler(args)
+        self.stats.commands += 1
+        self.log.append(EBBCommand(self.clock(), line, response))
+        return response
+
+    def wait_idle(self):
+        """Block until every queued move has finished."""
+        if self._moves:
+            self._wait_until(self._moves[-1].end)
+        self._retire(self.clock())
+
+    @property
+    def fifo_count(self) -> int:
+        """Moves executing or waiting, now."""
+        self._retire(self.clock())
+        return len(self._moves)
+
+    def step_position(self) -> tuple[int, int]:
+        """Motor step position now, interpolating the move in progress."""
+        now = self.clock()
+        self._retire(now)
+        steps1, steps2 = self._position
+        if self._moves and (move := self._moves[0]).start < now:
+            fraction = (now - move.start) / (move.end - move.start)
+            steps1 += int(move.steps1 * fraction)
+            steps2 += int(move.steps2 * fraction)
+        return steps1, steps2
+
+    # Motion FIFO ----------------------------------------------------------
+
+    def _retire(self, now: float):
+        """Drop finished moves from the FIFO, adding their steps to the position."""
+        while self._moves and self._moves[0].end <= now:
+            move = self._moves.popleft()
+            self._position[0] += move.steps1
+            self._position[1] += move.steps2
+
+    def _wait_until(self, deadline: float):
+        now = self.clock()
+        if deadline > now:
+            self.sleep(deadline - now)
+            self.stats.blocked_time += deadline - now
+
+    def _queue_move(self, duration_ms: int, steps1: int, steps2: int):
+        """Queue a move, blocking while the FIFO is full."""
+        if duration_ms < 1:
+            raise ValueError("!8 Err: duration must be at least 1 ms")
+        self._retire(self.clock())
+        if len(self._moves) > self.fifo_depth:
+            self._wait_until(self._moves[0].end)
+            self._retire(self.clock())
+        now = self.clock()
+        start = max(now, self._moves[-1].end) if self._moves else now
+        self._moves.append(
+            _Move(start, start + duration_ms / 1000 * self.time_scale, steps1, steps2)
+        )
+        self.stats.moves += 1
+        self.stats.steps += max(abs(steps1), abs(steps2))
+        self.stats.motion_time += duration_ms / 1000
+        self.stats.max_fifo = max(self.stats.max_fifo, len(self._moves))
+
+    # Command handlers -----------------------------------------------------
+
+    def _version(self, args) -> str:
+        return FIRMWARE_VERSION
+
+    def _query_steps(self, args) -> str:
+        return "{},{}".format(*self.step_position())
+
+    def _clear_steps(self, args) -> str:
+        self.wait_idle()
+        self._position = [0, 0]
+        return ""
+
+    def _stepper_move(self, args) -> str:
+        duration = int(args[0])
+        steps1 = int(args[1])
+        steps2 = int(args[2]) if len(args) > 2 else 0
+        self._queue_move(duration, steps1, steps2)
+        return ""
+
+    def _mixed_move(self, args) -> str:
+        duration, axis_a, axis_b = (int(a) for a in args[:3])
+        self._queue_move(duration, axis_a + axis_b, axis_a - axis_b)
+        return ""
+
+    def _home_move(self, args) -> str:
+        rate = int(args[0])
+        target = (int(args[1]), int(args[2])) if len(args) > 2 else (0, 0)
+        self.wait_idle()
+        steps1 = target[0] - self._position[0]
+        steps2 = target[1] - self._position[1]
+        if steps1 or steps2:
+            duration = max(1, math.ceil(1000 * max(abs(steps1), abs(steps2)) / rate))
+            self._queue_move(duration, steps1, steps2)
+        return ""
+
+    def _set_pen(self, args) -> str:
+        # Pen moves are queued behind the motion, as on the board
+        if len(args) > 1 and int(args[1]) > 0:
+            self._queue_move(int(args[1]), 0, 0)
+        self.pen_up = args[0] == "1"
+        return ""
+
+    def _toggle_pen(self, args) -> str:
+        return self._set_pen(["0" if self.pen_up else "1", *args])
+
+    def _query_pen(self, args) -> str:
+        return "1" if self.pen_up else "0"
+
+    def _enable_motors(self, args) -> str:
+        self.motors_enabled = any(int(a) for a in args)
+        return ""
+
+    def _query_enable(self, args) -> str:
+        state = "16" if self.motors_enabled else "0"
+        return f"QE,{state},{state}"
+
+    def _query_motors(self, args) -> str:
+        count = self.fifo_count
+        moving = int(count > 0)
+        return f"QM,{moving},{moving},{moving},{int(count > 1)}"
+
+    def _stop(self, args) -> str:
+        """Emergency stop: drop queued moves, keeping the steps already taken."""
+        interrupted = len(self._moves)
+        self._position = list(self.step_position())
+        self._moves.clear()
+        return f"{interrupted},0,0,0,0"
+
+    def _reset(self, args) -> str:
+        self._moves.clear()
+        self._position = [0, 0]
+        self.pen_up = True
+        self.motors_enabled = False
+        return ""
+
+
+@dataclass
+class OfflinePlotter:
+    """In-process double for an interactive-mode NextDraw."""
+
+    # Simulated blocking time per API call, and per vertex sent, in seconds
+    call_latency: float = 0.002
+    vertex_latency: float = 0.0002
+
+    # Whether connect() succeeds
+    available: bool = True
+
+    options: SimpleNamespace = field(
+        default_factory=lambda: SimpleNamespace(
+            units=0, speed_pendown=25, speed_penup=75, accel=75, pen_pos_up=60, pen_pos_down=40
+        )
+    )
+    # The board the calls are translated for; by default it adds no latency of its own
+    ebb: FakeEBB = field(default_factory=lambda: FakeEBB(command_latency=0.0, time_scale=0.0))
+
+    commands: list[tuple] = field(default_factory=list)
+    connected: bool = False
+    pen_up: bool = True
+    x: float = 0.0
+    y: float = 0.0
+
+    def _send(self, *command, vertices: int = 1):
+        """Record a command and block as the serial link would."""
+        self.commands.append(command)
+        delay = self.call_latency + self.vertex_latency * vertices
+        if delay > 0:
+            time.sleep(delay)
+
+    def interactive(self):
+        """Enter interactive mode (no-op)."""
+
+    def connect(self) -> bool:
+        """Open the simulated connection."""
+        self.connected = self.available
+        if self.connected:
+            # Like the interactive API, take wherever the carriage is as home
+            self.x = self.y = 0.0
+            self.pen_up = True
+            self.ebb.command("EM,1,1")
+        return self.connected
+
+    def disconnect(self):
+        """Close the simulated connection."""
+        self.connected = False
+
+    def _require_connection(self):
+        """Fail the way an unconnected session would."""
+        if not self.connected:
+            raise ConnectionError("OfflinePlotter is not connected")
+
+    # EBB translation ------------------------------------------------------
+
+    def _machine(self) -> MachineConfig:
+        options = self.options
+        return MachineConfig(
+            speed_pendown=options.speed_pendown,
+            speed_penup=options.speed_penup,
+            accel=options.accel,
+            units=options.units,
+        )
+
+    def _ebb_pen(self, up: bool):
+        if up != self.ebb.pen_up:
+            self.ebb.command("SP,1" if up else "SP,0")
+
+    def _ebb_moves(self, points: list, pen_up: bool):
+        """Step moves from the current position through points, timed by the lookahead planner."""
+        config = self._machine()
+        steps_per_unit = config.step_scale / UNITS_PER_INCH[self.options.units]
+        # Absolute step targets, so rounding never accumulates
+        targets = np.rint(np.array([(self.x, self.y), *points]) * steps_per_unit).astype(np.int64)
+        moved = np.concatenate([[True], np.any(np.diff(targets, axis=0) != 0, axis=1)])
+        targets = targets[moved]
+        if len(targets) < 2:
+            return
+        plan = plan_polyline(targets / steps_per_unit, config, pen_up)
+        durations = np.maximum(1, np.ceil(plan.durations * 1000)).astype(np.int64).tolist()
+        for (dx, dy), duration in zip(np.diff(targets, axis=0).tolist(), durations, strict=True):
+            self.ebb.command(f"SM,{duration},{dx + dy},{dx - dy}")
+
+    # Interactive API --------------------------------------------------------
+
+    def penup(self):
+        """Raise the pen."""
+        self._require_connection()
+        self._send("penup")
+        self._ebb_pen(True)
+        self.pen_up = True
+
+    def pendown(self):
+        """Lower the pen."""
+        self._require_connection()
+        self._send("pendown")
+        self._ebb_pen(False)
+        self.pen_up = False
+
+    def moveto(self, x: float, y: float):
+        """Absolute pen-up move."""
+        self._require_connection()
+        self._send("moveto", x, y)
+        self._ebb_pen(True)
+        self._ebb_moves([(x, y)], pen_up=True)
+        self.pen_up = True
+        self.x, self.y = x, y
+
+    def lineto(self, x: float, y: float):
+        """Absolute pen-down move."""
+        self._require_connection()
+        self._send("lineto", x, y)
+        self._ebb_pen(False)
+        self._ebb_moves([(x, y)], pen_up=False)
+        self.pen_up = False
+        self.x, self.y = x, y
+
+    def draw_path(self, vertex_list: list):
+        """Pen-up move to the first vertex, then draw through the rest."""
+        self._require_connection()
+        if len(vertex_list) < 2:
+            return
+        self._send("draw_path", vertex_list, vertices=len(vertex_list))
+        self._ebb_pen(True)
+        self._ebb_moves(vertex_list[:1], pen_up=True)
+        self.x, self.y = vertex_list[0]
+        self._ebb_pen(False)
+        self._ebb_moves(vertex_list[1:], pen_up=False)
+        self._ebb_pen(True)
+        self.pen_up = True
+        self.x, self.y = vertex_list[-1]
+
+    def usb_command(self, command: str):
+        """Send a raw EBB command."""
+        self._require_connection()
+        self._send("usb_command", command)
+        self.ebb.command(command)
+
+    def usb_query(self, query: str) -> str:
+        """Send a raw EBB query and return its reply."""
+        self._require_connection()
+        self._send("usb_query", query)
+        return self.ebb.command(query)
+
+    def current_pos(self) -> tuple[float, float]:
+        """Last commanded position."""
+        return self.x, self.y
+
+    def turtle_pos(self) -> tuple[float, float]:
+        """Last commanded turtle position (same as current_pos offline)."""
+        return self.x, self.y
+
+    def call_count(self, name: str) -> int:
+        """Number of recorded calls with the given name."""
+        return sum(1 for command in self.commands if command[0] == name)
@@ -0,0 +1,210 @@
+"""
+Lookahead motion planner for polylines.
+
+simulate.py times every move as rest-to-rest, which is right for pen-up
+travel but makes a densely sampled curve such as the tree sine crawl: each of
+its hundreds of short, nearly collinear segments would accelerate from zero
+and brake back to zero. This planner profiles a whole pen-down polyline at
+once:
+
+- each vertex gets a junction speed limit from the turn angle, the
+  junction deviation model used by grbl-style firmware: the speed at which
+  a circular arc, staying within junction_deviation of the corner, can be
+  taken at the acceleration limit. Straight-through vertices are limited by
+  the cruise speed only; reversals stop.
+- a backward pass lowers each vertex speed so the rest of the path can still
+  brake in time (ending at rest), and a forward pass lowers it to what can be
+  reached from the previous vertex (starting at rest).
+- each move then gets a trapezoid (or triangle) profile between its entry and
+  exit speeds: accelerate, cruise, decelerate.
+
+Speeds and accelerations come from MachineConfig (speed_pendown,
+speed_penup, accel); moves shorter than half a motor step (step_scale, from
+native_res_factor) are merged into the next one. The result is a MotionPlan:
+the move list with entry, peak and exit speeds and durations, consumed by the
+time estimator (simulate_polylines with lookahead=True), the offline
+plotter's EBB stand-in and the step plan compiler (stepplan.py).
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from simulate import MachineConfig
+
+
+@dataclass
+class Move:
+    """One straight move, in input units, with its speeds (in/s) and duration (s)."""
+
+    start: tuple[float, float]
+    end: tuple[float, float]
+    entry_speed: float
+    peak_speed: float
+    exit_speed: float
+    duration: float
+    pen_up: bool = False
+
+
+@dataclass
+class MotionPlan:
+    """Velocity profile of one polyline, drawn from rest to rest."""
+
+    points: np.ndarray  # (N + 1, 2) vertices, in input units
+    lengths: np.ndarray  # (N,) move lengths, inches
+    entry: np.ndarray  # (N,) entry speeds, in/s
+    peak: np.ndarray  # (N,) highest speeds, in/s
+    exit: np.ndarray  # (N,) exit speeds, in/s
+    durations: np.ndarray  # (N,) seconds
+    pen_up: bool = False
+
+    @property
+    def time(self) -> float:
+        """Total duration, seconds."""
+        return float(self.durations.sum())
+
+    @property
+    def distance(self) -> float:
+        """Total length, inches."""
+        return float(self.lengths.sum())
+
+    def moves(self) -> list[Move]:
+        """The plan as a move list."""
+        points = self.points.tolist()
+        return [
+            Move(tuple(points[i]), tuple(points[i + 1]), *values, self.pen_up)
+            for i, values in enumerate(
+                zip(
+                    self.entry.tolist(),
+                    self.peak.tolist(),
+                    self.exit.tolist(),
+                    self.durations.tolist(),
+                    strict=True,
+                )
+            )
+        ]
+
+
+def junction_speeds(
+    directions: np.ndarray, speed: float, accel: float, deviation: float
+) -> np.ndarray:
+    """
+    Speed limits (in/s) at the N - 1 inner vertices between N unit directions.
+
+    Junction deviation: a turn through angle theta may be taken at
+    v^2 = accel * deviation * s / (1 - s), with s = sin((pi - theta) / 2).
+    """
+    cos_turn = np.einsum("ij,ij->i", directions[:-1], directions[1:])
+    sin_half = np.sqrt(np.clip((1 + cos_turn) / 2, 0.0, 1.0))
+    with np.errstate(divide="ignore"):
+        limit = np.sqrt(accel * deviation * sin_half / (1 - sin_half))
+    return np.minimum(np.nan_to_num(limit, nan=speed, posinf=speed), speed)
+
+
+def profile_times(
+    lengths: np.ndarray, entry: np.ndarray, leave: np.ndarray, speed: float, accel: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Peak speeds and durations of trapezoid moves between entry and leave (exit) speeds."""
+    peak = np.minimum(speed, np.sqrt((2 * accel * lengths + entry**2 + leave**2) / 2))
+    peak = np.maximum(peak, np.maximum(entry, leave))
+    ramp_up = (peak**2 - entry**2) / (2 * accel)
+    ramp_down = (peak**2 - leave**2) / (2 * accel)
+    cruise = np.maximum(lengths - ramp_up - ramp_down, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cruise_time = np.where(peak > 0, cruise / peak, 0.0)
+    return peak, (peak - entry) / accel + (peak - leave) / accel + cruise_time
+
+
+def _merge_short_moves(points: np.ndarray, min_length: float) -> np.ndarray:
+    """Drop vertices closer than min_length to the previous kept one; the last one stays."""
+    if len(points) < 2:
+        return points
+    if np.hypot(*np.diff(points, axis=0).T).min() >= min_length:
+        return points
+    kept = [points[0]]
+    for point in points[1:]:
+        if np.hypot(*(point - kept[-1])) >= min_length:
+            kept.append(point)
+    if len(kept) > 1:
+        kept[-1] = points[-1]
+    elif np.any(points[-1] != points[0]):
+        kept.append(points[-1])
+    return np.array(kept)
+
+
+def plan_polyline(points: np.ndarray, config: "MachineConfig", pen_up: bool = False) -> MotionPlan:
+    """
+    Lookahead profile of a polyline (coordinates in config.units), from rest to rest.
+
+    Pen-down polylines use the pen-down speed and acceleration, pen-up ones
+    (travel with intermediate waypoints) the pen-up limits.
+    """
+    scale = 1 / config.units_per_inch
+    points = _merge_short_moves(
+        np.asarray(points, dtype=np.float64).reshape(-1, 2),
+        0.5 / (config.step_scale * scale),
+    )
+    speed, accel = (
+        (config.penup_speed, config.penup_accel)
+        if pen_up
+        else (config.pendown_speed, config.pendown_accel)
+    )
+
+    delta = np.diff(points, axis=0) * scale
+    lengths = np.hypot(delta[:, 0], delta[:, 1])
+    count = len(lengths)
+    if count == 0:
+        empty = np.zeros(0)
+        return MotionPlan(points, empty, empty, empty, empty, empty, pen_up)
+
+    # Vertex speeds: rest at both ends, junction limits inside
+    vertex = np.zeros(count + 1)
+    vertex[1:-1] = junction_speeds(
+        delta / lengths[:, None], speed, accel, config.junction_deviation
+    )
+    vertex = vertex.tolist()
+    reach = (2 * accel * lengths).tolist()
+
+    # Backward pass: every vertex slow enough to brake for the next one
+    for i in range(count - 1, 0, -1):
+        limit = (vertex[i + 1] ** 2 + reach[i]) ** 0.5
+        if vertex[i] > limit:
+            vertex[i] = limit
+    # Forward pass: every vertex reachable from the previous one
+    for i in range(1, count):
+        limit = (vertex[i - 1] ** 2 + reach[i - 1]) ** 0.5
+        if vertex[i] > limit:
+            vertex[i] = limit
+
+    vertex = np.asarray(vertex)
+    entry, leave = vertex[:-1], vertex[1:]
+    peak, durations = profile_times(lengths, entry, leave, speed, accel)
+    return MotionPlan(points, lengths, entry, peak, leave, durations, pen_up)
+
+
+def plan_polylines(
+    polylines: Sequence[np.ndarray],
+    config: "MachineConfig",
+    origin: tuple[float, float] = (0.0, 0.0),
+    return_home: bool = True,
+) -> list[MotionPlan]:
+    """
+    Plans for plotting polylines in order: pen-up travel to each, then its pen-down profile.
+
+    Coordinates are in config.units, in machine coordinates (origin is home).
+    """
+    plans = []
+    position = np.asarray(origin, dtype=np.float64)
+    for polyline in polylines:
+        polyline = np.asarray(polyline, dtype=np.float64).reshape(-1, 2)
+        if len(polyline) < 2:
+            continue
+        plans.append(plan_polyline(np.vstack([position, polyline[0]]), config, pen_up=True))
+        plans.append(plan_polyline(polyline, config))
+        position = polyline[-1]
+    if return_home and plans:
+        plans.append(plan_polyline(np.vstack([position, origin]), config, pen_up=True))
+    return plans
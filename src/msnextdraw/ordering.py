@@ -0,0 +1,293 @@
+"""
+Pen-up travel minimization for plotter jobs.
+
+Paths are reordered, and reversed where that helps, so that the pen spends as
+little time as possible travelling in the raised position between them:
+
+1. A greedy nearest-neighbor pass, driven by a uniform grid spatial index over
+   path endpoints, picks the closest remaining endpoint from the current pen
+   position at each step.
+2. A 2-opt refinement then reverses runs of paths (flipping each one) while that
+   shortens the total pen-up travel. Runs are at most TWO_OPT_WINDOW paths
+   long, so a pass costs O(n * window) rather than O(n^2); the greedy order
+   already keeps neighbouring paths close together, where nearly all of the
+   gains are.
+
+Only the start and end point of each path matter, so the same planner serves
+plain (x1, y1, x2, y2) segments and longer polylines.
+"""
+
+from dataclasses import dataclass
+import math
+
+import numpy as np
+
+# Longest run of paths a 2-opt move may reverse
+TWO_OPT_WINDOW = 1000
+
+
+@dataclass
+class OrderingStats:
+    """Pen-up travel before and after reordering, in drawing units."""
+
+    path_count: int
+    travel_before: float
+    travel_after: float
+
+    @property
+    def saved_fraction(self) -> float:
+        """Fraction of the original pen-up travel that was removed."""
+        if self.travel_before == 0:
+            return 0.0
+        return 1.0 - self.travel_after / self.travel_before
+
+    def __str__(self) -> str:
+        return (
+            f"Pen-up travel: {self.travel_before:.1f} -> {self.travel_after:.1f} "
+            f"({self.saved_fraction:.0%} saved over {self.path_count} paths)"
+        )
+
+
+class _EndpointGrid:
+    """Uniform grid of path endpoints supporting nearest-unvisited queries."""
+
+    def __init__(self, points: np.ndarray):
+        self.points = points
+        lo = points.min(axis=0)
+        extent = points.max(axis=0) - lo
+        # Aim for a couple of endpoints per cell
+        area = max(float(extent[0] * extent[1]), 1e-12)
+        cell = math.sqrt(2 * area / len(points))
+        self.cell = max(cell, float(extent.max()) / 1024, 1e-9)
+        self.origin = lo
+
+        self.cells: dict[tuple[int, int], list[int]] = {}
+        keys = np.floor((points - lo) / self.cell).astype(np.int64)
+        for idx, (kx, ky) in enumerate(keys.tolist()):
+            self.cells.setdefault((kx, ky), []).append(idx)
+        self.max_key = keys.max(axis=0).tolist()
+
+    def nearest(self, x: float, y: float, alive: np.ndarray) -> int:
+        """Return the index of the nearest point whose owning path is still alive."""
+        cx = math.floor((x - self.origin[0]) / self.cell)
+        cy = math.floor((y - self.origin[1]) / self.cell)
+        # Rings closer than the grid's bounding cells, or further than its
+        # far corner, cannot hold any point
+        kx, ky = self.max_key
+        min_ring = max(0, -cx, cx - kx, -cy, cy - ky)
+        max_ring = max(abs(cx), abs(cx - kx), abs(cy), abs(cy - ky))
+        points = self.points
+        best = -1
+        best_d = math.inf
+
+        for r in range(min_ring, max_ring + 1):
+            # Every point in ring r is at least (r - 1) cells away from the query
+            if best >= 0 and (r - 1) * self.cell > best_d:
+                break
+            for key in self._ring(cx, cy, r):
+                bucket = self.cells.get(key)
+                if not bucket:
+                    continue
+                # Drop endpoints of visited paths while scanning
+                bucket[:] = [i for i in bucket if alive[i >> 1]]
+                for i in bucket:
+                    d = math.hypot(points[i, 0] - x, points[i, 1] - y)
+                    if d < best_d:
+                        best_d = d
+                        best = i
+        return best
+
+    def _ring(self, cx: int, cy: int, r: int):
+        """Yield the occupied-range cell keys at Chebyshev distance r from (cx, cy)."""
+        if r == 0:
+            yield (cx, cy)
+            return
+        kx, ky = self.max_key
+        x_lo, x_hi = max(cx - r, 0), min(cx + r, kx)
+        for y in (cy - r, cy + r):
+            if 0 <= y <= ky:
+                for x in range(x_lo, x_hi + 1):
+                    yield (x, y)
+        y_lo, y_hi = max(cy - r + 1, 0), min(cy + r - 1, ky)
+        for x in (cx - r, cx + r):
+            if 0 <= x <= kx:
+                for y in range(y_lo, y_hi + 1):
+                    yield (x, y)
+
+
+def travel_distance(
+    starts: np.ndarray, ends: np.ndarray, origin: tuple[float, float] = (0.0, 0.0)
+) -> float:
+    """
+    Total pen-up travel for paths drawn in the given order.
+
+    Includes the move from origin to the first path and the return to origin
+    after the last one.
+    """
+    if len(starts) == 0:
+        return 0.0
+    o = np.asarray(origin, dtype=np.float64)
+    link_from = np.vstack([o, ends])
+    link_to = np.vstack([starts, o])
+    return float(np.hypot(*(link_to - link_from).T).sum())
+
+
+def _greedy_order(
+    starts: np.ndarray, ends: np.ndarray, origin: tuple[float, float]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Nearest-neighbor ordering; returns (order, flipped)."""
+    n = len(starts)
+    # Endpoint 2*i is the start of path i, 2*i + 1 is its end
+    points = np.empty((2 * n, 2), dtype=np.float64)
+    points[0::2] = starts
+    points[1::2] = ends
+    grid = _EndpointGrid(points)
+
+    alive = np.ones(n, dtype=bool)
+    order = np.empty(n, dtype=np.int64)
+    flipped = np.zeros(n, dtype=bool)
+    x, y = origin
+    for k in range(n):
+        i = grid.nearest(x, y, alive)
+        path = i >> 1
+        alive[path] = False
+        order[k] = path
+        # Entering at the end point means drawing the path backwards
+        flipped[k] = bool(i & 1)
+        x, y = points[i ^ 1]
+    return order, flipped
+
+
+def _two_opt(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    order: np.ndarray,
+    flipped: np.ndarray,
+    origin: tuple[float, float],
+    max_passes: int,
+    window: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Improve an ordering by reversing runs of paths.
+
+    Link k joins the end of path k - 1 (or the origin) to the start of path k
+    (or the origin, for k == n). Reversing paths a..c-1 replaces links a and c
+    with end-to-end and start-to-start links; the links inside the run keep
+    their length because every path in it is flipped as well. Runs are at
+    most window paths long.
+    """
+    n = len(order)
+    o = np.asarray(origin, dtype=np.float64)
+    s = np.where(flipped[:, None], ends[order], starts[order])
+    e = np.where(flipped[:, None], starts[order], ends[order])
+    link_from = np.vstack([o, e])  # link_from[k]: end of path k - 1
+    link_to = np.vstack([s, o])  # link_to[k]: start of path k
+
+    for _ in range(max_passes):
+        improved = False
+        for a in range(n):
+            c = np.arange(a + 1, min(a + window, n) + 1)
+            current = np.hypot(*(link_to[a] - link_from[a])) + np.hypot(
+                *(link_to[c] - link_from[c]).T
+            )
+            candidate = np.hypot(*(link_from[c] - link_from[a]).T) + np.hypot(
+                *(link_to[c] - link_to[a]).T
+            )
+            gain = current - candidate
+            best = int(np.argmax(gain))
+            if gain[best] <= 1e-9:
+                continue
+            c = a + 1 + best
+            order[a:c] = order[a:c][::-1]
+            flipped[a:c] = ~flipped[a:c][::-1]
+            run_starts = link_to[a:c].copy()
+            link_to[a:c] = link_from[a + 1 : c + 1][::-1]
+            link_from[a + 1 : c + 1] = run_starts[::-1]
+            improved = True
+        if not improved:
+            break
+    return order, flipped
+
+
+def order_paths(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    origin: tuple[float, float] = (0.0, 0.0),
+    two_opt: bool = True,
+    max_passes: int = 4,
+    window: int = TWO_OPT_WINDOW,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Choose a drawing order for paths given their (N, 2) start and end points.
+
+    Returns (order, flipped): path order[k] is drawn k-th, reversed if flipped[k].
+    The 2-opt pass reverses runs of at most window paths, which bounds its cost
+    at O(N * window) per pass.
+    """
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+    if len(starts) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=bool)
+
+    order, flipped = _greedy_order(starts, ends, origin)
+    if two_opt and len(order) > 1:
+        order, flipped = _two_opt(starts, ends, order, flipped, origin, max_passes, window)
+
+    # Input that is already well ordered (say, by vpype linesort) is kept as is
+    # rather than replaced by a longer heuristic tour
+    flip = flipped[:, None]
+    new_starts = np.where(flip, ends[order], starts[order])
+    new_ends = np.where(flip, starts[order], ends[order])
+    if travel_distance(new_starts, new_ends, origin) > travel_distance(starts, ends, origin):
+        return np.arange(len(starts)), np.zeros(len(starts), dtype=bool)
+    return order, flipped
+
+
+def optimize_segments(
+    segments: np.ndarray,
+    origin: tuple[float, float] = (0.0, 0.0),
+    two_opt: bool = True,
+    max_passes: int = 4,
+) -> tuple[np.ndarray, OrderingStats]:
+    """
+    Reorder and flip (x1, y1, x2, y2) segments to minimize pen-up travel.
+
+    Returns the reordered (N, 4) array and the before/after travel statistics.
+    """
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    before = travel_distance(segments[:, :2], segments[:, 2:], origin)
+
+    order, flipped = order_paths(segments[:, :2], segments[:, 2:], origin, two_opt, max_passes)
+    result = segments[order]
+    result[flipped] = result[flipped][:, [2, 3, 0, 1]]
+
+    after = travel_distance(result[:, :2], result[:, 2:], origin)
+    return result, OrderingStats(len(segments), before, after)
+
+
+def optimize_polylines(
+    polylines: list[np.ndarray],
+    origin: tuple[float, float] = (0.0, 0.0),
+    two_opt: bool = True,
+    max_passes: int = 4,
+) -> tuple[list[np.ndarray], OrderingStats]:
+    """
+    Reorder and reverse (K, 2) polylines to minimize pen-up travel.
+
+    Returns the reordered polylines and the before/after travel statistics.
+    """
+    if not polylines:
+        return [], OrderingStats(0, 0.0, 0.0)
+    starts = np.array([p[0] for p in polylines], dtype=np.float64)
+    ends = np.array([p[-1] for p in polylines], dtype=np.float64)
+    before = travel_distance(starts, ends, origin)
+
+    order, flipped = order_paths(starts, ends, origin, two_opt, max_passes)
+    result = [
+        polylines[i][::-1] if f else polylines[i] for i, f in zip(order, flipped, strict=True)
+    ]
+
+    after = travel_distance(
+        np.array([p[0] for p in result]), np.array([p[-1] for p in result]), origin
+    )
+    return result, OrderingStats(len(polylines), before, after)
@@ -0,0 +1,309 @@
+"""
+Geometry passes that turn loose (x1, y1, x2, y2) segments into polylines.
+
+Plotting a polyline costs one pen lift and one `draw_path` call, however many
+vertices it has, so joining segments before plotting cuts pen lifts, servo
+delays and serial round trips:
+
+- merge_collinear joins segments that lie on the same line and touch or
+  overlap, such as the horizontal lines of two side-by-side sol11 quadrants.
+- chain_polylines links segments that share an endpoint into polylines.
+- simplify_polyline (Douglas-Peucker) drops vertices that stay within a
+  tolerance of the simplified line, for densely sampled curves.
+- quantize_polylines snaps polylines to the motor step grid and drops the
+  moves, polylines and duplicates that no longer move the pen.
+
+The joining passes treat points closer than a tolerance as coincident, in the
+same spirit as the NextDraw `min_gap` option (0.006 inch by default).
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+import math
+
+import numpy as np
+
+# NextDraw default min_gap, in inches
+MIN_GAP_INCHES = 0.006
+
+
+def merge_collinear(
+    segments: np.ndarray,
+    tolerance: float,
+    angle_tolerance: float = 1e-6,
+    offset_tolerance: float | None = None,
+) -> np.ndarray:
+    """
+    Join collinear segments that touch or overlap within tolerance.
+
+    Segments are grouped by direction (within angle_tolerance radians), then
+    into lines: each line takes the perpendicular offset of its first segment,
+    and only segments within offset_tolerance of that offset join it. Gaps
+    along a line up to tolerance are closed, but separate parallel lines are
+    never fused, however close together they are drawn. offset_tolerance
+    defaults to tolerance / 100, which absorbs floating-point noise only.
+    Returns a new (M, 4) array with M <= N.
+    """
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    if len(segments) == 0:
+        return segments.copy()
+    if offset_tolerance is None:
+        offset_tolerance = tolerance / 100
+
+    d = segments[:, 2:] - segments[:, :2]
+    length = np.hypot(d[:, 0], d[:, 1])
+    degenerate = length <= 1e-12
+    # Direction angle folded into [0, pi), so reversed segments share a line
+    angle = np.mod(np.arctan2(d[:, 1], d[:, 0]), np.pi)
+    angle[np.isclose(angle, np.pi)] = 0.0
+    u = np.column_stack([np.cos(angle), np.sin(angle)])
+    offset = segments[:, 1] * u[:, 0] - segments[:, 0] * u[:, 1]
+    t1 = np.einsum("ij,ij->i", segments[:, :2], u)
+    t2 = np.einsum("ij,ij->i", segments[:, 2:], u)
+
+    directions: dict[int, list[int]] = defaultdict(list)
+    angle_keys = np.round(angle / angle_tolerance).astype(np.int64)
+    for i in np.flatnonzero(~degenerate).tolist():
+        directions[angle_keys[i]].append(i)
+
+    # Split each direction into lines, sweeping by offset. Membership is measured
+    # against the line's own offset, not the previous segment's, so a stack of
+    # closely spaced parallel lines cannot chain into one
+    groups: list[list[int]] = []
+    for members in directions.values():
+        idx = np.asarray(members)
+        line_offset = None
+        for i in idx[np.argsort(offset[idx], kind="stable")].tolist():
+            if line_offset is None or offset[i] - line_offset > offset_tolerance:
+                line_offset = offset[i]
+                groups.append([])
+            groups[-1].append(i)
+
+    merged = [segments[degenerate]]
+    for members in groups:
+        idx = np.asarray(members)
+        # Orient every segment along +u; keep the original endpoint coordinates
+        forward = t1[idx] <= t2[idx]
+        lo_t = np.where(forward, t1[idx], t2[idx])
+        hi_t = np.where(forward, t2[idx], t1[idx])
+        lo_p = np.where(forward[:, None], segments[idx, :2], segments[idx, 2:])
+        hi_p = np.where(forward[:, None], segments[idx, 2:], segments[idx, :2])
+
+        by_start = np.argsort(lo_t, kind="stable")
+        runs = []
+        end_t = hi_t[by_start[0]]
+        start_p, end_p = lo_p[by_start[0]], hi_p[by_start[0]]
+        for k in by_start[1:].tolist():
+            if lo_t[k] <= end_t + tolerance:
+                if hi_t[k] > end_t:
+                    end_t, end_p = hi_t[k], hi_p[k]
+            else:
+                runs.append((*start_p, *end_p))
+                end_t = hi_t[k]
+                start_p, end_p = lo_p[k], hi_p[k]
+        runs.append((*start_p, *end_p))
+        merged.append(np.array(runs, dtype=np.float64))
+
+    return np.concatenate(merged)
+
+
+def _cluster_endpoints(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Label points so that points within tolerance of each other share a label."""
+    parent = list(range(len(points)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    cells: dict[tuple[int, int], list[int]] = defaultdict(list)
+    keys = np.floor(points / tolerance).astype(np.int64).tolist()
+    for i, key in enumerate(keys):
+        cells[tuple(key)].append(i)
+
+    tol_sq = tolerance * tolerance
+    for i, (kx, ky) in enumerate(keys):
+        px, py = points[i]
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for j in cells.get((kx + dx, ky + dy), ()):
+                    if j <= i:
+                        continue
+                    qx, qy = points[j]
+                    if (px - qx) ** 2 + (py - qy) ** 2 <= tol_sq:
+                        ri, rj = find(i), find(j)
+                        if ri != rj:
+                            parent[rj] = ri
+
+    return np.array([find(i) for i in range(len(points))], dtype=np.int64)
+
+
+def chain_polylines(segments: np.ndarray, tolerance: float) -> list[np.ndarray]:
+    """
+    Link segments that share endpoints (within tolerance) into polylines.
+
+    Each walk starts from a dead end or junction where possible and, at every
+    vertex, continues along the unused segment that turns the least, among those
+    starting within tolerance of where the last one ended. Returns a list of
+    (K, 2) vertex arrays; every input segment is drawn exactly once.
+    """
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    n = len(segments)
+    if n == 0:
+        return []
+
+    points = segments.reshape(-1, 2)  # point 2*i starts segment i, 2*i + 1 ends it
+    labels = _cluster_endpoints(points, tolerance)
+
+    incident: dict[int, list[int]] = defaultdict(list)
+    for p, label in enumerate(labels.tolist()):
+        incident[label].append(p)
+
+    used = np.zeros(n, dtype=bool)
+
+    def walk(p: int) -> np.ndarray:
+        """Follow unused segments starting from endpoint p."""
+        vertices = [points[p]]
+        while True:
+            seg = p >> 1
+            used[seg] = True
+            q = p ^ 1  # far end of the segment just drawn
+            vertices.append(points[q])
+            heading = points[q] - points[p]
+            best = -1
+            best_turn = -math.inf
+            for r in incident[labels[q]]:
+                # Clusters are transitive, so only continue from endpoints that
+                # are themselves within tolerance of q
+                if used[r >> 1] or math.dist(points[r], points[q]) > tolerance:
+                    continue
+                direction = points[r ^ 1] - points[r]
+                norm = math.hypot(*heading) * math.hypot(*direction)
+                turn = float(heading @ direction) / norm if norm > 0 else 0.0
+                if turn > best_turn:
+                    best_turn = turn
+                    best = r
+            if best < 0:
+                return np.array(vertices)
+            p = best
+            if not np.array_equal(points[p], points[q]):
+                # Bridge the gap so the next segment is drawn from its own start
+                vertices.append(points[p])
+
+    polylines = []
+    # Open chains first: start from vertices where an odd number of segments meet
+    for members in incident.values():
+        if len(members) % 2 == 1:
+            for p in members:
+                if not used[p >> 1]:
+                    polylines.append(walk(p))
+    # Whatever remains forms closed loops
+    for p in range(2 * n):
+        if not used[p >> 1]:
+            polylines.append(walk(p))
+    return polylines
+
+
+def build_polylines(segments: np.ndarray, tolerance: float) -> list[np.ndarray]:
+    """Merge collinear segments, then chain the result into polylines."""
+    return chain_polylines(merge_collinear(segments, tolerance), tolerance)
+
+
+def point_segment_distance(points: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Distance from each of the (N, 2) points to the segment a-b."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    a = np.asarray(a, dtype=np.float64)
+    ab = np.asarray(b, dtype=np.float64) - a
+    length_sq = float(ab @ ab)
+    ap = points - a
+    if length_sq == 0.0:
+        return np.hypot(ap[:, 0], ap[:, 1])
+    t = np.clip(ap @ ab / length_sq, 0.0, 1.0)
+    d = ap - t[:, None] * ab
+    return np.hypot(d[:, 0], d[:, 1])
+
+
+def simplify_polyline(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Douglas-Peucker simplification of a (K, 2) polyline.
+
+    Keeps the end points, and every vertex needed so that no dropped vertex is
+    further than tolerance from the simplified line.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    n = len(points)
+    if n < 3:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        d = point_segment_distance(points[i + 1 : j], points[i], points[j])
+        k = int(np.argmax(d))
+        if d[k] > tolerance:
+            k += i + 1
+            keep[k] = True
+            stack.append((i, k))
+            stack.append((k, j))
+    return points[keep]
+
+
+@dataclass
+class QuantizeStats:
+    """What snapping to the step grid removed."""
+
+    moves_before: int = 0
+    moves_removed: int = 0
+    polylines_removed: int = 0
+    duplicates_removed: int = 0
+
+    @property
+    def commands_removed(self) -> int:
+        """Moves plus draw_path calls saved."""
+        return self.moves_removed + self.polylines_removed + self.duplicates_removed
+
+    def __str__(self) -> str:
+        return (
+            f"Step grid: {self.moves_removed} of {self.moves_before} moves, "
+            f"{self.polylines_removed} empty and {self.duplicates_removed} duplicate "
+            f"polylines removed"
+        )
+
+
+def quantize_polylines(
+    polylines: list[np.ndarray], step: float
+) -> tuple[list[np.ndarray], QuantizeStats]:
+    """
+    Snap polylines to a grid of the given step (one motor step) and drop what collapses.
+
+    Vertices are rounded as absolute positions, so the rounding error of each
+    move is carried into the next one and never accumulates into drift.
+    Moves that round to no steps are dropped, then polylines left with no
+    move, then polylines that repeat an earlier one (either direction).
+    """
+    stats = QuantizeStats()
+    seen: set[bytes] = set()
+    result = []
+    for polyline in polylines:
+        points = np.asarray(polyline, dtype=np.float64).reshape(-1, 2)
+        grid = np.rint(points / step).astype(np.int64)
+        stats.moves_before += max(len(grid) - 1, 0)
+        moved = np.any(np.diff(grid, axis=0) != 0, axis=1)
+        stats.moves_removed += int(np.count_nonzero(~moved))
+        grid = grid[np.concatenate([[True], moved])]
+        if len(grid) < 2:
+            stats.polylines_removed += 1
+            continue
+        key = grid.tobytes()
+        if key in seen:
+            stats.duplicates_removed += 1
+            stats.moves_removed += len(grid) - 1
+            continue
+        seen.add(key)
+        seen.add(grid[::-1].tobytes())
+        result.append(grid * step)
+    return result, stats
@@ -0,0 +1,598 @@
+"""
+Output pipeline shared by every drawing generator.
+
+Takes any Drawing (see drawing.py) through the same optimized steps:
+- SVG export through the streaming writer, one Inkscape layer per drawing layer
+- planning: joining single segments into polylines, snapping them to the
+  motor step grid, then ordering each layer to minimize pen-up travel
+- plot time estimation with the offline simulator
+- plotting through the streaming draw_path loop, on a NextDraw or the offline
+  stand-in
+- compiling to a step plan file, replayed later by stepplan.py
+
+Plotting and estimation work in mm; drawings in other canvas units are scaled.
+
+Layers are numbered from 1 in drawing order, and exported as "1 - name",
+"2 - name", ... so the NextDraw layers mode can plot them one at a time, and
+--layer picks some of them. A plot is one pen pass over every selected layer,
+ordered as a whole; with --pause-layers, each layer is a pass of its own for
+a pen change, ordered on its own and starting and ending at home.
+
+Plots journal their progress to a checkpoint file (see checkpoint.py); after
+an interruption, the same command with --resume skips what is already drawn.
+
+    python pipeline.py list
+    python pipeline.py tree svg tree.svg
+    python pipeline.py sol11 estimate -p size_inches=11 -p frame_index=30
+    python pipeline.py sol11 plot --offline --pause-layers
+    python pipeline.py tree plot --layer 2
+    python pipeline.py sol11 plot --resume
+    python pipeline.py sol11 compile sol11.ndplan
+    python pipeline.py tree svg tree.svg --vpype "linesimplify --tolerance 0.5mm"
+"""
+
+import argparse
+import ast
+from dataclasses import dataclass, fields, replace
+
+import numpy as np
+
+from checkpoint import (
+    DEFAULT_CHECKPOINT_INTERVAL,
+    DEFAULT_CHECKPOINT_PATH,
+    CheckpointJournal,
+    job_fingerprint,
+)
+from drawing import MM_PER_UNIT, Drawing, Layer, available_drawings, create_drawing
+from fakeplotter import OfflinePlotter
+from ordering import OrderingStats, optimize_polylines
+from paths import MIN_GAP_INCHES, QuantizeStats, build_polylines, quantize_polylines
+from simulate import MachineConfig, SimulationResult, simulate_polylines
+from stepplan import SLICE_MS, compile_plan, write_plan
+from streaming import ProgressReporter, StreamStats, stream_polylines
+from svgstream import SVGStreamWriter
+from vpype_adapter import DEFAULT_PIPELINE, process
+
+# Plotter travel area (11" x 8.5"), mm
+PAGE_SIZE_MM = (11 * 25.4, 8.5 * 25.4)
+
+# Default gap below which line ends are joined: the NextDraw min_gap, mm
+JOIN_TOLERANCE_MM = MIN_GAP_INCHES * 25.4
+
+# NextDraw motor step (high resolution), mm; planned vertices are snapped to it
+STEP_MM = 25.4 / MachineConfig().step_scale
+
+# SVG width/height suffix for each canvas unit; px is the SVG user unit
+_SVG_UNITS = {"mm": "mm", "cm": "cm", "in": "in", "px": ""}
+
+
+class PlotOptionError(Exception):
+    """A layer selection or resume request that does not fit the drawing or checkpoint."""
+
+
+@dataclass
+class PlannedLayer:
+    """A layer's polylines in plotting order, in mm drawing coordinates."""
+
+    name: str
+    polylines: list[np.ndarray]
+    input_paths: int
+    stats: OrderingStats | None = None
+    number: int = 1
+    quantize: QuantizeStats | None = None
+
+    @property
+    def segment_count(self) -> int:
+        return sum(len(p) - 1 for p in self.polylines)
+
+
+def layer_label(number: int, name: str) -> str:
+    """Inkscape label of a layer, numbered for the NextDraw layers mode."""
+    return f"{number} - {name}"
+
+
+def select_layers(layers: list[Layer], selection: list[str] | None) -> list[tuple[int, Layer]]:
+    """(number, layer) pairs picked by 1-based number or name; all of them without a selection."""
+    numbered = list(enumerate(layers, start=1))
+    if not selection:
+        return numbered
+    chosen = [
+        (number, layer)
+        for number, layer in numbered
+        if str(number) in selection or layer.name in selection
+    ]
+    if not chosen:
+        names = ", ".join(layer_label(number, layer.name) for number, layer in numbered)
+        raise PlotOptionError(f"No layer matches {', '.join(selection)}; layers: {names}")
+    return chosen
+
+
+def merge_layers(layers: list[Layer], name: str = "all layers") -> Layer:
+    """One layer holding the paths of several, to plot them in a single pass with one pen."""
+    if len(layers) == 1:
+        return layers[0]
+    segments = [layer.segments for layer in layers]
+    if all(s is not None for s in segments):
+        return Layer.from_segments(name, np.concatenate(segments), layers[0].style)
+    paths = [
+        np.asarray(p, dtype=np.float64).reshape(-1, 2) for layer in layers for p in layer.paths
+    ]
+    return Layer(name, paths, dict(layers[0].style))
+
+
+def _is_closed(points: np.ndarray) -> bool:
+    return len(points) > 2 and np.array_equal(points[0], points[-1])
+
+
+def write_svg(drawing: Drawing, target, precision: int = 3, background: str | None = None):
+    """Export a drawing as SVG, one layer per drawing layer."""
+    with SVGStreamWriter(
+        target,
+        drawing.width,
+        drawing.height,
+        units=_SVG_UNITS[drawing.units],
+        precision=precision,
+        background=background,
+    ) as svg:
+        for number, layer in enumerate(drawing.layers(), start=1):
+            with svg.layer(layer_label(number, layer.name), **layer.style):
+                if layer.curves is not None:
+                    for curve in layer.curves:
+                        svg.write_cubic(curve)
+                    continue
+                segments = layer.segments
+                if segments is not None:
+                    svg.write_segments(segments)
+                    continue
+                for path in layer.paths:
+                    path = np.asarray(path, dtype=np.float64).reshape(-1, 2)
+                    svg.write_polyline(path, closed=_is_closed(path))
+
+
+def layer_polylines(
+    layer: Layer, scale: float = 1.0, join_tolerance: float | None = None
+) -> list[np.ndarray]:
+    """
+    A layer's paths as (K, 2) polylines, multiplied by scale.
+
+    With a join_tolerance, layers made of single segments are joined into
+    longer polylines (see paths.build_polylines).
+    """
+    segments = layer.segments
+    if segments is not None:
+        segments = segments * scale
+        if join_tolerance is not None:
+            return build_polylines(segments, join_tolerance)
+        return list(segments.reshape(-1, 2, 2))
+    return [np.asarray(p, dtype=np.float64).reshape(-1, 2) * scale for p in layer.paths]
+
+
+def centered_offset(
+    drawing: Drawing, page_size: tuple[float, float] = PAGE_SIZE_MM
+) -> tuple[float, float]:
+    """Offset (mm) that centers the drawing in the plotter travel area."""
+    scale = MM_PER_UNIT[drawing.units]
+    return (
+        (page_size[0] - drawing.width * scale) / 2,
+        (page_size[1] - drawing.height * scale) / 2,
+    )
+
+
+def plan_drawing(
+    drawing: Drawing,
+    offset: tuple[float, float] = (0.0, 0.0),
+    join_tolerance: float | None = JOIN_TOLERANCE_MM,
+    optimize: bool = True,
+    layers: list[str] | None = None,
+    step: float | None = STEP_MM,
+    split_layers: bool = True,
+) -> list[PlannedLayer]:
+    """
+    Join, quantize and order the layers of a drawing for plotting, in mm.
+
+    Each layer is ordered on its own, starting and ending at home; offset is
+    where the drawing origin sits in machine coordinates. With a step, vertices
+    are snapped to that motor step grid in machine coordinates, and moves that
+    round away are dropped (see paths.quantize_polylines). layers picks layers
+    by number or name (see select_layers). Without split_layers, the selected
+    layers are merged and planned as one (see merge_layers).
+    """
+    scale = MM_PER_UNIT[drawing.units]
+    home = (-offset[0], -offset[1])
+    selected = select_layers(drawing.layers(), layers)
+    if not split_layers and len(selected) > 1:
+        selected = [(1, merge_layers([layer for _, layer in selected]))]
+    planned = []
+    for number, layer in selected:
+        polylines = layer_polylines(layer, scale, join_tolerance)
+        quantize = None
+        if step is not None:
+            snapped, quantize = quantize_polylines([p + offset for p in polylines], step)
+            polylines = [p - offset for p in snapped]
+        stats = None
+        if optimize:
+            polylines, stats = optimize_polylines(polylines, origin=home)
+        planned.append(
+            PlannedLayer(layer.name, polylines, len(layer.paths), stats, number, quantize)
+        )
+    return planned
+
+
+def report_plan(planned: list[PlannedLayer]):
+    """Print what planning did to each layer."""
+    for layer in planned:
+        label = layer_label(layer.number, layer.name)
+        print(f"{label}: {layer.input_paths} paths -> {len(layer.polylines)} polylines")
+        if layer.quantize is not None and layer.quantize.commands_removed:
+            print(f"  {layer.quantize}")
+        if layer.stats is not None:
+            print(f"  {layer.stats} (mm)")
+
+
+def estimate(
+    planned: list[PlannedLayer],
+    config: MachineConfig | None = None,
+    offset: tuple[float, float] = (0.0, 0.0),
+    lookahead: bool = False,
+) -> SimulationResult:
+    """Simulated plot time for planned layers, each drawn from home and back."""
+    config = replace(config or MachineConfig(), units=2)
+    total = SimulationResult()
+    for layer in planned:
+        result = simulate_polylines(
+            layer.polylines, config, origin=(-offset[0], -offset[1]), lookahead=lookahead
+        )
+        for f in fields(SimulationResult):
+            setattr(total, f.name, getattr(total, f.name) + getattr(result, f.name))
+    return total
+
+
+def connect_plotter(offline: bool = False):
+    """An interactive-mode NextDraw in mm (or the offline stand-in), or None."""
+    if offline:
+        nd = OfflinePlotter()
+    else:
+        from nextdraw import NextDraw
+
+        nd = NextDraw()
+    nd.interactive()
+    nd.options.units = 2  # mm
+    nd.options.speed_pendown = 25
+    nd.options.speed_penup = 75
+
+    if not nd.connect():
+        print("Error: Could not connect to NextDraw plotter")
+        return None
+    return nd
+
+
+def plot_planned(
+    nd,
+    planned: list[PlannedLayer],
+    offset: tuple[float, float] = (0.0, 0.0),
+    pause_between_layers: bool = False,
+    journal: CheckpointJournal | None = None,
+    skip: int = 0,
+) -> StreamStats:
+    """
+    Stream planned layers to a connected plotter, then return home.
+
+    With pause_between_layers, returns home and waits for Enter before each
+    layer after the first, for a pen change. journal records the number of polylines drawn,
+    counted across all layers; skip resumes after that many, moving pen-up to
+    the first polyline not drawn yet.
+    """
+    total = StreamStats()
+    done = skip
+    resuming = skip > 0
+    try:
+        for k, layer in enumerate(planned):
+            if skip >= len(layer.polylines):
+                skip -= len(layer.polylines)
+                continue
+            polylines = layer.polylines[skip:]
+            label = layer_label(layer.number, layer.name)
+            if pause_between_layers and (k or resuming):
+                nd.moveto(0, 0)
+                input(f"Change pen for layer {label}, then press Enter")
+            if len(planned) > 1:
+                print(f"Layer {label}: {len(polylines)} polylines")
+            if skip:
+                print(f"  Resuming at polyline {skip + 1} of {len(layer.polylines)}")
+                x, y = polylines[0][0]
+                nd.moveto(x + offset[0], y + offset[1])
+            stats = stream_polylines(
+                nd,
+                polylines,
+                offset=offset,
+                progress=ProgressReporter(sum(len(p) - 1 for p in polylines)),
+                on_command=journal and (lambda paths, base=done: journal.record(base + paths)),
+            )
+            done += stats.paths
+            skip = 0
+            resuming = False
+            total.paths += stats.paths
+            total.segments += stats.segments
+            total.elapsed += stats.elapsed
+        nd.moveto(0, 0)  # Return to home
+    finally:
+        if journal is not None:
+            journal.flush()
+    return total
+
+
+def plot_drawing(
+    drawing: Drawing,
+    dry_run: bool = False,
+    optimize: bool = True,
+    join_tolerance: float = JOIN_TOLERANCE_MM,
+    offline: bool = False,
+    layers: list[str] | None = None,
+    pause_between_layers: bool = False,
+    resume: bool = False,
+    checkpoint: str | None = DEFAULT_CHECKPOINT_PATH,
+    checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+    step: float | None = STEP_MM,
+    session=None,
+):
+    """
+    Plan a drawing centered on the page, then plot it (or report the estimate).
+
+    The selected layers are plotted as one pass, or with pause_between_layers
+    as one pass per layer with a pen change in between.
+
+    With a session (see session.PlotterSession), the plot runs on its open
+    connection, which stays open afterwards; otherwise a connection is opened
+    for this plot alone.
+
+    While plotting, progress is journaled to the checkpoint file (None turns
+    this off) every checkpoint_interval polylines. With resume, the plan is
+    checked against that journal and plotting continues where it stopped.
+    The journal is removed once the plot completes.
+    """
+    offset = centered_offset(drawing)
+    planned = plan_drawing(
+        drawing, offset, join_tolerance, optimize, layers, step, pause_between_layers
+    )
+    report_plan(planned)
+    polyline_count = sum(len(layer.polylines) for layer in planned)
+
+    if dry_run:
+        print(f"Dry run: would draw {polyline_count} polylines in {len(planned)} layer(s)")
+        print(f"{estimate(planned, offset=offset)} (mm)")
+        print(f"With lookahead: {estimate(planned, offset=offset, lookahead=True)} (mm)")
+        scale = MM_PER_UNIT[drawing.units]
+        print(f"Canvas size: {drawing.width * scale:.1f}mm x {drawing.height * scale:.1f}mm")
+        return
+
+    journal = None
+    skip = 0
+    if checkpoint is not None:
+        job = job_fingerprint((p for layer in planned for p in layer.polylines), offset)
+        if resume:
+            saved = CheckpointJournal.load(checkpoint)
+            if saved is None:
+                raise PlotOptionError(f"No checkpoint to resume from at {checkpoint}")
+            if saved.job != job:
+                raise PlotOptionError(
+                    f"Checkpoint {checkpoint} is for a different plot; "
+                    "use the same drawing, parameters and layers"
+                )
+            skip = saved.completed
+        journal = CheckpointJournal(checkpoint, job, polyline_count, checkpoint_interval, skip)
+    elif resume:
+        raise PlotOptionError("Resuming needs a checkpoint file")
+
+    nd = None
+    if session is None:
+        nd = connect_plotter(offline)
+        if nd is None:
+            return
+    try:
+        if skip:
+            print(f"Resuming after {skip} of {polyline_count} polylines...")
+        else:
+            print(f"Drawing {polyline_count} polylines...")
+        args = (planned, offset, pause_between_layers, journal, skip)
+        stats = plot_planned(nd, *args) if session is None else session.run(plot_planned, *args)
+        print(f"Drawing complete! {stats}")
+        if journal is not None:
+            journal.finish()
+    except BaseException:
+        if journal is not None:
+            completed = journal.checkpoint.completed
+            print(
+                f"Stopped after {completed} of {polyline_count} polylines; continue with --resume"
+            )
+        raise
+    finally:
+        if nd is not None:
+            nd.disconnect()
+
+
+def compile_drawing(
+    drawing: Drawing,
+    output: str,
+    optimize: bool = True,
+    join_tolerance: float = JOIN_TOLERANCE_MM,
+    layers: list[str] | None = None,
+    metadata: dict | None = None,
+    step: float | None = STEP_MM,
+    split_layers: bool = False,
+    slice_ms: int = SLICE_MS,
+):
+    """
+    Plan a drawing centered on the page and save it as a step plan (see stepplan.py).
+
+    The selected layers are compiled as one pass, or with split_layers as one
+    pass per layer, so that replay can pause between them. slice_ms is the
+    length of the SM slices that speed changes are sent as.
+    """
+    offset = centered_offset(drawing)
+    planned = plan_drawing(drawing, offset, join_tolerance, optimize, layers, step, split_layers)
+    report_plan(planned)
+    plan = compile_plan(planned, offset, metadata=metadata, slice_ms=slice_ms)
+    write_plan(plan, output)
+    print(
+        f"Step plan saved to: {output} ({len(plan.records)} commands, "
+        f"{plan.motion_time:.1f}s of motion)"
+    )
+
+
+def _parse_param(text: str) -> tuple[str, object]:
+    """Parse a KEY=VALUE drawing parameter; values are Python literals or strings."""
+    key, sep, value = text.partition("=")
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got {text!r}")
+    try:
+        return key, ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return key, value
+
+
+def add_checkpoint_arguments(parser: argparse.ArgumentParser, scope: str):
+    """The --resume, --checkpoint and --checkpoint-interval options of the plotting CLIs."""
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=f"{scope}: continue an interrupted plot from its checkpoint, "
+        "with the same drawing options",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=DEFAULT_CHECKPOINT_PATH,
+        metavar="PATH",
+        help=f"{scope}: progress journal file (default: {DEFAULT_CHECKPOINT_PATH})",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=int,
+        default=DEFAULT_CHECKPOINT_INTERVAL,
+        metavar="N",
+        help=f"{scope}: save progress every N polylines (default: {DEFAULT_CHECKPOINT_INTERVAL})",
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export, estimate or plot any registered drawing",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python pipeline.py list                        # Available drawings
+  python pipeline.py tree svg tree.svg           # Export to SVG
+  python pipeline.py sol11 estimate -p size_inches=11  # Simulated plot time
+  python pipeline.py tree plot --offline         # Plot to an offline stand-in plotter
+  python pipeline.py sol11 plot --pause-layers   # One pen per layer, pausing between them
+  python pipeline.py sol11 plot --layer vertical # Plot (or re-plot) a single layer
+  python pipeline.py sol11 plot --resume         # Continue an interrupted plot
+  python pipeline.py sol11 compile job.ndplan    # Step plan for stepplan.py to replay
+  python pipeline.py sol11 svg --vpype           # Run vpype's default cleanup first
+        """,
+    )
+    parser.add_argument("drawing", help="Registered drawing name, or 'list'")
+    parser.add_argument(
+        "action", nargs="?", choices=["svg", "estimate", "plot", "compile"], default="svg"
+    )
+    parser.add_argument("output", nargs="?", default=None, help="Output filename (svg, compile)")
+    parser.add_argument(
+        "--param",
+        "-p",
+        type=_parse_param,
+        action="append",
+        default=[],
+        help="Drawing parameter KEY=VALUE, may be repeated",
+    )
+    parser.add_argument(
+        "--vpype",
+        nargs="?",
+        const=DEFAULT_PIPELINE,
+        default=None,
+        metavar="COMMANDS",
+        help="Run vpype commands on the drawing in process first "
+        f"(default when given without COMMANDS: {DEFAULT_PIPELINE!r})",
+    )
+    parser.add_argument(
+        "--no-optimize",
+        action="store_true",
+        help="Keep generation (or vpype linesort) order when plotting",
+    )
+    parser.add_argument(
+        "--no-quantize",
+        action="store_true",
+        help="Keep vertices off the motor step grid, with moves shorter than a step",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="For plot: send commands to an offline stand-in and report throughput",
+    )
+    parser.add_argument(
+        "--layer",
+        action="append",
+        default=None,
+        help="For estimate/plot: only this layer, by number or name; may be repeated",
+    )
+    parser.add_argument(
+        "--pause-layers",
+        action="store_true",
+        help="For plot: plot each layer as its own pass, waiting for Enter (a pen change) "
+        "before each layer after the first; for compile: keep the layers apart for replay",
+    )
+    parser.add_argument(
+        "--slice-ms",
+        type=int,
+        default=SLICE_MS,
+        metavar="MS",
+        help=f"For compile: length of the SM slices speed changes are sent as "
+        f"(default: {SLICE_MS})",
+    )
+    add_checkpoint_arguments(parser, "For plot")
+    args = parser.parse_args()
+
+    if args.drawing == "list":
+        print("\n".join(available_drawings()))
+        return
+
+    drawing = create_drawing(args.drawing, **dict(args.param))
+    if args.vpype:
+        drawing = process(drawing, args.vpype)
+    if args.action == "svg":
+        output = args.output or f"{args.drawing}.svg"
+        write_svg(drawing, output)
+        print(f"SVG saved to: {output}")
+        return
+
+    # Layers are looked up by number or name only once the drawing is planned
+    try:
+        if args.action == "compile":
+            output = args.output or f"{args.drawing}.ndplan"
+            compile_drawing(
+                drawing,
+                output,
+                optimize=not args.no_optimize,
+                layers=args.layer,
+                metadata={"drawing": args.drawing, "params": dict(args.param)},
+                step=None if args.no_quantize else STEP_MM,
+                split_layers=args.pause_layers,
+                slice_ms=args.slice_ms,
+            )
+            return
+        plot_drawing(
+            drawing,
+            dry_run=args.action == "estimate",
+            optimize=not args.no_optimize,
+            offline=args.offline,
+            layers=args.layer,
+            pause_between_layers=args.pause_layers,
+            resume=args.resume,
+            checkpoint=args.checkpoint,
+            checkpoint_interval=args.checkpoint_interval,
+            step=None if args.no_quantize else STEP_MM,
+        )
+    except PlotOptionError as exc:
+        parser.error(str(exc))
+
+
+if __name__ == "__main__":
+    main()
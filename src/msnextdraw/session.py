@@ -0,0 +1,199 @@
+"""
+Long-lived plotter session shared by many jobs.
+
+Each entry point used to run interactive() -> connect() -> work ->
+disconnect() per drawing, paying the USB handshake and servo wake-up every
+time, and failing outright on a dropped link. PlotterSession keeps one
+interactive-mode connection open across jobs:
+
+- jobs run through run() (or plot() for planned layers) on the open
+  connection, one at a time;
+- a connection idle for longer than stale_after is probed (a firmware version
+  query) before the next job, and reopened if it no longer answers;
+- a job that fails on a connection error triggers a reconnect before the
+  error is passed on, so the next job (or a --resume of the same one) starts
+  on a live link;
+- after a reconnect the position is resynchronized: the EBB keeps its step
+  counters while powered, so a carriage left away from home (QS not 0, 0) is
+  sent back with the pen up, and the session reconnects once more so the
+  software position, which connect() takes as home, matches it again.
+
+As a context manager:
+
+    with PlotterSession() as session:
+        for frame in range(10):
+            plot_drawing(sol11_drawing(frame_index=frame), session=session)
+
+The connection is wrapped in a PositionTracker (see tracker.py), so
+session.nd.current_pos() is answered locally, from any thread, while a job
+plots.
+
+As a daemon, start_heartbeat() probes the idle connection on an interval, so
+a stale link is noticed and reopened before a job arrives.
+"""
+
+from contextlib import suppress
+import threading
+import time
+
+from pipeline import connect_plotter, plot_planned
+from tracker import PositionTracker, parse_steps
+
+# What a dropped or unplugged connection raises: serial errors are OSErrors, and
+# the offline stand-in raises ConnectionError (an OSError too). Anything else a
+# job raises is its own bug and leaves the connection alone.
+CONNECTION_ERRORS = (OSError,)
+
+# Step rate for the return home after a reconnect, steps per second
+HOME_RATE = 3200
+
+
+class PlotterSession:
+    """One interactive NextDraw connection, kept open and in sync across jobs."""
+
+    def __init__(
+        self,
+        offline: bool = False,
+        stale_after: float = 30.0,
+        retries: int = 3,
+        retry_delay: float = 1.0,
+        home_rate: int = HOME_RATE,
+        reconcile_interval: float | None = None,
+    ):
+        self.offline = offline
+        self.stale_after = stale_after
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.home_rate = home_rate
+        self.reconcile_interval = reconcile_interval
+        self.nd: PositionTracker | None = None
+        self.jobs = 0
+        self.reconnects = 0
+        self._lock = threading.RLock()
+        self._last_ok = 0.0
+        self._stop = threading.Event()
+        self._heartbeat: threading.Thread | None = None
+
+    def __enter__(self) -> "PlotterSession":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def open(self):
+        """Connect, retrying, and wake the pen servo once for the whole session."""
+        with self._lock:
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    time.sleep(self.retry_delay)
+                nd = connect_plotter(self.offline)
+                if nd is not None:
+                    break
+            else:
+                raise RuntimeError("Could not connect to NextDraw plotter")
+            self.nd = PositionTracker(nd, self.reconcile_interval)
+            self.nd.penup()
+            self._last_ok = time.monotonic()
+
+    def close(self):
+        """Stop the heartbeat, return home and disconnect."""
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+        with self._lock:
+            if self.nd is None:
+                return
+            try:
+                self.nd.moveto(0, 0)
+            finally:
+                self.nd.disconnect()
+                self.nd = None
+
+    def is_alive(self) -> bool:
+        """Whether the board still answers a firmware version query."""
+        try:
+            return bool(self.nd.usb_query("V"))
+        except CONNECTION_ERRORS:
+            return False
+
+    def ensure(self):
+        """Reconnect first if the connection has been idle too long and no longer answers."""
+        with self._lock:
+            if self.nd is None:
+                raise RuntimeError("PlotterSession is not open")
+            idle = time.monotonic() - self._last_ok
+            if idle > self.stale_after and not self.is_alive():
+                self.reconnect()
+
+    def reconnect(self):
+        """Reopen the connection, then resynchronize the position."""
+        with self._lock:
+            with suppress(*CONNECTION_ERRORS):
+                self.nd.disconnect()
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    time.sleep(self.retry_delay)
+                with suppress(*CONNECTION_ERRORS):
+                    if self.nd.connect():
+                        break
+            else:
+                raise RuntimeError("Lost the NextDraw connection and could not reconnect")
+            self.reconnects += 1
+            self.resync()
+            self._last_ok = time.monotonic()
+
+    def resync(self):
+        """Bring the carriage home if the board's step counters say it is elsewhere."""
+        with self._lock:
+            if parse_steps(self.nd.usb_query("QS")) == (0, 0):
+                return
+            self.nd.usb_command("SP,1")
+            self.nd.usb_command(f"HM,{self.home_rate}")
+            # connect() takes the current position as home; now it is
+            self.nd.disconnect()
+            if not self.nd.connect():
+                raise RuntimeError("Could not reconnect to NextDraw plotter after homing")
+
+    def run(self, job, *args, **kwargs):
+        """
+        Run job(nd, *args, **kwargs) on the open connection and return its result.
+
+        A connection error reconnects the session, then is raised again.
+        """
+        with self._lock:
+            self.ensure()
+            try:
+                result = job(self.nd, *args, **kwargs)
+            except CONNECTION_ERRORS:
+                self.reconnect()
+                raise
+            self.jobs += 1
+            self._last_ok = time.monotonic()
+            return result
+
+    def plot(self, planned, offset=(0.0, 0.0), **kwargs):
+        """Plot planned layers (see pipeline.plot_planned) on the open connection."""
+        return self.run(plot_planned, planned, offset, **kwargs)
+
+    def start_heartbeat(self, interval: float = 10.0):
+        """Probe the connection every interval seconds while idle, reconnecting if stale."""
+        self._stop.clear()
+
+        def beat():
+            while not self._stop.wait(interval):
+                if not self._lock.acquire(blocking=False):
+                    continue  # a job is running
+                try:
+                    if self.nd is not None and not self.is_alive():
+                        self.reconnect()
+                    elif self.nd is not None:
+                        self._last_ok = time.monotonic()
+                except (RuntimeError, *CONNECTION_ERRORS) as exc:
+                    print(f"Heartbeat: {exc}")
+                finally:
+                    self._lock.release()
+
+        self._heartbeat = threading.Thread(target=beat, name="nextdraw-heartbeat", daemon=True)
+        self._heartbeat.start()
@@ -0,0 +1,208 @@
+"""
+Offline motion simulator and plot time estimator.
+
+The vendor time estimate (see example/nextdraw/estimate_time.py) only runs on
+an SVG file through plot_setup/plot_run with preview=True. This module estimates
+plot time directly from segment or polyline lists, in process, so layouts and
+orderings can be compared in a tight loop with no hardware or file round trip.
+
+The model:
+- XY moves follow a trapezoidal velocity profile (accelerate, cruise,
+  decelerate) and start and stop at rest at every vertex; with lookahead,
+  pen-down passes keep their speed through gentle corners instead (see
+  motion.py).
+- Pen-down and pen-up moves use their own speed and acceleration limits,
+  scaled from the 1-100 percentages used by the NextDraw options.
+- Each pen lift or drop costs a servo move, whose duration grows with the
+  distance between pen_pos_up and pen_pos_down and shrinks with the pen rate,
+  plus the optional pen_delay_up / pen_delay_down.
+
+Machine constants that are not exposed in config_example.py (peak acceleration
+and servo timing) use typical values for the standard pen-lift servo; the
+results are estimates, meant for comparing jobs with each other.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass, fields
+import runpy
+
+import numpy as np
+
+from motion import plan_polyline
+
+# Distance units, matching nd.options.units: 0 = inches, 1 = cm, 2 = mm
+UNITS_PER_INCH = {0: 1.0, 1: 2.54, 2: 25.4}
+
+
+@dataclass
+class MachineConfig:
+    """Plot parameters, named as in config_example.py."""
+
+    speed_pendown: float = 25  # Maximum plotting speed, pen down (1-100)
+    speed_penup: float = 75  # Maximum transit speed, pen up (1-100)
+    accel: float = 75  # Acceleration rate factor (1-100)
+    pen_pos_up: float = 60  # Height of pen when raised (0-100)
+    pen_pos_down: float = 40  # Height of pen when lowered (0-100)
+    pen_rate_raise: float = 75  # Rate of raising pen (1-100)
+    pen_rate_lower: float = 50  # Rate of lowering pen (1-100)
+    pen_delay_up: float = 0  # Delay after pen is raised (ms)
+    pen_delay_down: float = 0  # Delay after pen is lowered (ms)
+    units: int = 0  # Distance units of the input geometry (0: in, 1: cm, 2: mm)
+
+    # Secondary parameters
+    native_res_factor: float = 1016.0  # Motor resolution factor, steps per inch
+    speed_lim_xy_hr: float = 8.6979  # Max XY speed in high resolution mode, in/s
+    accel_rate_pendown: float = 40.0  # Peak pen-down acceleration at accel=100, in/s^2
+    accel_rate_penup: float = 60.0  # Peak pen-up acceleration at accel=100, in/s^2
+    servo_move_min: float = 45.0  # Minimum time for any pen-lift movement, ms
+    servo_sweep_time: float = 200.0  # Time to sweep the full range at rate 100, ms
+    junction_deviation: float = 0.001  # Corner rounding allowed to the lookahead planner, in
+
+    @classmethod
+    def from_config_file(cls, path: str, **overrides) -> "MachineConfig":
+        """Read matching parameters from a NextDraw config file such as config_example.py."""
+        values = runpy.run_path(path)
+        names = {f.name for f in fields(cls)}
+        kwargs = {k: v for k, v in values.items() if k in names}
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    @property
+    def units_per_inch(self) -> float:
+        """Input distance units per inch."""
+        return UNITS_PER_INCH[self.units]
+
+    @property
+    def step_scale(self) -> float:
+        """XY steps per inch in high resolution mode, the NextDraw default."""
+        return 2 * self.native_res_factor
+
+    @property
+    def pendown_speed(self) -> float:
+        """Pen-down cruise speed, inches per second."""
+        return self.speed_lim_xy_hr * self.speed_pendown / 100
+
+    @property
+    def penup_speed(self) -> float:
+        """Pen-up cruise speed, inches per second."""
+        return self.speed_lim_xy_hr * self.speed_penup / 100
+
+    @property
+    def pendown_accel(self) -> float:
+        """Pen-down acceleration, inches per second squared."""
+        return self.accel_rate_pendown * self.accel / 100
+
+    @property
+    def penup_accel(self) -> float:
+        """Pen-up acceleration, inches per second squared."""
+        return self.accel_rate_penup * self.accel / 100
+
+    def _servo_time(self, rate: float) -> float:
+        """Servo travel time between pen_pos_up and pen_pos_down at the given rate, ms."""
+        travel = abs(self.pen_pos_up - self.pen_pos_down) / 100
+        return max(self.servo_move_min, self.servo_sweep_time * travel * 100 / rate)
+
+    @property
+    def raise_time(self) -> float:
+        """Time to raise the pen, including pen_delay_up, ms."""
+        return self._servo_time(self.pen_rate_raise) + self.pen_delay_up
+
+    @property
+    def lower_time(self) -> float:
+        """Time to lower the pen, including pen_delay_down, ms."""
+        return self._servo_time(self.pen_rate_lower) + self.pen_delay_down
+
+
+@dataclass
+class SimulationResult:
+    """Estimated plot time (ms) and distances (in the input units)."""
+
+    time_ms: float = 0.0
+    pendown_distance: float = 0.0
+    penup_distance: float = 0.0
+    lift_count: int = 0
+    pendown_time_ms: float = 0.0
+    penup_time_ms: float = 0.0
+    servo_time_ms: float = 0.0
+
+    def __str__(self) -> str:
+        total_s = self.time_ms / 1000
+        return (
+            f"Estimated time: {int(total_s // 60)}m {total_s % 60:04.1f}s "
+            f"(pen down {self.pendown_distance:.1f}, pen up {self.penup_distance:.1f}, "
+            f"{self.lift_count} lifts)"
+        )
+
+
+def trapezoid_times(distance: np.ndarray, speed: float, accel: float) -> np.ndarray:
+    """
+    Time (s) for rest-to-rest moves of the given lengths (inches).
+
+    Long moves reach the cruise speed; short ones follow a triangular profile.
+    """
+    distance = np.asarray(distance, dtype=np.float64)
+    ramp = speed * speed / accel  # distance spent accelerating plus decelerating
+    return np.where(
+        distance >= ramp,
+        distance / speed + speed / accel,
+        2 * np.sqrt(distance / accel),
+    )
+
+
+def simulate_polylines(
+    polylines: Sequence[np.ndarray],
+    config: MachineConfig | None = None,
+    origin: tuple[float, float] = (0.0, 0.0),
+    return_home: bool = True,
+    lookahead: bool = False,
+) -> SimulationResult:
+    """
+    Estimate plotting polylines in order, each drawn with one pen-down pass.
+
+    Coordinates are in config.units, in machine coordinates (origin is home).
+    With lookahead, pen-down passes are timed from the motion planner's
+    profile (see motion.py) instead of stopping at every vertex.
+    """
+    config = config or MachineConfig()
+    result = SimulationResult()
+    polylines = [np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in polylines]
+    polylines = [p for p in polylines if len(p) >= 2]
+    if not polylines:
+        return result
+    scale = 1 / config.units_per_inch
+
+    # Pen-down: every vertex-to-vertex move, in one vectorized pass
+    down = np.concatenate([np.hypot(*np.diff(p, axis=0).T) for p in polylines])
+    if lookahead:
+        down_time = np.array([plan_polyline(p, config).time for p in polylines])
+    else:
+        down_time = trapezoid_times(down * scale, config.pendown_speed, config.pendown_accel)
+
+    # Pen-up: origin -> first start, end -> next start, ..., last end -> origin
+    starts = np.array([p[0] for p in polylines])
+    ends = np.array([p[-1] for p in polylines])
+    o = np.asarray(origin, dtype=np.float64)
+    link_from = np.vstack([o, ends])
+    link_to = np.vstack([starts, o]) if return_home else starts
+    up = np.hypot(*(link_to - link_from[: len(link_to)]).T)
+    up_time = trapezoid_times(up * scale, config.penup_speed, config.penup_accel)
+
+    result.lift_count = len(polylines)
+    result.pendown_distance = float(down.sum())
+    result.penup_distance = float(up.sum())
+    result.pendown_time_ms = float(down_time.sum()) * 1000
+    result.penup_time_ms = float(up_time.sum()) * 1000
+    result.servo_time_ms = len(polylines) * (config.lower_time + config.raise_time)
+    result.time_ms = result.pendown_time_ms + result.penup_time_ms + result.servo_time_ms
+    return result
+
+
+def simulate_segments(
+    segments: np.ndarray,
+    config: MachineConfig | None = None,
+    origin: tuple[float, float] = (0.0, 0.0),
+    return_home: bool = True,
+) -> SimulationResult:
+    """Estimate plotting (x1, y1, x2, y2) segments in order, one pen lift each."""
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 2, 2)
+    return simulate_polylines(list(segments), config, origin, return_home)
@@ -0,0 +1,45 @@
+"""
+Sol LeWitt's Wall Drawing #11 as a vsketch sketch.
+
+    vsk run src/msnextdraw/sketch_sol11.py
+    vsk save src/msnextdraw/sketch_sol11.py --param frame 0..60
+
+Geometry is cached per (size, spacing, frame); see vsketch_adapter.py.
+"""
+
+import vsketch
+
+from sol11 import sol11_drawing
+from vpype_adapter import DEFAULT_PIPELINE
+from vsketch_adapter import cached_document, draw_document
+
+
+class Sol11Sketch(vsketch.SketchClass):
+    # Page layout: changing these reuses the cached geometry
+    page_size = vsketch.Param("letter", choices=["letter", "tabloid", "a5", "a4", "a3"])
+    landscape = vsketch.Param(True)
+
+    # Geometry
+    size_inches = vsketch.Param(6.0, 1.0, 30.0, step=0.5)
+    frame = vsketch.Param(0, 0)
+    line_spacing = vsketch.Param(0.0, 0.0, step=0.5, decimals=2)  # mm, 0 = 10% of the size
+
+    # Run vpype's cleanup before saving
+    optimize = vsketch.Param(True)
+
+    def draw(self, vsk: vsketch.Vsketch) -> None:
+        vsk.size(self.page_size, landscape=self.landscape)
+        key = ("sol11", self.size_inches, self.frame, self.line_spacing)
+        document = cached_document(
+            key,
+            lambda: sol11_drawing(self.size_inches, self.frame, self.line_spacing or None),
+        )
+        draw_document(vsk, document)
+
+    def finalize(self, vsk: vsketch.Vsketch) -> None:
+        if self.optimize:
+            vsk.vpype(DEFAULT_PIPELINE)
+
+
+if __name__ == "__main__":
+    Sol11Sketch.display()
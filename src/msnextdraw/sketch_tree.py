@@ -0,0 +1,50 @@
+"""
+The sine-wave Christmas tree as a vsketch sketch.
+
+    vsk run src/msnextdraw/sketch_tree.py
+
+Geometry is cached per canvas size and sampling tolerance; see vsketch_adapter.py.
+"""
+
+import vsketch
+
+from tree import CHORD_TOLERANCE, HEIGHT, WIDTH, ChristmasTree
+from vpype_adapter import DEFAULT_PIPELINE
+from vsketch_adapter import cached_document, draw_document
+
+
+class TreeSketch(vsketch.SketchClass):
+    # Page layout: changing these reuses the cached geometry
+    page_size = vsketch.Param("letter", choices=["letter", "tabloid", "a5", "a4", "a3"])
+    landscape = vsketch.Param(False)
+
+    # Geometry, in SVG pixels
+    width = vsketch.Param(float(WIDTH), 100.0, step=10)
+    height = vsketch.Param(float(HEIGHT), 100.0, step=10)
+    tolerance = vsketch.Param(CHORD_TOLERANCE, 0.01, step=0.05, decimals=2)  # chord error
+    simplify = vsketch.Param(0.0, 0.0, step=0.05, decimals=2)  # Douglas-Peucker, 0 = off
+
+    # Run vpype's cleanup before saving
+    optimize = vsketch.Param(True)
+
+    def draw(self, vsk: vsketch.Vsketch) -> None:
+        vsk.size(self.page_size, landscape=self.landscape)
+        key = ("tree", self.width, self.height, self.tolerance, self.simplify)
+        document = cached_document(
+            key,
+            lambda: ChristmasTree(
+                self.width,
+                self.height,
+                tolerance=self.tolerance,
+                simplify_tolerance=self.simplify or None,
+            ),
+        )
+        draw_document(vsk, document)
+
+    def finalize(self, vsk: vsketch.Vsketch) -> None:
+        if self.optimize:
+            vsk.vpype(DEFAULT_PIPELINE)
+
+
+if __name__ == "__main__":
+    TreeSketch.display()
@@ -9,6 +9,7 @@ This Python adaptation supports multiple modes:
 - animation: Animated display using py5 (similar to original p5.js)
 - single: Single frame display using py5
 - svg: Export single frame to SVG file
+- frames: Export a range of frames to SVG files (or layers of one SVG) in parallel
 - plotter: Draw directly using NextDraw plotter
 
 Original JavaScript by Michael Seay, January 2022
@@ -16,15 +17,63 @@ Python adaptation, December 2025
 """
 
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
+from fractions import Fraction
+from functools import partial
+import math
+import os
 from typing import Literal
 
+import numpy as np
+
+from cache import CacheInfo, LRUCache, combine_info
+from checkpoint import DEFAULT_CHECKPOINT_INTERVAL, DEFAULT_CHECKPOINT_PATH
+from drawing import Layer
+from pipeline import (
+    JOIN_TOLERANCE_MM,
+    PlotOptionError,
+    add_checkpoint_arguments,
+    plot_drawing,
+    write_svg,
+)
+from svgstream import SVGStreamWriter
+
 # Line type constants
 LINE_HORIZONTAL = 0
 LINE_DIAGONAL_1 = 1  # Bottom-left to top-right
 LINE_VERTICAL = 2
 LINE_DIAGONAL_2 = 3  # Top-left to bottom-right
 
+# Layer name of each line type
+LINE_NAMES = {
+    LINE_HORIZONTAL: "horizontal",
+    LINE_DIAGONAL_1: "diagonal 1",
+    LINE_VERTICAL: "vertical",
+    LINE_DIAGONAL_2: "diagonal 2",
+}
+
+# Phase attribute driving each line type
+_FAMILY_PHASES = {
+    LINE_HORIZONTAL: "horizontal_phase",
+    LINE_DIAGONAL_1: "diagonal_phase_1",
+    LINE_VERTICAL: "vertical_phase",
+    LINE_DIAGONAL_2: "diagonal_phase_2",
+}
+
+# Geometry cache keys round phases to this many decimals, so that phases which
+# only differ by floating-point noise share an entry
+PHASE_KEY_DECIMALS = 9
+
+# Largest denominator considered when looking for the animation period
+PERIOD_MAX_DENOMINATOR = 10_000
+
+# Most animation frames kept by the py5 display mode
+FRAME_CACHE_SIZE = 1024
+
+# SVG style for exported lines
+LINE_STYLE = {"stroke": "black", "stroke_width": "0.3mm", "fill": "none"}
+
 
 @dataclass
 class Sol11Drawing:
@@ -38,6 +87,7 @@ class Sol11Drawing:
     # Canvas dimensions (in abstract units - can be pixels, mm, inches, etc.)
     width: float = 500.0
     height: float = 500.0
+    units: str = "px"
 
     # Line spacing
     line_spacing: float = 50.0
@@ -54,6 +104,12 @@ class Sol11Drawing:
     diagonal_speed_1: float = 0.75
     diagonal_speed_2: float = 0.5
 
+    # Drawing protocol layers: dividers plus one per line type, or a single layer
+    layer_per_family: bool = True
+
+    # Optional shared cache of per-family, per-quadrant line arrays
+    cache: LRUCache | None = field(default=None, repr=False, compare=False)
+
     # Quadrant mapping: quadrant_index -> (x_offset, y_offset)
     # 0: top-right, 1: top-left, 2: bottom-right, 3: bottom-left
     _quadrant_map: dict = field(init=False)
@@ -92,6 +148,45 @@ class Sol11Drawing:
         self.diagonal_phase_1 = (self.diagonal_speed_1 * frame_index) % self.line_spacing
         self.diagonal_phase_2 = (self.diagonal_speed_2 * frame_index) % self.line_spacing
 
+    def animation_period(self) -> int | None:
+        """
+        Number of frames after which set_frame repeats every phase, if any.
+
+        Each family repeats once speed * frame is a multiple of line_spacing; the
+        drawing repeats after the least common multiple of those periods. Returns
+        None when the speeds and spacing are not (close to) commensurate.
+        """
+        spacing = Fraction(self.line_spacing).limit_denominator(PERIOD_MAX_DENOMINATOR)
+        if spacing == 0:
+            return None
+        period = 1
+        for speed in (
+            self.horizontal_speed,
+            self.vertical_speed,
+            self.diagonal_speed_1,
+            self.diagonal_speed_2,
+        ):
+            ratio = Fraction(speed).limit_denominator(PERIOD_MAX_DENOMINATOR) / spacing
+            if abs(float(ratio) - speed / self.line_spacing) > 1e-12:
+                return None
+            period = math.lcm(period, ratio.denominator)
+        return period
+
+    def frame_key(self, frame_index: int) -> tuple:
+        """Cache key identifying the geometry of a frame, folded by the animation period."""
+        period = self.animation_period()
+        return (
+            "frame",
+            self.width,
+            self.height,
+            self.line_spacing,
+            self.horizontal_speed,
+            self.vertical_speed,
+            self.diagonal_speed_1,
+            self.diagonal_speed_2,
+            frame_index % period if period else frame_index,
+        )
+
     def get_quadrant_dividers(self) -> list[tuple[float, float, float, float]]:
         """Return the two lines dividing the canvas into quadrants."""
         return [
@@ -99,69 +194,132 @@ class Sol11Drawing:
             (0, self.height / 2, self.width, self.height / 2),  # Horizontal divider
         ]
 
-    def _get_horizontal_lines(
-        self, qx: float, qy: float
-    ) -> list[tuple[float, float, float, float]]:
-        """Generate horizontal lines for a quadrant."""
-        lines = []
+    def get_quadrant_dividers_array(self) -> np.ndarray:
+        """Return the quadrant dividers as a (2, 4) float64 array."""
+        return np.array(self.get_quadrant_dividers(), dtype=np.float64)
+
+    def _line_count(self, start: float, end: float) -> int:
+        """Return how many of start, start + spacing, ... do not exceed end."""
+        if start > end:
+            return 0
+        return int(np.floor((end - start) / self.line_spacing)) + 1
+
+    def _line_offsets(self, start: float, end: float) -> np.ndarray:
+        """Return the offsets start, start + spacing, ... that do not exceed end."""
+        count = self._line_count(start, end)
+        return start + self.line_spacing * np.arange(count, dtype=np.float64)
+
+    def _get_horizontal_lines(self, qx: float, qy: float) -> np.ndarray:
+        """Generate horizontal lines for a quadrant as an (N, 4) array."""
         hw = self.width / 2
         hh = self.height / 2
 
-        y = qy + self.horizontal_phase
-        y_end = qy + hh - 1
-        while y <= y_end:
-            lines.append((qx, y, qx + hw, y))
-            y += self.line_spacing
+        y = qy + self._line_offsets(self.horizontal_phase, hh - 1)
+        lines = np.empty((len(y), 4), dtype=np.float64)
+        lines[:, 0] = qx
+        lines[:, 1] = y
+        lines[:, 2] = qx + hw
+        lines[:, 3] = y
         return lines
 
-    def _get_vertical_lines(self, qx: float, qy: float) -> list[tuple[float, float, float, float]]:
-        """Generate vertical lines for a quadrant."""
-        lines = []
+    def _get_vertical_lines(self, qx: float, qy: float) -> np.ndarray:
+        """Generate vertical lines for a quadrant as an (N, 4) array."""
         hw = self.width / 2
         hh = self.height / 2
 
-        x = qx + self.vertical_phase
-        x_end = qx + hw - 1
-        while x <= x_end:
-            lines.append((x, qy, x, qy + hh))
-            x += self.line_spacing
+        x = qx + self._line_offsets(self.vertical_phase, hw - 1)
+        lines = np.empty((len(x), 4), dtype=np.float64)
+        lines[:, 0] = x
+        lines[:, 1] = qy
+        lines[:, 2] = x
+        lines[:, 3] = qy + hh
         return lines
 
-    def _get_diagonal_1_lines(
-        self, qx: float, qy: float
-    ) -> list[tuple[float, float, float, float]]:
+    def _get_diagonal_1_lines(self, qx: float, qy: float) -> np.ndarray:
         """Generate diagonal lines (bottom-left to top-right) for a quadrant."""
-        lines = []
         hw = self.width / 2
         hh = self.height / 2
 
-        d = self.diagonal_phase_1
-        d_end = self.diagonal_phase_1 + hw - 1
-        while d <= d_end:
-            # Lower triangle part
-            lines.append((qx, qy + hh - d, qx + d, qy + hh))
-            # Upper triangle part
-            lines.append((qx + d, qy, qx + hw, qy + hh - d))
-            d += self.line_spacing
-        return lines
-
-    def _get_diagonal_2_lines(
-        self, qx: float, qy: float
-    ) -> list[tuple[float, float, float, float]]:
+        d = self._line_offsets(self.diagonal_phase_1, self.diagonal_phase_1 + hw - 1)
+        # Rows alternate: lower triangle part, then upper triangle part, for each d
+        lines = np.empty((len(d), 2, 4), dtype=np.float64)
+        lines[:, 0, 0] = qx
+        lines[:, 0, 1] = qy + hh - d
+        lines[:, 0, 2] = qx + d
+        lines[:, 0, 3] = qy + hh
+        lines[:, 1, 0] = qx + d
+        lines[:, 1, 1] = qy
+        lines[:, 1, 2] = qx + hw
+        lines[:, 1, 3] = qy + hh - d
+        return lines.reshape(-1, 4)
+
+    def _get_diagonal_2_lines(self, qx: float, qy: float) -> np.ndarray:
         """Generate diagonal lines (top-left to bottom-right) for a quadrant."""
-        lines = []
         hw = self.width / 2
         hh = self.height / 2
 
-        d = self.diagonal_phase_2
-        d_end = self.diagonal_phase_2 + hh - 1
-        while d <= d_end:
-            # Right part
-            lines.append((qx + d, qy + hh, qx + hw, qy + d))
-            # Left part
-            lines.append((qx, qy + d, qx + d, qy))
-            d += self.line_spacing
-        return lines
+        d = self._line_offsets(self.diagonal_phase_2, self.diagonal_phase_2 + hh - 1)
+        # Rows alternate: right part, then left part, for each d
+        lines = np.empty((len(d), 2, 4), dtype=np.float64)
+        lines[:, 0, 0] = qx + d
+        lines[:, 0, 1] = qy + hh
+        lines[:, 0, 2] = qx + hw
+        lines[:, 0, 3] = qy + d
+        lines[:, 1, 0] = qx
+        lines[:, 1, 1] = qy + d
+        lines[:, 1, 2] = qx + d
+        lines[:, 1, 3] = qy
+        return lines.reshape(-1, 4)
+
+    def get_lines_for_quadrant_array(self, quadrant_index: int) -> np.ndarray:
+        """
+        Get all lines for a specific quadrant as an (N, 4) float64 array.
+        Each quadrant skips the line type whose index matches the quadrant index.
+
+        Each row is (x1, y1, x2, y2).
+        """
+        families = [
+            self._family_array(line_type, quadrant_index)
+            for line_type in LINE_NAMES
+            if line_type != quadrant_index  # Skip the matching line type
+        ]
+        return np.concatenate(families)
+
+    def _family_array(self, line_type: int, quadrant_index: int) -> np.ndarray:
+        """Lines of one type within one quadrant, through the cache when there is one."""
+        qx, qy = self._quadrant_map[quadrant_index]
+        generator = {
+            LINE_HORIZONTAL: self._get_horizontal_lines,
+            LINE_DIAGONAL_1: self._get_diagonal_1_lines,
+            LINE_VERTICAL: self._get_vertical_lines,
+            LINE_DIAGONAL_2: self._get_diagonal_2_lines,
+        }[line_type]
+        if self.cache is None:
+            return generator(qx, qy)
+        phase = getattr(self, _FAMILY_PHASES[line_type])
+        key = (
+            line_type,
+            quadrant_index,
+            self.width,
+            self.height,
+            self.line_spacing,
+            round(phase, PHASE_KEY_DECIMALS),
+        )
+        return self.cache.get_or_compute(key, partial(_read_only, generator, qx, qy))
+
+    def get_family_array(self, line_type: int) -> np.ndarray:
+        """Get every line of one type, across the three quadrants that show it, as (N, 4)."""
+        return np.concatenate(
+            [self._family_array(line_type, q) for q in range(4) if q != line_type]
+        )
+
+    def get_quadrant_arrays(self) -> list[np.ndarray]:
+        """Get one (N, 4) line array per quadrant, in quadrant index order."""
+        return [self.get_lines_for_quadrant_array(q) for q in range(4)]
+
+    def get_all_lines_array(self) -> np.ndarray:
+        """Get all lines for the entire drawing as a single (N, 4) array."""
+        return np.concatenate(self.get_quadrant_arrays())
 
     def get_lines_for_quadrant(
         self, quadrant_index: int
@@ -172,28 +330,181 @@ class Sol11Drawing:
 
         Returns list of (x1, y1, x2, y2) tuples.
         """
-        qx, qy = self._quadrant_map[quadrant_index]
-        lines = []
-
-        line_generators = {
-            LINE_HORIZONTAL: self._get_horizontal_lines,
-            LINE_DIAGONAL_1: self._get_diagonal_1_lines,
-            LINE_VERTICAL: self._get_vertical_lines,
-            LINE_DIAGONAL_2: self._get_diagonal_2_lines,
-        }
+        return list(map(tuple, self.get_lines_for_quadrant_array(quadrant_index).tolist()))
 
-        for line_type, generator in line_generators.items():
-            if line_type != quadrant_index:  # Skip the matching line type
-                lines.extend(generator(qx, qy))
+    def layers(self) -> list[Layer]:
+        """
+        Drawing protocol: the dividers, then one layer per line type.
 
-        return lines
+        With layer_per_family off, a single layer holds the dividers, then every line.
+        """
+        dividers = self.get_quadrant_dividers_array()
+        if not self.layer_per_family:
+            lines = np.concatenate([dividers, self.get_all_lines_array()])
+            return [Layer.from_segments("sol11", lines, LINE_STYLE)]
+        layers = [Layer.from_segments("dividers", dividers, LINE_STYLE)]
+        for line_type, name in LINE_NAMES.items():
+            layers.append(Layer.from_segments(name, self.get_family_array(line_type), LINE_STYLE))
+        return layers
 
     def get_all_lines(self) -> list[tuple[float, float, float, float]]:
         """Get all lines for the entire drawing."""
-        lines = []
+        return list(map(tuple, self.get_all_lines_array().tolist()))
+
+
+def _read_only(generator, *args) -> np.ndarray:
+    """Call generator(*args) and lock the array it returns, since a cache shares it."""
+    lines = generator(*args)
+    lines.flags.writeable = False
+    return lines
+
+
+# =============================================================================
+# Incremental Animation Buffer
+# =============================================================================
+
+
+@dataclass
+class _FamilyBuffer:
+    """
+    Geometry of one line family in one quadrant, kept between frames.
+
+    Line k sits at offset phase + k * spacing, and every coordinate is affine in
+    that offset: row = base + slope * offset. A phase change therefore moves all
+    lines by the same slope * delta, and only lines entering or leaving at the
+    far end of the range need to be created or dropped.
+    """
+
+    line_type: int
+    base: np.ndarray  # (parts, 4)
+    slope: np.ndarray  # (parts, 4)
+    rows: np.ndarray  # (capacity, parts, 4)
+    count: int = 0
+    phase: float = 0.0
+
+    @property
+    def lines(self) -> np.ndarray:
+        """View of the active lines as an (N, 4) array (no copy)."""
+        return self.rows[: self.count].reshape(-1, 4)
+
+    def fill(self, start: int, stop: int, spacing: float):
+        """Compute lines start..stop-1 from scratch at the current phase."""
+        offsets = self.phase + spacing * np.arange(start, stop, dtype=np.float64)
+        self.rows[start:stop] = self.base + self.slope * offsets[:, None, None]
+
+
+class Sol11LineBuffer:
+    """
+    Persistent line geometry for animating a Sol11Drawing.
+
+    update() follows the drawing's current phases by shifting the existing
+    coordinates in place by each family's phase delta, then adds or drops only
+    the lines that cross the quadrant edge. The arrays from get_family_arrays()
+    are views into buffers that are reused from frame to frame.
+    """
+
+    def __init__(self, drawing: Sol11Drawing, resync_interval: int = 1024):
+        self.drawing = drawing
+        # Recompute from scratch now and then, so rounding error cannot accumulate
+        self.resync_interval = resync_interval
+        self.rebuild()
+
+    def _family_range(self, line_type: int, phase: float) -> tuple[float, float]:
+        """The (start, end) offset range of a family at the given phase."""
+        hw = self.drawing.width / 2
+        hh = self.drawing.height / 2
+        if line_type == LINE_HORIZONTAL:
+            return phase, hh - 1
+        if line_type == LINE_VERTICAL:
+            return phase, hw - 1
+        if line_type == LINE_DIAGONAL_1:
+            return phase, phase + hw - 1
+        return phase, phase + hh - 1
+
+    def _count(self, line_type: int, phase: float) -> int:
+        start, end = self._family_range(line_type, phase)
+        return self.drawing._line_count(start, end)
+
+    def _affine(self, line_type: int, qx: float, qy: float) -> tuple[list, list]:
+        """Base and slope rows for a family, matching Sol11Drawing's generators."""
+        hw = self.drawing.width / 2
+        hh = self.drawing.height / 2
+        if line_type == LINE_HORIZONTAL:
+            return [(qx, qy, qx + hw, qy)], [(0, 1, 0, 1)]
+        if line_type == LINE_VERTICAL:
+            return [(qx, qy, qx, qy + hh)], [(1, 0, 1, 0)]
+        if line_type == LINE_DIAGONAL_1:
+            # Lower triangle part, then upper triangle part
+            return (
+                [(qx, qy + hh, qx, qy + hh), (qx, qy, qx + hw, qy + hh)],
+                [(0, -1, 1, 0), (1, 0, 0, -1)],
+            )
+        # Right part, then left part
+        return (
+            [(qx, qy + hh, qx + hw, qy), (qx, qy, qx, qy)],
+            [(1, 0, 0, 1), (0, 1, 1, 0)],
+        )
+
+    def rebuild(self):
+        """Reallocate and recompute every buffer (after dimension or spacing changes)."""
+        d = self.drawing
+        self._key = (d.width, d.height, d.line_spacing)
+        self._updates = 0
+        self.quadrants: list[list[_FamilyBuffer]] = []
         for quadrant_index in range(4):
-            lines.extend(self.get_lines_for_quadrant(quadrant_index))
-        return lines
+            qx, qy = d._quadrant_map[quadrant_index]
+            families = []
+            for line_type, phase_attr in _FAMILY_PHASES.items():
+                if line_type == quadrant_index:
+                    continue
+                base, slope = self._affine(line_type, qx, qy)
+                # The range is longest at phase 0
+                capacity = max(self._count(line_type, 0.0), 1)
+                family = _FamilyBuffer(
+                    line_type=line_type,
+                    base=np.array(base, dtype=np.float64),
+                    slope=np.array(slope, dtype=np.float64),
+                    rows=np.empty((capacity, len(base), 4), dtype=np.float64),
+                    phase=getattr(d, phase_attr),
+                )
+                family.count = self._count(line_type, family.phase)
+                family.fill(0, family.count, d.line_spacing)
+                families.append(family)
+            self.quadrants.append(families)
+
+    def update(self):
+        """Bring the buffers up to date with the drawing's current phases."""
+        d = self.drawing
+        self._updates += 1
+        if (d.width, d.height, d.line_spacing) != self._key or (
+            self._updates >= self.resync_interval
+        ):
+            self.rebuild()
+            return
+
+        for families in self.quadrants:
+            for family in families:
+                phase = getattr(d, _FAMILY_PHASES[family.line_type])
+                delta = phase - family.phase
+                if delta == 0:
+                    continue
+                family.phase = phase
+                # Move every existing line k to its new offset phase + k * spacing
+                active = family.rows[: family.count]
+                np.add(active, family.slope * delta, out=active)
+
+                count = self._count(family.line_type, phase)
+                if count > family.count:
+                    family.fill(family.count, count, d.line_spacing)
+                family.count = count
+
+    def get_family_arrays(self) -> list[np.ndarray]:
+        """One (N, 4) view per quadrant and line family, in quadrant order."""
+        return [family.lines for families in self.quadrants for family in families]
+
+    def get_all_lines_array(self) -> np.ndarray:
+        """All lines as a single (N, 4) array (a copy)."""
+        return np.concatenate(self.get_family_arrays())
 
 
 # =============================================================================
@@ -201,42 +512,114 @@ class Sol11Drawing:
 # =============================================================================
 
 
-def run_py5_display(mode: Literal["animation", "single"], frame_index: int = 0):
-    """Run the drawing using py5 for display."""
+def run_py5_display(
+    mode: Literal["animation", "single"],
+    frame_index: int = 0,
+    line_spacing: float | None = None,
+    renderer: Literal["batched", "lines"] = "batched",
+):
+    """
+    Run the drawing using py5 for display.
+
+    The "batched" renderer hands each frame's vertices to py5 in a single
+    vertices() call inside begin_shape(LINES), and the single-frame mode keeps
+    them in a retained PShape; "lines" calls py5.line once per segment.
+    """
     import py5
 
     drawing = Sol11Drawing()
+    buffer: Sol11LineBuffer | None = None
+    frame_cache: LRUCache | None = None
+    animation_frame = 0
+    retained = None
+
+    def frame_vertices(line_arrays: list[np.ndarray]) -> np.ndarray:
+        """Dividers and lines as one (2N, 2) array of LINES vertices."""
+        lines = np.concatenate([drawing.get_quadrant_dividers_array(), *line_arrays])
+        return lines.reshape(-1, 2)
 
     def settings():
         py5.size(500, 500)
 
     def setup():
+        nonlocal buffer, frame_cache, retained
         py5.background(255)
         py5.stroke_weight(1)
         py5.stroke(0)
         drawing.set_dimensions(py5.width, py5.height)
-        drawing.line_spacing = py5.height * 0.1
+        drawing.line_spacing = line_spacing or py5.height * 0.1
 
         if mode == "single":
             drawing.set_frame(frame_index)
             py5.no_loop()
+            if renderer == "batched":
+                retained = py5.create_shape()
+                retained.begin_shape(py5.LINES)
+                retained.stroke(0)
+                retained.stroke_weight(1)
+                retained.vertices(frame_vertices(drawing.get_quadrant_arrays()))
+                retained.end_shape()
+        else:
+            # Animation frames only shift the existing lines; keep them between frames
+            buffer = Sol11LineBuffer(drawing)
+            # Once a whole period has been drawn, later loops replay cached frames.
+            # Frames that never repeat, or repeat only after more frames than the
+            # cache holds (every lookup would miss), are not cached at all.
+            period = drawing.animation_period()
+            if period is not None and period <= FRAME_CACHE_SIZE:
+                frame_cache = LRUCache(maxsize=period)
+
+    def compute_frame_lines() -> np.ndarray:
+        buffer.update()
+        return buffer.get_all_lines_array()
 
     def draw():
+        nonlocal animation_frame
         py5.clear()
         py5.background(255)
 
+        if retained is not None:
+            py5.shape(retained)
+            return
+
         if mode == "animation":
-            drawing.advance_animation()
+            animation_frame += 1
+            drawing.set_frame(animation_frame)
+            if frame_cache is None:
+                line_arrays = [compute_frame_lines()]
+            else:
+                key = drawing.frame_key(animation_frame)
+                line_arrays = [
+                    frame_cache.get_or_compute(key, partial(_read_only, compute_frame_lines))
+                ]
+        else:
+            line_arrays = drawing.get_quadrant_arrays()
+
+        if renderer == "batched":
+            # One crossing of the Python-to-JVM bridge for the whole frame
+            py5.begin_shape(py5.LINES)
+            py5.vertices(frame_vertices(line_arrays))
+            py5.end_shape()
+            return
 
         # Draw quadrant dividers
         for x1, y1, x2, y2 in drawing.get_quadrant_dividers():
             py5.line(x1, y1, x2, y2)
 
         # Draw all lines
-        for x1, y1, x2, y2 in drawing.get_all_lines():
-            py5.line(x1, y1, x2, y2)
-
-    py5.run_sketch(sketch_functions={"settings": settings, "setup": setup, "draw": draw})
+        for lines in line_arrays:
+            for x1, y1, x2, y2 in lines.tolist():
+                py5.line(x1, y1, x2, y2)
+
+    def exiting():
+        if frame_cache is not None:
+            print(f"Frame cache: {frame_cache.info()}")
+        elif mode == "animation":
+            print("Frame cache: off (the animation does not repeat within the cache size)")
+
+    py5.run_sketch(
+        sketch_functions={"settings": settings, "setup": setup, "draw": draw, "exiting": exiting}
+    )
 
 
 # =============================================================================
@@ -244,103 +627,200 @@ def run_py5_display(mode: Literal["animation", "single"], frame_index: int = 0):
 # =============================================================================
 
 
-def export_svg(output_path: str, size_inches: float = 6.0, frame_index: int = 0):
-    """Export a single frame to SVG file."""
-    import svgwrite
+# Per-process cache shared by every exported frame; repeated phases are reused
+_EXPORT_CACHE = LRUCache(maxsize=16384)
 
-    # Convert inches to mm for SVG
-    size_mm = size_inches * 25.4
 
-    # Create drawing with canvas units matching mm
-    drawing = Sol11Drawing(width=size_mm, height=size_mm)
-    drawing.line_spacing = size_mm * 0.1
-    drawing.set_frame(frame_index)
+def sol11_drawing(
+    size_inches: float = 6.0,
+    frame_index: int = 0,
+    line_spacing: float | None = None,
+    cache: LRUCache | None = None,
+    layer_per_family: bool = True,
+) -> Sol11Drawing:
+    """
+    One frame in mm canvas units, as exported and plotted.
 
-    # Create SVG
-    dwg = svgwrite.Drawing(
-        output_path,
-        size=(f"{size_mm}mm", f"{size_mm}mm"),
-        viewBox=f"0 0 {size_mm} {size_mm}",
+    This is the factory registered as the "sol11" drawing; line_spacing (mm)
+    defaults to 10% of the size.
+    """
+    size_mm = size_inches * 25.4
+    drawing = Sol11Drawing(
+        width=size_mm,
+        height=size_mm,
+        units="mm",
+        layer_per_family=layer_per_family,
+        cache=cache,
     )
+    drawing.line_spacing = line_spacing or size_mm * 0.1
+    drawing.set_frame(frame_index)
+    return drawing
+
 
-    # Style for lines
-    line_style = {"stroke": "black", "stroke-width": "0.3mm", "fill": "none"}
+def _export_drawing(
+    size_inches: float, frame_index: int, layer_per_family: bool = True
+) -> Sol11Drawing:
+    """Create the drawing used by the svg exports."""
+    return sol11_drawing(
+        size_inches, frame_index, cache=_EXPORT_CACHE, layer_per_family=layer_per_family
+    )
 
-    # Draw quadrant dividers
-    for x1, y1, x2, y2 in drawing.get_quadrant_dividers():
-        dwg.add(dwg.line((x1, y1), (x2, y2), **line_style))
 
-    # Draw all lines
-    for x1, y1, x2, y2 in drawing.get_all_lines():
-        dwg.add(dwg.line((x1, y1), (x2, y2), **line_style))
+def export_svg(
+    output_path: str,
+    size_inches: float = 6.0,
+    frame_index: int = 0,
+    verbose: bool = True,
+    layer_per_family: bool = True,
+):
+    """Export a single frame to SVG file, one Inkscape layer per line type."""
+    write_svg(_export_drawing(size_inches, frame_index, layer_per_family), output_path)
 
-    dwg.save()
-    print(f"SVG saved to: {output_path}")
+    if verbose:
+        print(f"SVG saved to: {output_path}")
 
 
 # =============================================================================
-# NextDraw Plotter Mode
+# Multi-Frame SVG Export Mode
 # =============================================================================
 
 
-def run_plotter(size_inches: float = 6.0, frame_index: int = 0, dry_run: bool = False):
-    """Draw directly using NextDraw plotter."""
-    from nextdraw import NextDraw
-
-    # Convert inches to mm
-    size_mm = size_inches * 25.4
-
-    # Create drawing with canvas units in mm
-    drawing = Sol11Drawing(width=size_mm, height=size_mm)
-    drawing.line_spacing = size_mm * 0.1
-    drawing.set_frame(frame_index)
-
-    # Collect all lines (dividers + pattern lines)
-    all_lines = drawing.get_quadrant_dividers() + drawing.get_all_lines()
-
-    if dry_run:
-        print(f"Dry run: would draw {len(all_lines)} lines")
-        print(f'Canvas size: {size_mm:.1f}mm x {size_mm:.1f}mm ({size_inches}" x {size_inches}")')
-        return
-
-    # Initialize NextDraw
-    nd = NextDraw()
-    nd.interactive()
-    nd.options.units = 2  # mm
-    nd.options.speed_pendown = 25
-    nd.options.speed_penup = 75
-
-    if not nd.connect():
-        print("Error: Could not connect to NextDraw plotter")
-        return
-
+def parse_frame_range(spec: str) -> range:
+    """Parse a frame range such as "0:600" or "0:600:2" (stop is exclusive)."""
+    parts = spec.split(":")
+    if len(parts) == 1:
+        start = int(parts[0])
+        return range(start, start + 1)
+    if len(parts) > 3 or not parts[1]:
+        raise argparse.ArgumentTypeError(f"invalid frame range: {spec!r}")
+    start, stop, step = parts + [""] * (3 - len(parts))
     try:
-        print(f"Drawing {len(all_lines)} lines...")
-
-        # Offset to center on the page (assuming 11" x 8.5" travel area)
-        # Center horizontally: (11" - size) / 2
-        # Center vertically: (8.5" - size) / 2
-        offset_x = (11 * 25.4 - size_mm) / 2
-        offset_y = (8.5 * 25.4 - size_mm) / 2
+        frames = range(int(start or 0), int(stop), int(step or 1))
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"invalid frame range: {spec!r}") from exc
+    if not frames:
+        raise argparse.ArgumentTypeError(f"empty frame range: {spec!r}")
+    return frames
+
+
+def frame_path(output_path: str, frame_index: int, frames: range) -> str:
+    """Deterministic per-frame file name: sol11_output.svg -> sol11_output_0042.svg."""
+    root, ext = os.path.splitext(output_path)
+    digits = max(4, len(str(max(abs(frames.start), abs(frames.stop)))))
+    return f"{root}_{frame_index:0{digits}d}{ext or '.svg'}"
+
+
+def _export_frame(job: tuple[str, float, int]) -> tuple[int, CacheInfo]:
+    """Process pool worker: export one frame; returns the worker's pid and cache counters."""
+    output_path, size_inches, frame_index = job
+    export_svg(output_path, size_inches=size_inches, frame_index=frame_index, verbose=False)
+    return os.getpid(), _EXPORT_CACHE.info()
+
+
+def _frame_lines(job: tuple[float, int]) -> tuple[np.ndarray, int, CacheInfo]:
+    """Process pool worker: all lines of one frame, dividers first, in mm, with cache counters."""
+    size_inches, frame_index = job
+    drawing = _export_drawing(size_inches, frame_index)
+    lines = np.concatenate([drawing.get_quadrant_dividers_array(), drawing.get_all_lines_array()])
+    return lines, os.getpid(), _EXPORT_CACHE.info()
+
+
+def export_frames(
+    output_path: str,
+    frames: range,
+    size_inches: float = 6.0,
+    as_layers: bool = False,
+    jobs: int | None = None,
+):
+    """
+    Export a range of frames across a process pool.
 
-        for i, (x1, y1, x2, y2) in enumerate(all_lines):
-            # Apply offset
-            x1_mm = x1 + offset_x
-            y1_mm = y1 + offset_y
-            x2_mm = x2 + offset_x
-            y2_mm = y2 + offset_y
+    Writes one file per frame (see frame_path), or with as_layers a single SVG
+    at output_path holding each frame as an Inkscape layer. Prints the
+    geometry cache counters of the workers once done.
+    """
+    if not frames:
+        raise ValueError("No frames to export")
+    size_mm = size_inches * 25.4
+    period = _export_drawing(size_inches, 0).animation_period()
+    if period and len(frames) > period:
+        print(f"Animation repeats every {period} frames; repeated phases reuse cached geometry")
+
+    # Let each worker take a few frames at a time to amortize IPC
+    chunksize = max(1, len(frames) // (4 * (jobs or os.cpu_count() or 1)))
+    # Latest cache counters of each worker process; its cache lives as long as it does
+    worker_caches: dict[int, CacheInfo] = {}
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        if not as_layers:
+            work = [(frame_path(output_path, f, frames), size_inches, f) for f in frames]
+            for pid, info in pool.map(_export_frame, work, chunksize=chunksize):
+                worker_caches[pid] = info
+            first = frame_path(output_path, frames[0], frames)
+            print(f"{len(work)} SVG frames saved to: {first} ...")
+        else:
+            work = [(size_inches, f) for f in frames]
+            with SVGStreamWriter(output_path, size_mm, size_mm, units="mm") as svg:
+                # Frames are written in order as their results arrive
+                for frame_index, (lines, pid, info) in zip(
+                    frames, pool.map(_frame_lines, work, chunksize=chunksize), strict=True
+                ):
+                    worker_caches[pid] = info
+                    with svg.layer(f"frame {frame_index}", **LINE_STYLE):
+                        svg.write_segments(lines)
+            print(f"SVG with {len(frames)} frame layers saved to: {output_path}")
+
+    print(f"Geometry cache: {combine_info(worker_caches.values())}")
 
-            nd.moveto(x1_mm, y1_mm)  # Pen up, move to start
-            nd.lineto(x2_mm, y2_mm)  # Pen down, draw line
 
-            if (i + 1) % 50 == 0:
-                print(f"  Progress: {i + 1}/{len(all_lines)} lines")
+# =============================================================================
+# NextDraw Plotter Mode
+# =============================================================================
 
-        nd.moveto(0, 0)  # Return to home
-        print("Drawing complete!")
 
-    finally:
-        nd.disconnect()
+def run_plotter(
+    size_inches: float = 6.0,
+    frame_index: int = 0,
+    dry_run: bool = False,
+    optimize: bool = True,
+    join_tolerance: float = JOIN_TOLERANCE_MM,
+    offline: bool = False,
+    layer_per_family: bool | None = None,
+    layers: list[str] | None = None,
+    pause_between_layers: bool = False,
+    resume: bool = False,
+    checkpoint: str | None = DEFAULT_CHECKPOINT_PATH,
+    checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+    session=None,
+):
+    """
+    Draw directly using NextDraw plotter (or an offline stand-in).
+
+    The drawing is ordered and plotted as a single pass. With
+    pause_between_layers, each layer (the dividers, then each line type) is a
+    pass of its own, for a pen change; layers picks some of them by number or
+    name. layer_per_family defaults to splitting only when either of those
+    needs the layers. Progress is
+    journaled to checkpoint; resume continues an interrupted plot made with
+    the same options. session plots on an open PlotterSession (see session.py).
+    """
+    if layer_per_family is None:
+        layer_per_family = pause_between_layers or bool(layers)
+    # Canvas units in mm, centered on the page by the shared pipeline
+    drawing = sol11_drawing(size_inches, frame_index, layer_per_family=layer_per_family)
+    plot_drawing(
+        drawing,
+        dry_run=dry_run,
+        optimize=optimize,
+        join_tolerance=join_tolerance,
+        offline=offline,
+        layers=layers,
+        pause_between_layers=pause_between_layers,
+        resume=resume,
+        checkpoint=checkpoint,
+        checkpoint_interval=checkpoint_interval,
+        session=session,
+    )
 
 
 # =============================================================================
@@ -357,20 +837,29 @@ Examples:
   python sol11.py animation          # Animated display
   python sol11.py single             # Single frame display
   python sol11.py svg output.svg     # Export to SVG
+  python sol11.py frames out.svg --frames 0:600  # out_0000.svg ... out_0599.svg
+  python sol11.py frames out.svg --frames 0:60 --frames-as-layers  # One SVG, one layer per frame
   python sol11.py plotter            # Draw with NextDraw
   python sol11.py plotter --dry-run  # Preview plotter commands
+  python sol11.py plotter --no-optimize  # Plot in generation order
+  python sol11.py plotter --offline  # Plot to an offline stand-in plotter
+  python sol11.py plotter --pause-layers  # One pen per line type, pausing between layers
+  python sol11.py plotter --layer 3  # Plot (or re-plot) only layer 3
+  python sol11.py plotter --size 11 --resume  # Continue an interrupted plot
         """,
     )
 
     parser.add_argument(
-        "mode", choices=["animation", "single", "svg", "plotter"], help="Output mode"
+        "mode",
+        choices=["animation", "single", "svg", "frames", "plotter"],
+        help="Output mode",
     )
 
     parser.add_argument(
         "output",
         nargs="?",
         default="sol11_output.svg",
-        help="Output filename (for svg mode)",
+        help="Output filename (for svg/frames modes)",
     )
 
     parser.add_argument(
@@ -381,12 +870,48 @@ Examples:
         help="Frame index for single/svg/plotter modes (default: 0)",
     )
 
+    parser.add_argument(
+        "--spacing",
+        type=float,
+        default=None,
+        help="Line spacing in pixels for animation/single modes (default: 10%% of height)",
+    )
+
+    parser.add_argument(
+        "--renderer",
+        choices=["batched", "lines"],
+        default="batched",
+        help="py5 rendering for animation/single modes: one bulk vertices() call per frame "
+        "(batched) or one py5.line call per segment (lines) (default: batched)",
+    )
+
+    parser.add_argument(
+        "--frames",
+        type=parse_frame_range,
+        default=range(0, 1),
+        help="Frame range start:stop[:step] for frames mode, stop exclusive (default: 0:1)",
+    )
+
+    parser.add_argument(
+        "--frames-as-layers",
+        action="store_true",
+        help="For frames mode: write all frames as layers of a single SVG",
+    )
+
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=None,
+        help="For frames mode: number of worker processes (default: CPU count)",
+    )
+
     parser.add_argument(
         "--size",
         "-s",
         type=float,
         default=6.0,
-        help="Drawing size in inches for svg/plotter modes (default: 6.0)",
+        help="Drawing size in inches for svg/frames/plotter modes (default: 6.0)",
     )
 
     parser.add_argument(
@@ -395,16 +920,91 @@ Examples:
         help="For plotter mode: show what would be drawn without plotting",
     )
 
+    parser.add_argument(
+        "--no-optimize",
+        action="store_true",
+        help="For plotter mode: keep generation order instead of minimizing pen-up travel",
+    )
+
+    parser.add_argument(
+        "--join-tolerance",
+        type=float,
+        default=JOIN_TOLERANCE_MM,
+        help="For plotter mode: gap in mm below which line ends are joined "
+        "(default: NextDraw min_gap, 0.1524)",
+    )
+
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="For plotter mode: send commands to an offline stand-in and report throughput",
+    )
+
+    parser.add_argument(
+        "--single-layer",
+        action="store_true",
+        help="For svg/plotter modes: one layer for everything, instead of one per line type "
+        "(plotter mode only splits them for --layer or --pause-layers)",
+    )
+
+    parser.add_argument(
+        "--layer",
+        action="append",
+        default=None,
+        help="For plotter mode: only plot this layer, by number or name "
+        "(dividers, horizontal, diagonal 1, vertical, diagonal 2); may be repeated",
+    )
+
+    parser.add_argument(
+        "--pause-layers",
+        action="store_true",
+        help="For plotter mode: plot each line type as its own pass, waiting for Enter "
+        "(a pen change) before each layer after the first",
+    )
+
+    add_checkpoint_arguments(parser, "For plotter mode")
+
     args = parser.parse_args()
 
     if args.mode == "animation":
-        run_py5_display("animation")
+        run_py5_display("animation", line_spacing=args.spacing, renderer=args.renderer)
     elif args.mode == "single":
-        run_py5_display("single", frame_index=args.frame)
+        run_py5_display(
+            "single", frame_index=args.frame, line_spacing=args.spacing, renderer=args.renderer
+        )
     elif args.mode == "svg":
-        export_svg(args.output, size_inches=args.size, frame_index=args.frame)
+        export_svg(
+            args.output,
+            size_inches=args.size,
+            frame_index=args.frame,
+            layer_per_family=not args.single_layer,
+        )
+    elif args.mode == "frames":
+        export_frames(
+            args.output,
+            args.frames,
+            size_inches=args.size,
+            as_layers=args.frames_as_layers,
+            jobs=args.jobs,
+        )
     elif args.mode == "plotter":
-        run_plotter(size_inches=args.size, frame_index=args.frame, dry_run=args.dry_run)
+        try:
+            run_plotter(
+                size_inches=args.size,
+                frame_index=args.frame,
+                dry_run=args.dry_run,
+                optimize=not args.no_optimize,
+                join_tolerance=args.join_tolerance,
+                offline=args.offline,
+                layer_per_family=False if args.single_layer else None,
+                layers=args.layer,
+                pause_between_layers=args.pause_layers,
+                resume=args.resume,
+                checkpoint=args.checkpoint,
+                checkpoint_interval=args.checkpoint_interval,
+            )
+        except PlotOptionError as exc:
+            parser.error(str(exc))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,366 @@
+"""
+Precompiled step-level plot plans, replayed through usb_command.
+
+Plotting a drawing normally plans its motion during the plot. compile_plan
+does that work once, ahead of time: the planned layers (see pipeline.py) are
+profiled by the lookahead planner (motion.py), quantized to motor steps, and
+stored as EBB commands in a compact binary file. An SM command runs at a
+constant rate, so each planned move is sent as slices of slice_ms (SLICE_MS by
+default) while it accelerates or decelerates and as one command while it
+cruises; the replay follows the planned velocity profile, not only its total
+time. Slices are kept long enough that the EBB's shallow motion FIFO does not
+run dry between USB round trips on a slow host. Replaying it needs no
+geometry or planning, only one small record decoded per command, so a job can
+be planned once on a fast machine and replayed many times from a small host
+next to the plotter:
+
+    python pipeline.py sol11 compile sol11.ndplan -p size_inches=11
+    python stepplan.py sol11.ndplan --offline
+    python stepplan.py sol11.ndplan --pause-layers
+
+File layout, little-endian:
+- header: magic b"MSNDPLAN", format version (u16), flags (u16, 0),
+  metadata length (u32), record count (u32)
+- metadata: UTF-8 JSON (drawing, units, offset, machine settings, totals)
+- records, 13 bytes each: kind (u8), value (u32), steps1 (i32), steps2 (i32)
+  - MOVE: SM,value,steps1,steps2 (value is the duration in ms), one slice
+    of a planned move
+  - PEN_UP / PEN_DOWN: SP,1,value / SP,0,value (value is the servo delay in ms)
+  - LAYER: start of layer number value, where the plot may pause for a pen
+- CRC32 of everything above (u32)
+
+Motor steps are mixed as on the NextDraw: steps1 = dx + dy, steps2 = dx - dy,
+in high resolution XY steps (MachineConfig.step_scale). A plan starts and
+ends at home with the pen up; pen heights come from the plotter's own settings.
+"""
+
+import argparse
+from dataclasses import asdict, dataclass, field
+import json
+import struct
+import time
+from typing import TYPE_CHECKING
+import zlib
+
+import numpy as np
+
+from motion import MotionPlan, plan_polylines
+from simulate import MachineConfig
+
+if TYPE_CHECKING:
+    from pipeline import PlannedLayer
+
+MAGIC = b"MSNDPLAN"
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct("<8sHHII")
+CRC = struct.Struct("<I")
+RECORD = np.dtype([("kind", "u1"), ("value", "<u4"), ("steps1", "<i4"), ("steps2", "<i4")])
+
+# Record kinds
+MOVE = 0
+PEN_UP = 1
+PEN_DOWN = 2
+LAYER = 3
+
+# Default duration of the constant-rate SM slices approximating a speed change, ms
+SLICE_MS = 25
+
+
+@dataclass
+class StepPlan:
+    """A compiled plan: metadata and its command records."""
+
+    metadata: dict
+    records: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=RECORD))
+
+    @property
+    def motion_time(self) -> float:
+        """Total duration of the moves and pen delays, seconds."""
+        return float(self.records["value"][self.records["kind"] != LAYER].sum()) / 1000
+
+    @property
+    def line_count(self) -> int:
+        """Number of pen-down MOVE records (move slices)."""
+        count = 0
+        pen_down = False
+        for kind in self.records["kind"].tolist():
+            if kind == MOVE:
+                count += pen_down
+            elif kind != LAYER:
+                pen_down = kind == PEN_DOWN
+        return count
+
+    def to_bytes(self) -> bytes:
+        """The plan in the file format."""
+        metadata = json.dumps(self.metadata, sort_keys=True).encode()
+        body = (
+            HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(metadata), len(self.records))
+            + metadata
+            + self.records.astype(RECORD, copy=False).tobytes()
+        )
+        return body + CRC.pack(zlib.crc32(body))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "StepPlan":
+        """Parse and verify a plan file's contents."""
+        if len(data) < HEADER.size + CRC.size or not data.startswith(MAGIC):
+            raise ValueError("Not a step plan file")
+        magic, version, flags, metadata_size, count = HEADER.unpack_from(data)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported step plan version {version}")
+        end = HEADER.size + metadata_size + count * RECORD.itemsize
+        if len(data) != end + CRC.size:
+            raise ValueError("Step plan file is truncated")
+        if zlib.crc32(data[:end]) != CRC.unpack_from(data, end)[0]:
+            raise ValueError("Step plan checksum mismatch: the file is corrupt")
+        metadata = json.loads(data[HEADER.size : HEADER.size + metadata_size])
+        records = np.frombuffer(data, RECORD, count, HEADER.size + metadata_size)
+        return cls(metadata, records)
+
+
+def _slice_times(
+    entry: float, peak: float, leave: float, duration: float, accel: float, slice_ms: int
+) -> tuple[list[float], list[float]]:
+    """
+    Slice end times (s) and distances (in) along one trapezoid move.
+
+    Acceleration and deceleration are cut into slice_ms slices, the cruise is
+    one slice.
+    """
+    step = slice_ms / 1000
+    ramp_up = max(peak - entry, 0.0) / accel
+    ramp_down = max(peak - leave, 0.0) / accel
+    cruise_end = max(duration - ramp_down, ramp_up)
+    up_distance = entry * ramp_up + accel * ramp_up**2 / 2
+    times = [*np.arange(step, ramp_up, step).tolist(), ramp_up]
+    times += [cruise_end + t for t in np.arange(step, ramp_down, step).tolist()]
+    times.append(duration)
+
+    distances = []
+    for t in times:
+        if t <= ramp_up:
+            distances.append(entry * t + accel * t * t / 2)
+        elif t <= cruise_end:
+            distances.append(up_distance + peak * (t - ramp_up))
+        else:
+            tau = t - cruise_end
+            distances.append(
+                up_distance + peak * (cruise_end - ramp_up) + peak * tau - accel * tau * tau / 2
+            )
+    return times, distances
+
+
+def _move_records(
+    motion: MotionPlan, accel: float, steps_per_unit: float, slice_ms: int = SLICE_MS
+) -> np.ndarray:
+    """
+    MOVE records following a motion plan's velocity profile.
+
+    motion is in machine units (mm) and accel is its acceleration, in/s^2.
+    Slices too short to move a step are folded into the next one.
+    """
+    points = motion.points
+    targets = [np.rint(points[0] * steps_per_unit).astype(np.int64).tolist()]
+    durations = []
+    for i, (length, entry, peak, leave, duration) in enumerate(
+        zip(
+            motion.lengths.tolist(),
+            motion.entry.tolist(),
+            motion.peak.tolist(),
+            motion.exit.tolist(),
+            motion.durations.tolist(),
+            strict=True,
+        )
+    ):
+        times, distances = _slice_times(entry, peak, leave, duration, accel, slice_ms)
+        start, delta = points[i], points[i + 1] - points[i]
+        previous = 0.0
+        for t, distance in zip(times, distances, strict=True):
+            if t - previous < 1e-9:
+                continue
+            fraction = min(distance / length, 1.0) if length > 0 else 1.0
+            targets.append(np.rint((start + delta * fraction) * steps_per_unit).tolist())
+            durations.append(t - previous)
+            previous = t
+        # The move ends exactly on its end point
+        targets[-1] = np.rint(points[i + 1] * steps_per_unit).tolist()
+
+    delta = np.diff(np.array(targets, dtype=np.int64), axis=0)
+    # Rounded up, so no slice runs faster than planned
+    ms = np.maximum(1, np.ceil(np.array(durations) * 1000 - 1e-6)).astype(np.int64)
+    moving = np.flatnonzero(np.any(delta != 0, axis=1))
+    records = np.zeros(len(moving), dtype=RECORD)
+    if len(moving) == 0:
+        return records
+    # Each slice that moves also takes the time of the still slices before it
+    value = np.diff(np.cumsum(ms)[moving], prepend=0)
+    value[-1] += ms[moving[-1] + 1 :].sum()
+    records["kind"] = MOVE
+    records["value"] = value
+    records["steps1"] = delta[moving, 0] + delta[moving, 1]
+    records["steps2"] = delta[moving, 0] - delta[moving, 1]
+    return records
+
+
+def compile_plan(
+    planned: list["PlannedLayer"],
+    offset: tuple[float, float] = (0.0, 0.0),
+    config: MachineConfig | None = None,
+    metadata: dict | None = None,
+    slice_ms: int = SLICE_MS,
+) -> StepPlan:
+    """
+    Compile planned layers (in mm, see pipeline.plan_drawing) into a step plan.
+
+    Each layer starts with a LAYER record, then pen-up travel and a pen-down
+    lookahead profile per polyline, and ends back at home. Speed changes are
+    sent as SM slices of slice_ms, recorded in the plan metadata.
+    """
+    if slice_ms < 1:
+        raise ValueError(f"slice_ms must be at least 1, got {slice_ms}")
+    from pipeline import layer_label
+
+    config = MachineConfig(**{**asdict(config or MachineConfig()), "units": 2})
+    steps_per_unit = config.step_scale / 25.4
+    raise_ms, lower_ms = round(config.raise_time), round(config.lower_time)
+    chunks = []
+    for layer in planned:
+        chunks.append(np.array([(LAYER, layer.number, 0, 0)], dtype=RECORD))
+        polylines = [np.asarray(p, dtype=np.float64) + offset for p in layer.polylines]
+        for motion in plan_polylines(polylines, config):
+            if len(motion.points) < 2:
+                continue
+            pen = (PEN_UP, raise_ms) if motion.pen_up else (PEN_DOWN, lower_ms)
+            chunks.append(np.array([(pen[0], pen[1], 0, 0)], dtype=RECORD))
+            accel = config.penup_accel if motion.pen_up else config.pendown_accel
+            chunks.append(_move_records(motion, accel, steps_per_unit, slice_ms))
+    records = np.concatenate(chunks) if chunks else np.zeros(0, dtype=RECORD)
+
+    # Pen records where the pen is already in that state are dropped
+    kinds = records["kind"]
+    pen_rows = np.flatnonzero((kinds == PEN_UP) | (kinds == PEN_DOWN))
+    previous = np.concatenate([[PEN_UP], kinds[pen_rows][:-1]])
+    records = np.delete(records, pen_rows[kinds[pen_rows] == previous])
+    # Moves that round to no steps
+    records = records[
+        (records["kind"] != MOVE) | (records["steps1"] != 0) | (records["steps2"] != 0)
+    ]
+
+    plan = StepPlan(
+        {
+            **(metadata or {}),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "layers": [layer_label(layer.number, layer.name) for layer in planned],
+            "offset_mm": list(offset),
+            "step_scale": config.step_scale,
+            "slice_ms": slice_ms,
+            "machine": asdict(config),
+        },
+        records,
+    )
+    plan.metadata["motion_time_s"] = round(plan.motion_time, 3)
+    return plan
+
+
+def write_plan(plan: StepPlan, path: str):
+    """Save a plan file."""
+    with open(path, "wb") as f:
+        f.write(plan.to_bytes())
+
+
+def read_plan(path: str) -> StepPlan:
+    """Load and verify a plan file."""
+    with open(path, "rb") as f:
+        return StepPlan.from_bytes(f.read())
+
+
+def replay_plan(nd, plan: StepPlan, pause_between_layers: bool = False, progress=None):
+    """
+    Send a plan's commands through nd.usb_command, from home with the pen up.
+
+    nd is a connected interactive-mode NextDraw (or the offline stand-in).
+    Returns StreamStats: pen-down passes as paths, pen-down MOVE records as
+    lines (see StepPlan.line_count).
+    """
+    from streaming import StreamStats
+
+    stats = StreamStats()
+    start = time.perf_counter()
+    pen_down = False
+    layers = 0
+    try:
+        nd.usb_command("EM,1,1")
+        for kind, value, steps1, steps2 in plan.records.tolist():
+            if kind == MOVE:
+                nd.usb_command(f"SM,{value},{steps1},{steps2}")
+                if pen_down:
+                    stats.segments += 1
+                    if progress is not None:
+                        progress.update(stats)
+            elif kind == PEN_DOWN:
+                nd.usb_command(f"SP,0,{value}")
+                pen_down = True
+                stats.paths += 1
+            elif kind == PEN_UP:
+                nd.usb_command(f"SP,1,{value}")
+                pen_down = False
+            elif kind == LAYER:
+                if layers and pause_between_layers:
+                    input(f"Change pen for layer {value}, then press Enter")
+                layers += 1
+    finally:
+        if pen_down:
+            nd.usb_command("SP,1")
+        stats.elapsed = time.perf_counter() - start
+        if progress is not None:
+            progress.update(stats, force=True)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay a compiled step plan (see pipeline.py compile) on a NextDraw"
+    )
+    parser.add_argument("plan", help="Step plan file")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Send commands to an offline stand-in and report throughput",
+    )
+    parser.add_argument(
+        "--pause-layers",
+        action="store_true",
+        help="Wait for Enter (a pen change) before each layer after the first",
+    )
+    parser.add_argument("--info", action="store_true", help="Only print the plan metadata")
+    args = parser.parse_args()
+
+    try:
+        plan = read_plan(args.plan)
+    except ValueError as exc:
+        parser.error(str(exc))
+    moves = int(np.count_nonzero(plan.records["kind"] == MOVE))
+    print(
+        f"{plan.metadata.get('drawing', args.plan)}: {moves} moves in "
+        f"{len(plan.metadata['layers'])} layer(s), {plan.motion_time:.1f}s of motion"
+    )
+    if args.info:
+        print(json.dumps(plan.metadata, indent=2, sort_keys=True))
+        return
+
+    from pipeline import connect_plotter
+    from streaming import ProgressReporter
+
+    nd = connect_plotter(args.offline)
+    if nd is None:
+        return
+    try:
+        stats = replay_plan(nd, plan, args.pause_layers, ProgressReporter(plan.line_count))
+        print(f"Replay complete! {stats}")
+    finally:
+        nd.disconnect()
+
+
+if __name__ == "__main__":
+    main()
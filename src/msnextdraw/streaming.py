@@ -0,0 +1,100 @@
+"""
+Plot executor for the NextDraw interactive API.
+
+Each polyline becomes one `draw_path` vertex list, offset into machine
+coordinates and sent as plain lists. Calls are made one after another on the
+calling thread, and the NextDraw API paces the moves of each call against the
+EBB's motion FIFO itself. Preparing a vertex list is cheap next to that serial
+traffic, so nothing is prepared ahead on another thread. Progress is reported
+on a time interval, with throughput in lines (segments) per second.
+"""
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+import time
+
+import numpy as np
+
+
+@dataclass
+class StreamStats:
+    """Counters for a finished (or interrupted) stream."""
+
+    paths: int = 0
+    segments: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def segments_per_second(self) -> float:
+        """Sustained throughput over the whole stream."""
+        return self.segments / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.paths} paths, {self.segments} lines in {self.elapsed:.2f}s "
+            f"({self.segments_per_second:.1f} lines/s)"
+        )
+
+
+class ProgressReporter:
+    """Print progress at most once per interval, with rate and time remaining."""
+
+    def __init__(
+        self,
+        total_segments: int,
+        interval: float = 2.0,
+        emit: Callable[[str], None] = print,
+    ):
+        self.total_segments = total_segments
+        self.interval = interval
+        self.emit = emit
+        self.start = time.perf_counter()
+        self._last = self.start
+
+    def update(self, stats: StreamStats, force: bool = False):
+        """Report progress if the interval has passed (or force is set)."""
+        now = time.perf_counter()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        elapsed = now - self.start
+        rate = stats.segments / elapsed if elapsed > 0 else 0.0
+        remaining = (self.total_segments - stats.segments) / rate if rate > 0 else 0.0
+        percent = stats.segments / self.total_segments if self.total_segments else 1.0
+        self.emit(
+            f"  Progress: {stats.segments}/{self.total_segments} lines ({percent:.0%}), "
+            f"{rate:.1f} lines/s, ~{remaining:.0f}s remaining"
+        )
+
+
+def stream_polylines(
+    nd,
+    polylines: Sequence[np.ndarray],
+    offset: tuple[float, float] = (0.0, 0.0),
+    progress: ProgressReporter | None = None,
+    on_command: Callable[[int], None] | None = None,
+) -> StreamStats:
+    """
+    Plot polylines through nd.draw_path, one call per polyline.
+
+    nd is a connected interactive-mode NextDraw (or a stand-in with the same
+    draw_path method). on_command, if given, is called with the number of
+    paths drawn so far after each draw_path returns. Returns the stream
+    statistics, also when interrupted.
+    """
+    stats = StreamStats()
+    start = time.perf_counter()
+    try:
+        for polyline in polylines:
+            nd.draw_path((np.asarray(polyline) + offset).tolist())
+            stats.paths += 1
+            stats.segments += len(polyline) - 1
+            if on_command is not None:
+                on_command(stats.paths)
+            if progress is not None:
+                progress.update(stats)
+    finally:
+        stats.elapsed = time.perf_counter() - start
+        if progress is not None:
+            progress.update(stats, force=True)
+    return stats
@@ -0,0 +1,228 @@
+"""
+Streaming SVG writer.
+
+SVGStreamWriter writes the document header, Inkscape layer groups and compact
+<path> data straight to a buffered file handle, instead of building an element
+tree and serializing it at the end. Segment and polyline data are formatted in
+fixed-size chunks, so memory use stays flat however many segments are written.
+
+Path data is emitted compactly: absolute M/L commands with no separating
+spaces between commands, coordinates rounded to a configurable number of
+decimals with trailing zeros stripped (for example "M10 2.5L30.25 2.5").
+Cubic Bezier curves use a single C command followed by all of their control
+points.
+"""
+
+from collections.abc import Iterable
+from contextlib import contextmanager
+import io
+import re
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+
+INKSCAPE_NS = "http://www.inkscape.org/namespaces/inkscape"
+
+# Segments (or vertices) formatted per chunk, and per <path> element
+CHUNK_SIZE = 4096
+MAX_SEGMENTS_PER_PATH = 50_000
+
+# Trailing zeros after the decimal point, then a bare trailing point
+_TRAILING_ZEROS = re.compile(r"(\.\d*?)0+(?!\d)")
+_BARE_POINT = re.compile(r"\.(?!\d)")
+# Negative zero left over after rounding
+_NEGATIVE_ZERO = re.compile(r"(?<![\d.])-0(?![\d.])")
+
+
+def _strip_zeros(text: str) -> str:
+    """Shorten formatted numbers: 2.500 -> 2.5, 3.000 -> 3, -0.000 -> 0."""
+    text = _BARE_POINT.sub("", _TRAILING_ZEROS.sub(r"\1", text))
+    return _NEGATIVE_ZERO.sub("0", text)
+
+
+def _attributes(attrs: dict) -> str:
+    """Format XML attributes; underscores in keys become hyphens."""
+    return "".join(
+        f" {key.replace('_', '-')}={quoteattr(str(value))}"
+        for key, value in attrs.items()
+        if value is not None
+    )
+
+
+class SVGStreamWriter:
+    """
+    Write an SVG document incrementally.
+
+    Use as a context manager; the closing tags are written on exit:
+
+        with SVGStreamWriter("out.svg", 152.4, 152.4, units="mm") as svg:
+            with svg.layer("lines", stroke="black", stroke_width="0.3mm", fill="none"):
+                svg.write_segments(lines)
+    """
+
+    def __init__(
+        self,
+        target,
+        width: float,
+        height: float,
+        units: str = "",
+        view_box: tuple[float, float, float, float] | None = None,
+        precision: int = 3,
+        buffer_size: int = 1 << 16,
+        background: str | None = None,
+    ):
+        self._owns_file = isinstance(target, str)
+        if self._owns_file:
+            self._file = open(target, "w", encoding="utf-8", buffering=buffer_size)  # noqa: SIM115
+        else:
+            self._file = target
+        self.precision = precision
+        self._layer_count = 0
+        self._open_groups = 0
+
+        view_box = view_box or (0, 0, width, height)
+        header = {
+            "xmlns": "http://www.w3.org/2000/svg",
+            "xmlns:inkscape": INKSCAPE_NS,
+            "width": f"{self._num(width)}{units}",
+            "height": f"{self._num(height)}{units}",
+            "viewBox": " ".join(self._num(v) for v in view_box),
+        }
+        self._write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        self._write(f"<svg{_attributes(header)}>\n")
+        if background:
+            self._write(f'<rect width="100%" height="100%" fill={quoteattr(background)}/>\n')
+
+    def __enter__(self) -> "SVGStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _write(self, text: str):
+        self._file.write(text)
+
+    def _num(self, value: float) -> str:
+        return _strip_zeros(f"{value:.{self.precision}f}")
+
+    def close(self):
+        """Close any open groups and the document."""
+        if self._file is None:
+            return
+        while self._open_groups:
+            self.end_group()
+        self._write("</svg>\n")
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+        self._file = None
+
+    def comment(self, text: str):
+        """Write an XML comment."""
+        self._write(f"<!-- {text} -->\n")
+
+    def begin_group(self, **attrs):
+        """Open a plain <g> element; keyword arguments become attributes."""
+        self._write(f"<g{_attributes(attrs)}>\n")
+        self._open_groups += 1
+
+    def end_group(self):
+        """Close the innermost open group or layer."""
+        self._write("</g>\n")
+        self._open_groups -= 1
+
+    def begin_layer(self, label: str, **attrs):
+        """Open an Inkscape layer; layers are numbered in the order they are opened."""
+        self._layer_count += 1
+        layer_attrs = {
+            "id": f"layer{self._layer_count}",
+            "inkscape:groupmode": "layer",
+            "inkscape:label": label,
+        }
+        self.begin_group(**layer_attrs, **attrs)
+
+    @contextmanager
+    def layer(self, label: str, **attrs):
+        """Context manager around begin_layer/end_group."""
+        self.begin_layer(label, **attrs)
+        try:
+            yield self
+        finally:
+            self.end_group()
+
+    def write_path_d(self, d: str, **attrs):
+        """Write a <path> with precomputed path data."""
+        self._write(f'<path d="{d}"{_attributes(attrs)}/>\n')
+
+    def _write_path_chunks(self, chunks: Iterable[str], attrs: dict):
+        """Write one <path> whose data arrives as a sequence of strings."""
+        self._write('<path d="')
+        for chunk in chunks:
+            self._write(chunk)
+        self._write(f'"{_attributes(attrs)}/>\n')
+
+    def _segment_chunks(self, segments: np.ndarray) -> Iterable[str]:
+        num = f"%.{self.precision}f"
+        row_format = f"M{num} {num}L{num} {num}"
+        for start in range(0, len(segments), CHUNK_SIZE):
+            chunk = segments[start : start + CHUNK_SIZE]
+            text = (row_format * len(chunk)) % tuple(chunk.ravel().tolist())
+            yield _strip_zeros(text)
+
+    def write_segments(self, segments, **attrs):
+        """
+        Write (x1, y1, x2, y2) segments as compact <path> elements.
+
+        segments is an (N, 4) array or an iterable of such arrays, consumed one
+        at a time. Each <path> holds at most MAX_SEGMENTS_PER_PATH segments.
+        """
+        if isinstance(segments, np.ndarray):
+            segments = [segments]
+        for block in segments:
+            block = np.asarray(block, dtype=np.float64).reshape(-1, 4)
+            for start in range(0, len(block), MAX_SEGMENTS_PER_PATH):
+                part = block[start : start + MAX_SEGMENTS_PER_PATH]
+                if len(part):
+                    self._write_path_chunks(self._segment_chunks(part), attrs)
+
+    def polyline_d(self, points, closed: bool = False) -> str:
+        """Compact path data for one polyline; closed outlines end with Z."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if closed and len(points) > 1 and np.array_equal(points[0], points[-1]):
+            points = points[:-1]
+        out = io.StringIO()
+        num = f"%.{self.precision}f"
+        out.write(_strip_zeros(f"M{num} {num}" % tuple(points[0])))
+        for start in range(1, len(points), CHUNK_SIZE):
+            chunk = points[start : start + CHUNK_SIZE]
+            text = (f"L{num} {num}" * len(chunk)) % tuple(chunk.ravel().tolist())
+            out.write(_strip_zeros(text))
+        if closed:
+            out.write("Z")
+        return out.getvalue()
+
+    def cubic_d(self, points) -> str:
+        """Compact path data for (3n + 1, 2) cubic Bezier control points."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        num = f"%.{self.precision}f"
+        out = io.StringIO()
+        out.write(_strip_zeros(f"M{num} {num}" % tuple(points[0])))
+        out.write("C")
+        for start in range(1, len(points), CHUNK_SIZE):
+            chunk = points[start : start + CHUNK_SIZE]
+            text = " ".join([f"{num} {num}"] * len(chunk)) % tuple(chunk.ravel().tolist())
+            out.write((" " if start > 1 else "") + _strip_zeros(text))
+        return out.getvalue()
+
+    def write_cubic(self, points, **attrs):
+        """Write a (3n + 1, 2) run of cubic Bezier control points as a <path>."""
+        self.write_path_d(self.cubic_d(points), **attrs)
+
+    def write_polyline(self, points, closed: bool = False, **attrs):
+        """Write one (K, 2) polyline as a <path>."""
+        self.write_path_d(self.polyline_d(points, closed), **attrs)
+
+    def write_polylines(self, polylines: Iterable, **attrs):
+        """Write several polylines as subpaths of a single <path>."""
+        self._write_path_chunks((self.polyline_d(p) for p in polylines), attrs)
@@ -0,0 +1,25 @@
+import pytest
+
+from cache import CacheInfo, LRUCache, combine_info
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    assert cache.get_or_compute("a", lambda: -1) == 1  # a is now most recent
+    cache.get_or_compute("c", lambda: 3)
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.info()[:4] == (1, 3, 2, 2)
+
+
+def test_combine_info_sums_worker_caches():
+    total = combine_info([CacheInfo(3, 1, 8, 4), CacheInfo(1, 3, 8, 2)])
+    assert total == (4, 4, 16, 6)
+    assert total.hit_rate == 0.5
+    assert combine_info([]) == (0, 0, 0, 0)
+
+
+def test_lru_rejects_empty_size():
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
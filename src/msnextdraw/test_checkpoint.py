@@ -0,0 +1,75 @@
+import json
+
+import numpy as np
+import pytest
+
+from checkpoint import CheckpointJournal, job_fingerprint
+from fakeplotter import OfflinePlotter
+from pipeline import PlotOptionError, plot_drawing
+from sol11 import sol11_drawing
+
+
+def test_journal_writes_every_interval(tmp_path):
+    path = tmp_path / "ck.json"
+    journal = CheckpointJournal(str(path), "job", total=10, interval=3)
+    journal.record(2)
+    assert not path.exists()
+    journal.record(3)
+    assert json.loads(path.read_text())["completed"] == 3
+    journal.record(4)
+    assert CheckpointJournal.load(str(path)).completed == 3
+    journal.flush()
+    assert CheckpointJournal.load(str(path)).completed == 4
+    journal.finish()
+    assert CheckpointJournal.load(str(path)) is None
+    journal.finish()  # already gone
+
+
+def test_fingerprint_depends_on_commands_and_offset():
+    polylines = [np.array([[0.0, 0.0], [1.0, 1.0]]), np.array([[2.0, 0.0], [3.0, 0.0]])]
+    job = job_fingerprint(polylines, (0, 0))
+    assert job == job_fingerprint([p.copy() for p in polylines], (0, 0))
+    assert job != job_fingerprint(polylines[::-1], (0, 0))
+    assert job != job_fingerprint(polylines, (1, 0))
+
+
+def test_interrupted_plot_resumes_where_it_stopped(tmp_path, monkeypatch):
+    path = str(tmp_path / "ck.json")
+    drawn = []
+    fail_at = {"count": 7}
+    draw_path = OfflinePlotter.draw_path
+
+    def interrupting_draw_path(self, vertices):
+        if len(drawn) == fail_at["count"]:
+            raise KeyboardInterrupt
+        drawn.append(vertices[0])
+        return draw_path(self, vertices)
+
+    monkeypatch.setattr(OfflinePlotter, "draw_path", interrupting_draw_path)
+    with pytest.raises(KeyboardInterrupt):
+        plot_drawing(sol11_drawing(), offline=True, checkpoint=path, checkpoint_interval=5)
+    assert CheckpointJournal.load(path).completed == 7
+
+    fail_at["count"] = None
+    plot_drawing(sol11_drawing(), offline=True, checkpoint=path, resume=True)
+    assert CheckpointJournal.load(path) is None
+
+    full = []
+    monkeypatch.setattr(
+        OfflinePlotter, "draw_path", lambda self, vertices: full.append(vertices[0])
+    )
+    plot_drawing(sol11_drawing(), offline=True, checkpoint=None)
+    assert drawn == full
+
+
+def test_resume_rejects_a_different_plot(tmp_path):
+    path = str(tmp_path / "ck.json")
+    CheckpointJournal(path, "another job", total=10, completed=4).flush()
+    with pytest.raises(PlotOptionError, match="different plot"):
+        plot_drawing(sol11_drawing(), offline=True, checkpoint=path, resume=True)
+    with pytest.raises(PlotOptionError, match="No checkpoint"):
+        plot_drawing(
+            sol11_drawing(), offline=True, checkpoint=str(tmp_path / "none.json"), resume=True
+        )
+    with pytest.raises(PlotOptionError, match="needs a checkpoint"):
+        plot_drawing(sol11_drawing(), offline=True, checkpoint=None, resume=True)
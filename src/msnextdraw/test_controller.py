@@ -0,0 +1,50 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from controller import PlotCancelled, PlotterController
+
+POLYLINES = [np.array([[i, 0.0], [i, 10.0], [i + 0.5, 10.0]]) for i in range(37)]
+
+
+def test_cancel_stops_batch_mid_stream():
+    async def main():
+        async with PlotterController(offline=True) as plotter:
+            draw_path = plotter.nd.draw_path
+            drawn = []
+
+            def cancelling_draw_path(vertices):
+                draw_path(vertices)
+                drawn.append(vertices)
+                if len(drawn) == 5:
+                    plotter.cancel()
+
+            plotter.nd.draw_path = cancelling_draw_path
+            with pytest.raises(PlotCancelled) as excinfo:
+                await asyncio.wait_for(plotter.draw_paths(POLYLINES), timeout=10)
+            assert excinfo.value.paths == 5
+            assert len(drawn) == 5
+
+            # The worker is free again for the next batch
+            stats = await asyncio.wait_for(plotter.draw_paths(POLYLINES[:3]), timeout=10)
+            assert stats.paths == 3
+
+    asyncio.run(main())
+
+
+def test_task_cancel_stops_batch_mid_stream():
+    async def main():
+        async with PlotterController(offline=True) as plotter:
+            job = asyncio.create_task(plotter.draw_paths(POLYLINES * 4))
+            async for event in plotter.events():
+                if event.paths >= 5:
+                    job.cancel()
+                    break
+            with pytest.raises(asyncio.CancelledError):
+                await asyncio.wait_for(job, timeout=10)
+            drawn = [c for c in plotter.nd.commands if c[0] == "draw_path"]
+            assert 5 <= len(drawn) < len(POLYLINES) * 4
+            assert plotter.nd.pen_up
+
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+
+import drawing
+from drawing import (
+    Drawing,
+    Layer,
+    available_drawings,
+    create_drawing,
+    get_drawing_factory,
+    register_drawing,
+)
+from tree import ChristmasTree
+
+
+@dataclass
+class Square:
+    width: float = 10.0
+    height: float = 10.0
+    units: str = "mm"
+
+    def layers(self) -> list[Layer]:
+        outline = np.array([[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]], dtype=np.float64)
+        return [Layer("outline", [outline * self.width])]
+
+
+class FakeEntryPoint:
+    def __init__(self, name: str, target):
+        self.name = name
+        self.target = target
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        return self.target
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """A fresh registry, with one fake installed drawing."""
+    monkeypatch.setattr(drawing, "_registry", {})
+    ep = FakeEntryPoint("square", Square)
+    monkeypatch.setattr(
+        drawing, "entry_points", lambda group: [ep] if group == drawing.ENTRY_POINT_GROUP else []
+    )
+    return ep
+
+
+def test_builtin_drawings_are_available(registry):
+    assert available_drawings() == ["sol11", "square", "tree"]
+    assert get_drawing_factory("tree") is ChristmasTree
+    tree = create_drawing("tree", width=200, height=300)
+    assert isinstance(tree, ChristmasTree)
+    assert (tree.width, tree.height) == (200, 300)
+
+
+def test_entry_point_is_loaded_once(registry):
+    assert get_drawing_factory("square") is Square
+    assert get_drawing_factory("square") is Square
+    assert registry.loads == 1
+    assert create_drawing("square", width=4).layers()[0].paths[0].max() == 4
+
+
+def test_register_drawing_directly_and_as_decorator(registry):
+    register_drawing("box", Square)
+
+    @register_drawing("big-box")
+    def big_box(**params):
+        return Square(width=100, height=100, **params)
+
+    assert big_box().width == 100  # the decorator returns the function unchanged
+    assert get_drawing_factory("box") is Square
+    assert create_drawing("big-box").width == 100
+    assert {"box", "big-box"} <= set(available_drawings())
+
+
+def test_registered_name_overrides_builtin(registry):
+    register_drawing("tree", Square)
+    assert isinstance(create_drawing("tree"), Square)
+
+
+def test_unknown_drawing_lists_the_available_ones(registry):
+    with pytest.raises(KeyError, match=r"Unknown drawing 'spiral'; available: sol11, square, tree"):
+        get_drawing_factory("spiral")
+    assert "spiral" not in drawing._registry
+
+
+def test_drawing_protocol():
+    assert isinstance(Square(), Drawing)
+    assert isinstance(ChristmasTree(), Drawing)
+    assert not isinstance(object(), Drawing)
+
+
+def test_layer_from_segments():
+    segments = np.arange(12, dtype=np.float64).reshape(3, 4)
+    layer = Layer.from_segments("lines", segments, {"stroke": "black"})
+    assert layer.paths.shape == (3, 2, 2)
+    np.testing.assert_array_equal(layer.paths[1], [[4, 5], [6, 7]])
+    assert np.shares_memory(layer.paths, segments)
+    assert layer.segments is not None and np.shares_memory(layer.segments, segments)
+    assert layer.segment_count == 3
+    assert layer.style == {"stroke": "black"}
+
+
+def test_layer_segments_only_for_single_segment_paths():
+    polylines = [np.zeros((3, 2)), np.zeros((2, 2)), np.zeros((1, 2))]
+    assert Layer("mixed", polylines).segments is None
+    assert Layer("triples", np.zeros((4, 3, 2))).segments is None
+    assert Layer("mixed", polylines).segment_count == 3
@@ -0,0 +1,99 @@
+import pytest
+
+from fakeplotter import FakeEBB
+
+
+class FakeClock:
+    """Manual clock: sleeping advances it instantly."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+def make_ebb(**kwargs) -> tuple[FakeEBB, FakeClock]:
+    clock = FakeClock()
+    kwargs.setdefault("command_latency", 0.0)
+    return FakeEBB(clock=clock, sleep=clock.sleep, **kwargs), clock
+
+
+def test_each_command_costs_its_latency():
+    ebb, clock = make_ebb(command_latency=0.004)
+    ebb.command("V")
+    ebb.command("QS")
+    assert clock.now == pytest.approx(0.008)
+    ebb.time_scale = 0.5
+    ebb.command("V")
+    assert clock.now == pytest.approx(0.010)
+    assert ebb.stats.commands == 3
+    assert [c.time for c in ebb.log] == pytest.approx([0.004, 0.008, 0.010])
+
+
+@pytest.mark.parametrize("depth", [0, 1, 3])
+def test_host_blocks_only_when_the_fifo_is_full(depth):
+    ebb, clock = make_ebb(fifo_depth=depth)
+    for _ in range(depth + 1):
+        ebb.command("SM,100,10,10")
+    # One executing plus depth waiting: accepted without blocking
+    assert clock.now == 0
+    assert ebb.fifo_count == depth + 1
+    ebb.command("SM,100,10,10")
+    # The next one waits for the first move to finish
+    assert clock.now == pytest.approx(0.1)
+    assert ebb.stats.blocked_time == pytest.approx(0.1)
+    assert ebb.stats.max_fifo == depth + 1
+    ebb.wait_idle()
+    assert clock.now == pytest.approx(0.1 * (depth + 2))
+    assert ebb.command("QS") == f"{10 * (depth + 2)},{10 * (depth + 2)}"
+
+
+def test_qm_and_qs_follow_the_moves_in_progress():
+    ebb, clock = make_ebb(fifo_depth=2)
+    assert ebb.command("QM") == "QM,0,0,0,0"
+    ebb.command("SM,100,200,-100")
+    ebb.command("SM,100,200,0")
+    assert ebb.command("QM") == "QM,1,1,1,1"
+    clock.now = 0.05
+    assert ebb.command("QS") == "100,-50"
+    clock.now = 0.15
+    assert ebb.command("QM") == "QM,1,1,1,0"
+    ebb.wait_idle()
+    assert ebb.command("QM") == "QM,0,0,0,0"
+    assert ebb.command("QS") == "400,-100"
+
+
+def test_home_move_returns_to_origin_or_target():
+    ebb, clock = make_ebb()
+    ebb.command("SM,50,300,-100")
+    ebb.command("HM,1000")
+    ebb.wait_idle()
+    assert ebb.command("QS") == "0,0"
+    # 300 steps at 1000 steps/s after the 50 ms move
+    assert clock.now == pytest.approx(0.35)
+    ebb.command("HM,1000,40,20")
+    ebb.wait_idle()
+    assert ebb.command("QS") == "40,20"
+
+
+def test_emergency_stop_keeps_the_steps_taken():
+    ebb, clock = make_ebb(fifo_depth=2)
+    ebb.command("SM,100,100,100")
+    ebb.command("SM,100,100,100")
+    clock.now = 0.05
+    assert ebb.command("ES") == "2,0,0,0,0"
+    assert ebb.fifo_count == 0
+    clock.now = 1.0
+    assert ebb.command("QS") == "50,50"
+
+
+def test_bad_commands_are_rejected():
+    ebb, _ = make_ebb()
+    with pytest.raises(ValueError, match="Unknown command"):
+        ebb.command("ZZ,1")
+    with pytest.raises(ValueError, match="duration"):
+        ebb.command("SM,0,10,10")
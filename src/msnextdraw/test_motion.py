@@ -0,0 +1,47 @@
+import math
+
+import numpy as np
+
+from motion import junction_speeds, plan_polyline, plan_polylines
+from simulate import MachineConfig
+
+
+def test_junction_speeds_by_turn_angle():
+    directions = np.array([[1.0, 0.0], [1.0, 0.0], [0.0, 1.0], [0.0, -1.0]])
+    straight, right_angle, reversal = junction_speeds(directions, 5.0, 10.0, 0.01)
+    assert straight == 5.0
+    sin_half = math.sqrt(0.5)
+    assert math.isclose(right_angle, math.sqrt(10.0 * 0.01 * sin_half / (1 - sin_half)))
+    assert reversal == 0.0
+
+
+def test_plan_polyline_runs_rest_to_rest_within_limits():
+    config = MachineConfig()
+    points = np.column_stack([np.linspace(0, 4, 200), 0.1 * np.sin(np.linspace(0, 6, 200))])
+    plan = plan_polyline(points, config)
+    accel, speed = config.pendown_accel, config.pendown_speed
+    assert plan.entry[0] == 0 and plan.exit[-1] == 0
+    assert np.all(plan.peak <= speed + 1e-9)
+    np.testing.assert_allclose(plan.entry[1:], plan.exit[:-1])
+    # No move changes speed faster than the acceleration allows
+    reach = 2 * accel * plan.lengths + 1e-9
+    assert np.all(np.abs(plan.exit**2 - plan.entry**2) <= reach)
+    assert len(plan.moves()) == len(plan.durations)
+
+
+def test_lookahead_beats_rest_to_rest_on_dense_curves():
+    config = MachineConfig()
+    points = np.column_stack([np.linspace(0, 4, 400), np.zeros(400)])
+    lookahead = plan_polyline(points, config).time
+    rest_to_rest = sum(plan_polyline(points[i : i + 2], config).time for i in range(399))
+    single_move = plan_polyline(points[[0, -1]], config).time
+    assert math.isclose(lookahead, single_move, rel_tol=1e-6)
+    assert lookahead < rest_to_rest / 5
+
+
+def test_plan_polylines_adds_pen_up_travel_and_return():
+    config = MachineConfig()
+    polylines = [np.array([[1.0, 1.0], [2.0, 1.0]]), np.array([[2.0, 2.0], [1.0, 2.0]])]
+    plans = plan_polylines(polylines, config)
+    assert [p.pen_up for p in plans] == [True, False, True, False, True]
+    assert plans[-1].points[-1].tolist() == [0.0, 0.0]
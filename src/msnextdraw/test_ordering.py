@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+import ordering
+from ordering import optimize_polylines, optimize_segments, order_paths, travel_distance
+
+
+def random_polylines(count: int, seed: int = 0) -> list[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return [rng.uniform(0, 100, size=(rng.integers(2, 6), 2)) for _ in range(count)]
+
+
+def tour_travel(starts, ends, order, flipped, origin=(0.0, 0.0)) -> float:
+    flip = flipped[:, None]
+    return travel_distance(
+        np.where(flip, ends[order], starts[order]),
+        np.where(flip, starts[order], ends[order]),
+        origin,
+    )
+
+
+def test_every_polyline_drawn_once_and_flips_are_real():
+    polylines = random_polylines(300)
+    result, stats = optimize_polylines(polylines, origin=(-5.0, -5.0))
+    assert len(result) == len(polylines) == stats.path_count
+
+    remaining = {i: p for i, p in enumerate(polylines)}
+    flips = 0
+    for path in result:
+        match = next(
+            i
+            for i, p in remaining.items()
+            if np.array_equal(path, p) or np.array_equal(path, p[::-1])
+        )
+        flips += not np.array_equal(path, remaining.pop(match))
+    assert not remaining
+    assert flips > 0
+
+    starts = np.array([p[0] for p in result])
+    ends = np.array([p[-1] for p in result])
+    assert stats.travel_after == pytest.approx(travel_distance(starts, ends, (-5.0, -5.0)))
+    assert stats.travel_after <= stats.travel_before
+
+
+def test_two_opt_never_lengthens_the_greedy_tour():
+    rng = np.random.default_rng(1)
+    starts, ends = rng.uniform(0, 50, (400, 2)), rng.uniform(0, 50, (400, 2))
+    greedy = tour_travel(starts, ends, *order_paths(starts, ends, two_opt=False))
+    for window in (2, 7, ordering.TWO_OPT_WINDOW):
+        order, flipped = order_paths(starts, ends, window=window)
+        assert sorted(order.tolist()) == list(range(400))
+        assert tour_travel(starts, ends, order, flipped) <= greedy + 1e-9
+
+
+def test_segments_are_flipped_in_place():
+    segments = np.array([[10.0, 0.0, 1.0, 0.0], [20.0, 0.0, 11.0, 0.0]])
+    result, stats = optimize_segments(segments)
+    # From the origin, both segments are best drawn left to right
+    assert result.tolist() == [[1.0, 0.0, 10.0, 0.0], [11.0, 0.0, 20.0, 0.0]]
+    assert stats.travel_after < stats.travel_before
+
+
+def test_worse_heuristic_tour_falls_back_to_input_order(monkeypatch):
+    starts = np.array([[1.0, 0.0], [3.0, 0.0], [5.0, 0.0]])
+    ends = starts + [1.0, 0.0]
+
+    def backwards(starts, ends, origin):
+        return np.arange(len(starts))[::-1].copy(), np.zeros(len(starts), dtype=bool)
+
+    monkeypatch.setattr(ordering, "_greedy_order", backwards)
+    order, flipped = order_paths(starts, ends, two_opt=False)
+    assert order.tolist() == [0, 1, 2]
+    assert not flipped.any()
+
+
+@pytest.mark.parametrize(
+    "polylines",
+    [
+        [],
+        [np.array([[3.0, 4.0], [5.0, 6.0]])],
+        [np.array([[2.0, 2.0], [2.0, 2.0]])] * 3,  # zero-length, all endpoints coincide
+        [np.array([[0.0, 0.0], [0.0, 0.0]]), np.array([[0.0, 0.0], [1.0, 1.0]])],
+    ],
+)
+def test_degenerate_input(polylines):
+    result, stats = optimize_polylines(polylines)
+    assert len(result) == len(polylines)
+    assert stats.travel_after <= stats.travel_before + 1e-9
+    empty, _ = optimize_segments(np.zeros((0, 4)))
+    assert empty.shape == (0, 4)
@@ -0,0 +1,75 @@
+import numpy as np
+
+from paths import MIN_GAP_INCHES, build_polylines, merge_collinear, quantize_polylines
+
+
+def test_merge_collinear_joins_touching_segments():
+    segments = np.array([[0, 0, 1, 0], [2, 0, 1, 0], [3, 0, 4, 0]], dtype=float)
+    merged = merge_collinear(segments, 0.01)
+    assert sorted(merged.tolist()) == [[0, 0, 2, 0], [3, 0, 4, 0]]
+
+
+def test_merge_collinear_absorbs_offset_noise():
+    # Offsets either side of 0.05 differ only by floating-point noise
+    segments = np.array([[0, 0.05 - 1e-12, 1, 0.05 - 1e-12], [1, 0.05 + 1e-12, 2, 0.05 + 1e-12]])
+    merged = merge_collinear(segments, 0.1)
+    assert len(merged) == 1
+    assert merged[0, 0] == 0 and merged[0, 2] == 2
+
+
+def test_merge_collinear_keeps_separate_lines():
+    segments = np.array([[0, 0, 1, 0], [1, 0.5, 2, 0.5]], dtype=float)
+    assert len(merge_collinear(segments, 0.1)) == 2
+
+
+def test_merge_collinear_keeps_dense_parallel_lines():
+    # Parallel lines closer together than the join tolerance stay separate
+    tolerance = MIN_GAP_INCHES * 25.4
+    spacing = 0.1
+    for direction in ((1.0, 0.0), (1.0, 1.0) / np.sqrt(2)):
+        u = np.asarray(direction)
+        normal = np.array([-u[1], u[0]])
+        starts = np.arange(200)[:, None] * spacing * normal
+        # Each line drawn as two touching halves, which should be joined
+        segments = np.concatenate(
+            [
+                np.hstack([starts, starts + 10 * u]),
+                np.hstack([starts + 10 * u, starts + 20 * u]),
+            ]
+        )
+        merged = merge_collinear(segments, tolerance)
+        ink = np.hypot(merged[:, 2] - merged[:, 0], merged[:, 3] - merged[:, 1]).sum()
+        assert len(merged) == 200
+        assert np.isclose(ink, 200 * 20)
+
+
+def test_build_polylines_keeps_ink_when_endpoints_crowd():
+    # Diagonals whose ends sit 0.1 apart along both axes, closer than the tolerance
+    tolerance = MIN_GAP_INCHES * 25.4
+    d = 1 + 0.1 * np.arange(100)
+    segments = np.column_stack([d, np.zeros_like(d), np.zeros_like(d), d])
+    polylines = build_polylines(segments, tolerance)
+    edges = np.concatenate([np.hypot(*np.diff(p, axis=0).T) for p in polylines])
+    drawn = edges[edges > tolerance]
+    assert np.allclose(np.sort(drawn), np.sort(d * np.sqrt(2)))
+
+
+def test_quantize_snaps_and_drops_what_collapses():
+    polylines = [
+        np.array([[0.0, 0.0], [0.4, 0.1], [1.04, 0.0], [2.0, 2.0]]),
+        np.array([[5.0, 5.0], [5.2, 5.3]]),  # rounds to a single point
+        np.array([[2.0, 2.0], [1.0, 0.0], [0.0, 0.0]]),  # first one reversed
+    ]
+    result, stats = quantize_polylines(polylines, 1.0)
+    assert len(result) == 1
+    assert result[0].tolist() == [[0, 0], [1, 0], [2, 2]]
+    assert (stats.moves_before, stats.polylines_removed, stats.duplicates_removed) == (6, 1, 1)
+    assert stats.moves_removed == 1 + 1 + 2
+
+
+def test_quantize_rounds_absolute_positions_without_drift():
+    # 1000 moves of 0.4 steps each: every one rounds to 0 or 1, the end stays exact
+    points = np.column_stack([np.arange(1001) * 0.4, np.zeros(1001)])
+    (result,), _ = quantize_polylines([points], 1.0)
+    assert result[-1].tolist() == [400, 0]
+    assert np.all(np.diff(result[:, 0]) == 1)
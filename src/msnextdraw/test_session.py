@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from checkpoint import CheckpointJournal
+from fakeplotter import OfflinePlotter
+from pipeline import plot_drawing
+from session import PlotterSession
+from sol11 import sol11_drawing
+
+
+def drop_link_at(monkeypatch, call: int):
+    """Make the offline plotter lose its connection during the given draw_path call."""
+    calls = {"count": 0}
+    draw_path = OfflinePlotter.draw_path
+
+    def dropping_draw_path(self, vertices):
+        calls["count"] += 1
+        if calls["count"] == call:
+            self.connected = False
+        return draw_path(self, vertices)
+
+    monkeypatch.setattr(OfflinePlotter, "draw_path", dropping_draw_path)
+
+
+def test_dropped_link_reconnects_homes_and_resumes(tmp_path, monkeypatch):
+    path = str(tmp_path / "ck.json")
+    drop_link_at(monkeypatch, 10)
+    with PlotterSession(offline=True, retry_delay=0) as session:
+        with pytest.raises(ConnectionError):
+            plot_drawing(sol11_drawing(), checkpoint=path, checkpoint_interval=1, session=session)
+        assert session.reconnects == 1
+        # The carriage was sent home and the software position taken from there
+        assert session.nd.usb_query("QS") == "0,0"
+        assert session.nd.current_pos() == (0.0, 0.0)
+        assert CheckpointJournal.load(path).completed == 9
+
+        plot_drawing(sol11_drawing(), checkpoint=path, resume=True, session=session)
+        assert session.jobs == 1
+        assert CheckpointJournal.load(path) is None
+        assert session.nd.usb_query("QS") == "0,0"
+
+
+def test_job_errors_do_not_reconnect():
+    def broken_job(nd):
+        nd.moveto(10, 10)
+        raise RuntimeError("bug in the job")
+
+    with PlotterSession(offline=True, retry_delay=0) as session:
+        with pytest.raises(RuntimeError, match="bug in the job"):
+            session.run(broken_job)
+        assert session.reconnects == 0
+        assert session.nd.current_pos() == (10, 10)
+
+
+def test_heartbeat_survives_connection_errors(capsys):
+    with PlotterSession(offline=True, retry_delay=0) as session:
+        plotter = session.nd.nd
+        query = plotter.usb_query
+
+        def failing_query(command):
+            if command == "QS":
+                raise OSError("serial port closed")
+            return query(command)
+
+        plotter.usb_query = failing_query
+        plotter.connected = False  # the next probe fails and reconnects
+        session.start_heartbeat(0.01)
+        deadline = time.monotonic() + 5
+        while "serial port closed" not in capsys.readouterr().out:
+            assert time.monotonic() < deadline, "heartbeat never reported the error"
+            time.sleep(0.01)
+        assert session._heartbeat.is_alive()
+        plotter.usb_query = query
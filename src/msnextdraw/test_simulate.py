@@ -0,0 +1,82 @@
+import math
+
+import numpy as np
+import pytest
+
+from simulate import MachineConfig, simulate_polylines, simulate_segments, trapezoid_times
+
+# Default MachineConfig, worked out by hand (inches, seconds)
+PENDOWN_SPEED = 8.6979 * 0.25
+PENDOWN_ACCEL = 40.0 * 0.75
+PENUP_SPEED = 8.6979 * 0.75
+PENUP_ACCEL = 60.0 * 0.75
+# Servo travel of 20% (60 - 40) over a 200 ms full sweep, at rates 50 and 75
+LOWER_MS = 200 * 0.2 * 100 / 50
+RAISE_MS = 200 * 0.2 * 100 / 75
+
+
+def test_trapezoid_and_triangle_profiles():
+    speed, accel = 2.0, 10.0  # cruise is reached after 0.2 in, so ramps take 0.4 in
+    times = trapezoid_times([1.0, 0.4, 0.1, 0.0], speed, accel)
+    # Cruise 0.6 in at 2 in/s, plus 0.2 s ramping each way
+    assert times[0] == pytest.approx(0.6 / 2 + 2 * 0.2)
+    assert times[1] == pytest.approx(2 * 0.2)
+    # Accelerate over 0.05 in and back: t = 2 * sqrt(2 * 0.05 / 10)
+    assert times[2] == pytest.approx(2 * math.sqrt(0.01))
+    assert times[3] == 0
+
+
+@pytest.mark.parametrize("units, scale", [(0, 1.0), (1, 2.54), (2, 25.4)])
+def test_single_line_time(units, scale):
+    line = np.array([[0.0, 0.0], [2.0, 0.0]]) * scale
+    result = simulate_polylines([line], MachineConfig(units=units))
+
+    # Both 2 in moves are long enough to reach cruise speed
+    assert PENDOWN_SPEED**2 / PENDOWN_ACCEL < 2 and PENUP_SPEED**2 / PENUP_ACCEL < 2
+    pendown_s = 2 / PENDOWN_SPEED + PENDOWN_SPEED / PENDOWN_ACCEL
+    penup_s = 2 / PENUP_SPEED + PENUP_SPEED / PENUP_ACCEL  # back home; none to the start
+    assert result.pendown_time_ms == pytest.approx(pendown_s * 1000)
+    assert result.penup_time_ms == pytest.approx(penup_s * 1000)
+    assert result.servo_time_ms == pytest.approx(LOWER_MS + RAISE_MS)
+    assert result.time_ms == pytest.approx((pendown_s + penup_s) * 1000 + LOWER_MS + RAISE_MS)
+    assert result.pendown_distance == pytest.approx(2 * scale)
+    assert result.penup_distance == pytest.approx(2 * scale)
+    assert result.lift_count == 1
+
+
+def test_short_line_time():
+    # 0.1 in does not reach cruise speed: accelerate to the midpoint, then brake
+    result = simulate_polylines([[[1, 1], [1.1, 1]]], return_home=False)
+    assert result.pendown_time_ms == pytest.approx(2 * math.sqrt(0.1 / PENDOWN_ACCEL) * 1000)
+    assert result.penup_time_ms == pytest.approx(
+        trapezoid_times(math.sqrt(2), PENUP_SPEED, PENUP_ACCEL) * 1000
+    )
+
+
+def test_lookahead_matches_rest_to_rest_on_a_straight_line():
+    line = [[0, 0], [1, 0], [2, 0]]
+    rest = simulate_polylines([[[0, 0], [2, 0]]])
+    planned = simulate_polylines([line], lookahead=True)
+    assert planned.pendown_time_ms == pytest.approx(rest.pendown_time_ms, rel=1e-3)
+    # Without lookahead the same line stops at its middle vertex
+    stopping = simulate_polylines([line])
+    assert stopping.pendown_time_ms > planned.pendown_time_ms
+
+
+def test_pen_lifts_and_delays():
+    polylines = [
+        [[0, 0], [1, 0], [1, 1]],
+        [[2, 2]],  # a single vertex draws nothing and is skipped
+        [[3, 0], [4, 0]],
+        [[5, 0], [5, 0.5], [6, 0.5], [6, 0]],
+    ]
+    config = MachineConfig(pen_delay_up=100, pen_delay_down=20)
+    result = simulate_polylines(polylines, config)
+    assert result.lift_count == 3
+    assert result.servo_time_ms == pytest.approx(3 * (LOWER_MS + 20 + RAISE_MS + 100))
+    assert result.pendown_distance == pytest.approx(2 + 1 + 2)
+    # Home -> (0, 0) -> ... (1, 1) -> (3, 0) -> ... (4, 0) -> (5, 0) -> ... (6, 0) -> home
+    assert result.penup_distance == pytest.approx(0 + math.sqrt(5) + 1 + 6)
+
+    assert simulate_segments(np.array([[0, 0, 1, 0], [1, 0, 2, 0]])).lift_count == 2
+    assert simulate_polylines([]).time_ms == 0
@@ -0,0 +1,78 @@
+import argparse
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from cache import LRUCache
+from fakeplotter import OfflinePlotter
+from sol11 import LINE_HORIZONTAL, Sol11Drawing, Sol11LineBuffer, parse_frame_range, run_plotter
+
+
+@pytest.mark.parametrize(
+    ("spec", "frames"),
+    [
+        ("3", range(3, 4)),
+        ("0:600", range(0, 600)),
+        (":6:2", range(0, 6, 2)),
+        ("10:0:-1", range(10, 0, -1)),
+    ],
+)
+def test_parse_frame_range(spec, frames):
+    assert parse_frame_range(spec) == frames
+
+
+@pytest.mark.parametrize("spec", ["10:5", "1:", "a:3", "0:5:0", "1:2:3:4"])
+def test_parse_frame_range_rejects(spec):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_frame_range(spec)
+
+
+def test_cached_family_arrays_are_read_only():
+    drawing = Sol11Drawing(cache=LRUCache())
+    lines = drawing._family_array(LINE_HORIZONTAL, 1)
+    assert not lines.flags.writeable
+    assert drawing._family_array(LINE_HORIZONTAL, 1) is lines
+    # Results built from cached arrays are the caller's own
+    assert drawing.get_family_array(LINE_HORIZONTAL).flags.writeable
+
+
+@pytest.mark.parametrize(
+    ("width", "height", "spacing"),
+    [
+        (500.0, 500.0, 50.0),
+        # Spacing that divides neither half size: line counts change as phases move
+        (500.0, 380.0, 37.3),
+    ],
+)
+def test_line_buffer_matches_fresh_geometry(width, height, spacing):
+    drawing = Sol11Drawing(width=width, height=height, line_spacing=spacing)
+    # No resync, so drift would build up over the frames
+    buffer = Sol11LineBuffer(drawing, resync_interval=10**9)
+    # Enough frames for every phase to wrap around the spacing several times
+    for frame in range(1, 400):
+        drawing.advance_animation()
+        buffer.update()
+        # A new drawing at the same phases computes every line from scratch
+        expected = replace(drawing).get_all_lines_array()
+        actual = buffer.get_all_lines_array()
+        assert actual.shape == expected.shape, f"frame {frame}"
+        np.testing.assert_allclose(actual, expected, atol=1e-6, err_msg=f"frame {frame}")
+
+
+def test_plotter_returns_home_between_layers_only_for_pen_changes(monkeypatch):
+    homes = []
+    moveto = OfflinePlotter.moveto
+
+    def recording_moveto(self, x, y):
+        if (x, y) == (0, 0):
+            homes.append((x, y))
+        return moveto(self, x, y)
+
+    monkeypatch.setattr(OfflinePlotter, "moveto", recording_moveto)
+    monkeypatch.setattr("builtins.input", lambda prompt: "")
+    run_plotter(offline=True, checkpoint=None)
+    assert len(homes) == 1
+    homes.clear()
+    run_plotter(offline=True, checkpoint=None, pause_between_layers=True)
+    assert len(homes) == 5  # before each of the 4 pen changes, then at the end
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from fakeplotter import FakeEBB
+from motion import plan_polyline
+from pipeline import centered_offset, plan_drawing
+from simulate import MachineConfig
+from sol11 import sol11_drawing
+from stepplan import (
+    LAYER,
+    MOVE,
+    PEN_DOWN,
+    SLICE_MS,
+    StepPlan,
+    _move_records,
+    compile_plan,
+    replay_plan,
+)
+
+
+@pytest.fixture(scope="module")
+def plan() -> StepPlan:
+    drawing = sol11_drawing()
+    offset = centered_offset(drawing)
+    return compile_plan(plan_drawing(drawing, offset), offset, metadata={"drawing": "sol11"})
+
+
+class EBBPlotter:
+    """usb_command straight to a FakeEBB that runs as fast as it is fed."""
+
+    def __init__(self):
+        self.ebb = FakeEBB(command_latency=0.0, time_scale=0.0)
+
+    def usb_command(self, command: str):
+        self.ebb.command(command)
+
+
+def test_plan_round_trips_through_bytes(plan):
+    data = plan.to_bytes()
+    loaded = StepPlan.from_bytes(data)
+    assert loaded.metadata == plan.metadata
+    assert np.array_equal(loaded.records, plan.records)
+    assert loaded.line_count == plan.line_count
+
+
+def test_corrupt_plans_are_rejected(plan):
+    data = bytearray(plan.to_bytes())
+    with pytest.raises(ValueError, match="truncated"):
+        StepPlan.from_bytes(bytes(data[:-20]))
+    with pytest.raises(ValueError, match="Not a step plan"):
+        StepPlan.from_bytes(b"NOTAPLAN" + bytes(data[8:]))
+    data[len(data) // 2] ^= 0xFF
+    with pytest.raises(ValueError, match="checksum"):
+        StepPlan.from_bytes(bytes(data))
+
+
+def test_plan_returns_home_and_starts_every_layer(plan):
+    moves = plan.records[plan.records["kind"] == MOVE]
+    assert moves["steps1"].sum() == 0 and moves["steps2"].sum() == 0
+    assert plan.records["kind"][0] == LAYER
+    assert np.count_nonzero(plan.records["kind"] == PEN_DOWN) > 0
+
+
+def test_moves_follow_the_velocity_profile():
+    config = MachineConfig(units=2)
+    steps_per_mm = config.step_scale / 25.4
+    motion = plan_polyline(np.array([[0.0, 0.0], [200.0, 0.0]]), config, pen_up=True)
+    records = _move_records(motion, config.penup_accel, steps_per_mm)
+
+    assert records["steps1"].sum() == round(200 * steps_per_mm)
+    assert records["value"].sum() == pytest.approx(motion.time * 1000, abs=len(records))
+    # Speed (mm/s) of each slice: starts and ends slow, cruises at the peak
+    speeds = (records["steps1"] / steps_per_mm) / (records["value"] / 1000)
+    accel_mm = config.penup_accel * 25.4
+    assert speeds[0] < accel_mm * SLICE_MS / 1000 * 1.5
+    assert speeds[-1] < accel_mm * SLICE_MS / 1000 * 1.5
+    assert speeds.max() == pytest.approx(motion.peak.max() * 25.4, rel=0.01)
+    # No jump between slices beyond what the acceleration allows, plus rounding
+    assert np.abs(np.diff(speeds)).max() < accel_mm * SLICE_MS / 1000 * 1.5
+
+
+def test_slices_stay_few_per_polyline(plan):
+    # A shallow EBB FIFO needs each SM command to run long enough to cover the
+    # next USB round trip, so speed changes must not shatter into tiny slices
+    polylines = np.count_nonzero(plan.records["kind"] == PEN_DOWN)
+    moves = plan.records[plan.records["kind"] == MOVE]
+    assert len(moves) / polylines < 25
+    assert plan.metadata["slice_ms"] == SLICE_MS
+    assert np.median(moves["value"]) >= SLICE_MS
+
+
+def test_replay_ends_home_with_every_command_sent(plan):
+    nd = EBBPlotter()
+    stats = replay_plan(nd, plan)
+    assert nd.ebb.step_position() == (0, 0)
+    assert stats.segments == plan.line_count
+    sent = [c.command for c in nd.ebb.log if c.command.startswith("SM,")]
+    assert len(sent) == np.count_nonzero(plan.records["kind"] == MOVE)
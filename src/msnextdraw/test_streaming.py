@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from streaming import stream_polylines
+
+
+class RecordingPlotter:
+    """draw_path stand-in that records vertex lists and can fail on the nth call."""
+
+    def __init__(self, fail_on: int | None = None):
+        self.fail_on = fail_on
+        self.paths = []
+
+    def draw_path(self, vertices):
+        if len(self.paths) + 1 == self.fail_on:
+            raise OSError("USB link dropped")
+        self.paths.append(vertices)
+
+
+def polylines(count: int) -> list[np.ndarray]:
+    return [np.array([[i, 0.0], [i, 1.0], [i + 0.5, 1.0]]) for i in range(count)]
+
+
+def test_stream_sends_every_polyline_in_order():
+    nd = RecordingPlotter()
+    stats = stream_polylines(nd, polylines(40), (10, 20))
+    assert stats.paths == 40
+    assert stats.segments == 80
+    assert nd.paths[0] == [[10, 20], [10, 21], [10.5, 21]]
+    assert [p[0][0] for p in nd.paths] == [10 + i for i in range(40)]
+
+
+def test_plotter_error_stops_the_stream():
+    nd = RecordingPlotter(fail_on=5)
+    with pytest.raises(OSError):
+        stream_polylines(nd, polylines(37))
+    assert len(nd.paths) == 4
+
+
+def test_bad_polyline_is_raised_after_the_ones_before_it():
+    # The 4th polyline is (2, 3)-shaped and cannot be offset by an (x, y) pair
+    bad = polylines(6)
+    bad[3] = np.zeros((2, 3))
+    nd = RecordingPlotter()
+    with pytest.raises(ValueError):
+        stream_polylines(nd, bad)
+    assert len(nd.paths) == 3
+
+
+def test_on_command_can_stop_the_stream():
+    class Stop(Exception):
+        pass
+
+    def on_command(paths: int):
+        if paths == 3:
+            raise Stop
+
+    nd = RecordingPlotter()
+    with pytest.raises(Stop):
+        stream_polylines(nd, polylines(100), on_command=on_command)
+    assert len(nd.paths) == 3
@@ -0,0 +1,88 @@
+import io
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+
+import svgstream
+from svgstream import INKSCAPE_NS, SVGStreamWriter, _strip_zeros
+
+SVG = "{http://www.w3.org/2000/svg}"
+GROUPMODE = f"{{{INKSCAPE_NS}}}groupmode"
+LABEL = f"{{{INKSCAPE_NS}}}label"
+
+
+def write(**kwargs) -> tuple[SVGStreamWriter, io.StringIO]:
+    out = io.StringIO()
+    return SVGStreamWriter(out, 100, 50, units="mm", **kwargs), out
+
+
+def path_counts(d: str) -> tuple[int, int]:
+    """Number of M and L commands in compact path data."""
+    return d.count("M"), d.count("L")
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("2.500", "2.5"),
+        ("3.000", "3"),
+        ("-0.000", "0"),
+        ("-0.500", "-0.5"),
+        ("10.000", "10"),
+        ("100", "100"),
+        ("M10.000 2.500L30.250 -0.000", "M10 2.5L30.25 0"),
+    ],
+)
+def test_strip_zeros(text, expected):
+    assert _strip_zeros(text) == expected
+
+
+def test_coordinates_are_rounded_to_precision():
+    svg, _ = write(precision=2)
+    assert svg.polyline_d([[1.234, 5.0], [-0.001, 10.5]]) == "M1.23 5L0 10.5"
+    assert svg.polyline_d([[0, 0], [1, 0], [1, 1], [0, 0]], closed=True) == "M0 0L1 0L1 1Z"
+    assert svg.cubic_d([[0, 0], [1, 2], [3, 4], [5.5, 6]]) == "M0 0C1 2 3 4 5.5 6"
+
+
+def test_document_round_trips_through_element_tree(monkeypatch):
+    monkeypatch.setattr(svgstream, "CHUNK_SIZE", 7)
+    monkeypatch.setattr(svgstream, "MAX_SEGMENTS_PER_PATH", 20)
+    rng = np.random.default_rng(0)
+    segments = rng.uniform(0, 50, (45, 4))
+    polyline = rng.uniform(0, 50, (30, 2))
+
+    svg, out = write(background="white")
+    with svg:
+        with svg.layer("lines", stroke="black", stroke_width="0.3mm", fill="none"):
+            svg.write_segments([segments[:25], segments[25:]])
+        with svg.layer("outline", stroke="red"):
+            svg.begin_group(transform="translate(1 2)")
+            svg.write_polyline(polyline, closed=True)
+            svg.end_group()
+        svg.begin_layer("open")  # left open; close() must end it
+    root = ET.fromstring(out.getvalue())
+
+    assert root.get("width") == "100mm"
+    assert root.get("viewBox") == "0 0 100 50"
+    layers = [g for g in root.iter(f"{SVG}g") if g.get(GROUPMODE) == "layer"]
+    assert [g.get(LABEL) for g in layers] == ["lines", "outline", "open"]
+    assert [g.get("id") for g in layers] == ["layer1", "layer2", "layer3"]
+    assert layers[0].get("stroke-width") == "0.3mm"
+    assert [g for g in root if g.tag == f"{SVG}g"] == layers
+
+    # Blocks of 25 and 20 segments, split at MAX_SEGMENTS_PER_PATH
+    line_paths = layers[0].findall(f"{SVG}path")
+    assert [path_counts(p.get("d")) for p in line_paths] == [(20, 20), (5, 5), (20, 20)]
+    d = "".join(p.get("d") for p in line_paths)
+    numbers = np.array(d.replace("M", " ").replace("L", " ").split(), dtype=float)
+    np.testing.assert_allclose(numbers.reshape(-1, 4), segments, atol=5e-4)
+
+    # The polyline sits inside the nested group, inside its layer
+    (nested,) = layers[1].findall(f"{SVG}g")
+    assert nested.get("transform") == "translate(1 2)"
+    (outline,) = nested.findall(f"{SVG}path")
+    d = outline.get("d")
+    assert path_counts(d) == (1, 29) and d.endswith("Z")
+    numbers = np.array(d[1:-1].replace("L", " ").split(), dtype=float).reshape(-1, 2)
+    np.testing.assert_allclose(numbers, polyline, atol=5e-4)
@@ -0,0 +1,94 @@
+import pytest
+
+from fakeplotter import OfflinePlotter
+from tracker import PositionTracker, parse_steps
+
+
+@pytest.fixture
+def plotter() -> OfflinePlotter:
+    plotter = OfflinePlotter(call_latency=0.0, vertex_latency=0.0)
+    plotter.connect()
+    return plotter
+
+
+def board_steps(plotter: OfflinePlotter) -> tuple[int, int]:
+    return parse_steps(plotter.ebb.command("QS"))
+
+
+def test_position_is_answered_locally(plotter):
+    nd = PositionTracker(plotter)
+    nd.draw_path([(0.0, 0.0), (1.0, 0.5), (2.0, 1.5)])
+    sent = len(plotter.commands)
+    assert nd.current_pos() == (2.0, 1.5)
+    assert nd.turtle_pos() == (2.0, 1.5)
+    assert nd.pen_up
+    assert len(plotter.commands) == sent
+    assert nd.expected_steps == board_steps(plotter)
+    assert nd.reconcile() == (0, 0)
+    assert nd.corrections == 0
+
+
+def test_raw_moves_are_tracked_and_later_moves_land(plotter):
+    nd = PositionTracker(plotter)
+    nd.moveto(1.0, 1.0)
+    nd.usb_command("SM,10,300,-100")
+    assert nd.expected_steps == board_steps(plotter)
+    # The session still believes it is at (1, 1)
+    assert plotter.current_pos() == (1.0, 1.0)
+    assert nd.session_offset == pytest.approx(
+        (nd.current_pos()[0] - 1.0, nd.current_pos()[1] - 1.0)
+    )
+    nd.moveto(0.0, 0.0)
+    assert board_steps(plotter) == (0, 0)
+
+    nd.usb_command("HM,3200")
+    assert nd.current_pos() == (0.0, 0.0)
+    assert nd.reconcile() == (0, 0)
+
+
+def test_reconcile_adopts_drift_and_later_moves_land(plotter):
+    nd = PositionTracker(plotter, tolerance_steps=2)
+    nd.moveto(1.0, 0.5)
+    # Steps the tracker and the session never saw
+    plotter.ebb.command("SM,10,400,0")
+    assert nd.reconcile() == (-400, 0)
+    assert nd.corrections == 1
+    assert nd.expected_steps == board_steps(plotter)
+    assert nd.current_pos() != (1.0, 0.5)
+    assert plotter.current_pos() == (1.0, 0.5)
+
+    # Later moves are computed from the adopted position, so they land exactly
+    nd.moveto(0.0, 0.0)
+    assert board_steps(plotter) == (0, 0)
+    assert nd.reconcile() == (0, 0)
+
+
+def test_small_drift_within_tolerance_is_kept(plotter):
+    nd = PositionTracker(plotter, tolerance_steps=2)
+    nd.moveto(1.0, 0.5)
+    plotter.ebb.command("SM,1,1,1")
+    assert nd.reconcile() == (-1, -1)
+    assert nd.corrections == 0
+    assert nd.current_pos() == (1.0, 0.5)
+
+
+def test_reconcile_runs_on_its_interval(plotter):
+    nd = PositionTracker(plotter, reconcile_interval=0.0)
+    nd.moveto(1.0, 0.5)
+    nd.lineto(2.0, 0.5)
+    assert nd.reconciliations == 2
+    assert PositionTracker(plotter).reconciliations == 0
+
+
+def test_busy_motors_do_not_count_as_a_reconciliation(plotter, monkeypatch):
+    nd = PositionTracker(plotter, reconcile_interval=0.0)
+    query = plotter.usb_query
+    monkeypatch.setattr(plotter, "usb_query", lambda q: "QM,0,1,0,0" if q == "QM" else query(q))
+    before = nd.last_reconciled
+    assert nd.reconcile() is None
+    assert nd.reconciliations == 0
+    assert nd.last_reconciled == before
+    monkeypatch.setattr(plotter, "usb_query", query)
+    assert nd.reconcile() == (0, 0)
+    assert nd.reconciliations == 1
+    assert nd.last_reconciled > before
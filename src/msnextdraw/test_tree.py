@@ -0,0 +1,146 @@
+import numpy as np
+import pytest
+
+from paths import point_segment_distance, simplify_polyline
+from tree import (
+    COMPONENT_STYLES,
+    END_Y,
+    NUM_WAVES,
+    POINTS_PER_WAVE,
+    START_Y,
+    WIDTH,
+    ChristmasTree,
+    _distance_to_polyline,
+    fit_tree_beziers,
+    generate_christmas_tree_paths,
+    sample_tree_curve,
+    tree_curve,
+)
+
+
+def curve_t(points: np.ndarray) -> np.ndarray:
+    """Recover tree_curve's t from points on it; y is linear in t."""
+    return (np.asarray(points)[:, 1] - START_Y) / (END_Y - START_Y)
+
+
+def deviation(polyline: np.ndarray, samples: int = 64) -> float:
+    """Largest distance from the densely sampled sine to the polyline segment spanning it."""
+    t = curve_t(polyline)
+    worst = 0.0
+    for i in range(len(polyline) - 1):
+        curve = tree_curve(np.linspace(t[i], t[i + 1], samples + 1))
+        worst = max(worst, point_segment_distance(curve, polyline[i], polyline[i + 1]).max())
+    return worst
+
+
+def assert_follows_curve(polyline: np.ndarray):
+    """The polyline runs the length of the sine, top to bottom, through points on it."""
+    t = curve_t(polyline)
+    assert t[0] == pytest.approx(0) and t[-1] == pytest.approx(1)
+    assert np.all(np.diff(t) > 0)
+    np.testing.assert_allclose(polyline, tree_curve(t), atol=1e-9)
+
+
+@pytest.mark.parametrize("tolerance", [0.05, 0.1, 0.5, 2.0])
+def test_adaptive_sampling_stays_within_tolerance(tolerance):
+    sampled = sample_tree_curve(WIDTH, tolerance)
+    assert_follows_curve(sampled)
+    assert deviation(sampled) <= tolerance
+
+
+def test_adaptive_sampling_beats_fixed_resolution():
+    fixed = sample_tree_curve(WIDTH, None)
+    assert len(fixed) == NUM_WAVES * POINTS_PER_WAVE + 1
+    assert_follows_curve(fixed)
+    # As accurate as the fixed resolution, with fewer vertices
+    adaptive = sample_tree_curve(WIDTH, deviation(fixed))
+    assert len(adaptive) < len(fixed) / 2
+
+
+@pytest.mark.parametrize("tolerance", [0.1, 0.5])
+@pytest.mark.parametrize("simplify_tolerance", [0.2, 1.0])
+def test_simplified_tree_stays_within_tolerance(tolerance, simplify_tolerance):
+    sampled = sample_tree_curve(WIDTH, tolerance)
+    simplified = generate_christmas_tree_paths(
+        tolerance=tolerance, simplify_tolerance=simplify_tolerance
+    )["tree"]
+    np.testing.assert_array_equal(simplified, simplify_polyline(sampled, simplify_tolerance))
+    assert_follows_curve(simplified)
+    assert len(simplified) < len(sampled)
+
+    # Every dropped vertex lies within simplify_tolerance of the segment replacing it
+    kept = np.searchsorted(curve_t(sampled), curve_t(simplified))
+    for i, (start, end) in enumerate(zip(kept[:-1], kept[1:], strict=True)):
+        dropped = sampled[start + 1 : end]
+        if len(dropped):
+            distance = point_segment_distance(dropped, simplified[i], simplified[i + 1])
+            assert distance.max() <= simplify_tolerance
+    # so the simplified tree is within both tolerances of the true sine
+    assert deviation(simplified, 1024) <= tolerance + simplify_tolerance
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {},
+        {"tolerance": None},
+        {"tolerance": 0.5, "simplify_tolerance": 1.0},
+    ],
+)
+def test_sampling_options_keep_components(params):
+    paths = generate_christmas_tree_paths(**params)
+    assert list(paths) == ["star", "tree", "trunk"]
+    assert len(paths["star"]) == 11 and paths["star"][0] == paths["star"][-1]
+    assert len(paths["trunk"]) == 5 and paths["trunk"][0] == paths["trunk"][-1]
+
+    layers = ChristmasTree(**params).layers()
+    assert [layer.name for layer in layers] == list(COMPONENT_STYLES)
+    assert [len(layer.paths) for layer in layers] == [1, 1, 1]
+    assert all(layer.curves is None for layer in layers)
+    np.testing.assert_array_equal(layers[1].paths[0], paths["tree"])
+
+
+def cubic_points(controls: np.ndarray, samples: int = 64) -> list[np.ndarray]:
+    """Each cubic of a (3n + 1, 2) control point run, evaluated at samples + 1 points."""
+    u = np.linspace(0, 1, samples + 1)[:, None]
+    basis = np.hstack([(1 - u) ** 3, 3 * (1 - u) ** 2 * u, 3 * (1 - u) * u**2, u**3])
+    return [basis @ controls[i : i + 4] for i in range(0, len(controls) - 1, 3)]
+
+
+@pytest.mark.parametrize("tolerance", [0.05, 0.1, 0.5])
+def test_bezier_fit_stays_within_tolerance(tolerance):
+    controls = fit_tree_beziers(WIDTH, tolerance)
+    assert (len(controls) - 1) % 3 == 0
+    # At least one cubic per half-period, joined end to end along the sine
+    assert (len(controls) - 1) // 3 >= 2 * NUM_WAVES
+    ends = controls[::3]
+    assert_follows_curve(ends)
+
+    for cubic, t0, t1 in zip(
+        cubic_points(controls), curve_t(ends)[:-1], curve_t(ends)[1:], strict=True
+    ):
+        curve = tree_curve(np.linspace(t0, t1, 513))
+        assert _distance_to_polyline(cubic, curve).max() <= tolerance
+        assert _distance_to_polyline(curve, cubic).max() <= tolerance
+
+
+def test_bezier_fit_is_smooth():
+    # Control points either side of each joint are collinear with it
+    controls = fit_tree_beziers(WIDTH)
+    before = controls[3:-1:3] - controls[2:-2:3]
+    after = controls[4::3] - controls[3:-1:3]
+    cross = before[:, 0] * after[:, 1] - before[:, 1] * after[:, 0]
+    assert np.all(np.abs(cross) <= 1e-6 * np.hypot(*before.T) * np.hypot(*after.T))
+    assert np.all((before * after).sum(axis=1) > 0)
+
+
+def test_bezier_tolerance_only_adds_curves():
+    plain = ChristmasTree().layers()
+    curved = ChristmasTree(bezier_tolerance=0.2).layers()
+    assert [layer.name for layer in curved] == [layer.name for layer in plain]
+    for a, b in zip(plain, curved, strict=True):
+        assert len(b.paths) == len(a.paths) == 1
+        np.testing.assert_array_equal(b.paths[0], a.paths[0])
+    assert [layer.curves is None for layer in curved] == [True, False, True]
+    (controls,) = curved[1].curves
+    np.testing.assert_array_equal(controls, fit_tree_beziers(WIDTH, 0.2))
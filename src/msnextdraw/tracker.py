@@ -0,0 +1,230 @@
+"""
+Host-side position tracking for an interactive NextDraw.
+
+current_pos() and turtle_pos() on a live session, or a step position query,
+can each cost a USB round trip, which a progress display or checkpoint
+polling in a loop cannot afford. PositionTracker wraps the session and
+mirrors its motion state from the commands sent through it: moveto, lineto,
+draw_path, penup/pendown, and raw SM, XM, HM, CS and SP commands sent with
+usb_command. Position and pen queries are answered from that local state,
+with no I/O, from any thread.
+
+The mirror is reconciled with the board on demand (reconcile()), or every
+reconcile_interval seconds, checked after each motion command on the thread
+sending them: the step counters are read with QS and, when the motors are
+idle and disagree with the tracked steps by more than tolerance_steps, the
+board's position is adopted. While the motors are still busy, the check is
+tried again after a tenth of the interval.
+
+The wrapped session computes every moveto, lineto and draw_path from its own
+idea of the position, which raw moves and corrections bypass, and the
+interactive API has no public way to tell it otherwise. So the tracker keeps
+the difference between the real position and the session's (session_offset)
+and shifts the coordinates of every move it forwards by it: the session's
+relative move then lands on the intended point. The session clips moves to
+its travel bounds in its own coordinates, so a large offset can clip moves
+near the edges; re-homing (connect() again with the carriage at home, as
+PlotterSession.resync does) clears it.
+
+    nd = PositionTracker(connect_plotter(), reconcile_interval=5.0)
+    nd.draw_path(vertices)
+    x, y = nd.current_pos()  # no round trip
+"""
+
+import threading
+import time
+
+from simulate import UNITS_PER_INCH, MachineConfig
+
+
+def parse_steps(response: str) -> tuple[int, int]:
+    """Motor step counts from a QS reply, such as "1203,397"."""
+    values = response.strip().split(",")
+    return int(values[-2]), int(values[-1])
+
+
+class PositionTracker:
+    """Wrap an interactive-mode NextDraw, mirroring its position and pen state locally."""
+
+    def __init__(
+        self,
+        nd,
+        reconcile_interval: float | None = None,
+        tolerance_steps: int = 2,
+        step_scale: float = MachineConfig().step_scale,
+    ):
+        self.nd = nd
+        self.reconcile_interval = reconcile_interval
+        self.tolerance_steps = tolerance_steps
+        self.step_scale = step_scale
+        self.reconciliations = 0
+        self.corrections = 0
+        self.last_reconciled = time.monotonic()
+        self._retry_at = self.last_reconciled  # no earlier attempt after a busy QM
+        self.drift_steps = (0, 0)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def __getattr__(self, name):
+        # Everything not tracked (options, connect errors, ...) is the session's own
+        return getattr(self.nd, name)
+
+    def _reset(self):
+        """Home, pen up: the state connect() assumes."""
+        with self._lock:
+            self._position = (0.0, 0.0)
+            self._pen_up = True
+            self._motor = (0, 0)  # motor steps from home
+            self._qs_origin = (0, 0)  # motor steps where the board's counters read 0, 0
+            self._session_offset = (0.0, 0.0)  # real position minus the session's
+
+    # Local queries ----------------------------------------------------------
+
+    def current_pos(self) -> tuple[float, float]:
+        """Last commanded position, in the session's units."""
+        return self._position
+
+    def turtle_pos(self) -> tuple[float, float]:
+        """Last commanded turtle position; the same as current_pos here."""
+        return self._position
+
+    @property
+    def pen_up(self) -> bool:
+        """Whether the pen was last commanded up."""
+        return self._pen_up
+
+    @property
+    def session_offset(self) -> tuple[float, float]:
+        """How far the real position is from the one the wrapped session believes."""
+        return self._session_offset
+
+    @property
+    def expected_steps(self) -> tuple[int, int]:
+        """What a QS query should report once the motors are idle."""
+        with self._lock:
+            return (self._motor[0] - self._qs_origin[0], self._motor[1] - self._qs_origin[1])
+
+    # State updates ----------------------------------------------------------
+
+    def _steps_per_unit(self) -> float:
+        return self.step_scale / UNITS_PER_INCH[self.nd.options.units]
+
+    def _moved_to(self, x: float, y: float, pen_up: bool):
+        scale = self._steps_per_unit()
+        sx, sy = round(x * scale), round(y * scale)
+        with self._lock:
+            self._position = (x, y)
+            self._pen_up = pen_up
+            self._motor = (sx + sy, sx - sy)
+
+    def _set_motor(self, motor: tuple[int, int]):
+        """Adopt a motor step position the session did not command, deriving the XY position."""
+        scale = self._steps_per_unit()
+        with self._lock:
+            x = (motor[0] + motor[1]) / (2 * scale)
+            y = (motor[0] - motor[1]) / (2 * scale)
+            ox, oy = self._session_offset
+            self._session_offset = (ox + x - self._position[0], oy + y - self._position[1])
+            self._motor = motor
+            self._position = (x, y)
+
+    def _to_session(self, x: float, y: float) -> tuple[float, float]:
+        """Where to send the session so that it moves to (x, y)."""
+        ox, oy = self._session_offset
+        return x - ox, y - oy
+
+    def _after_motion(self):
+        if self.reconcile_interval is None:
+            return
+        now = time.monotonic()
+        if now - self.last_reconciled < self.reconcile_interval or now < self._retry_at:
+            return
+        if self.reconcile() is None:
+            # The motors were busy; ask again a little later, not after every command
+            self._retry_at = now + self.reconcile_interval / 10
+
+    # Tracked session calls -------------------------------------------------
+
+    def connect(self) -> bool:
+        connected = self.nd.connect()
+        self._reset()
+        return connected
+
+    def penup(self):
+        self.nd.penup()
+        self._pen_up = True
+
+    def pendown(self):
+        self.nd.pendown()
+        self._pen_up = False
+
+    def moveto(self, x: float, y: float):
+        self.nd.moveto(*self._to_session(x, y))
+        self._moved_to(x, y, pen_up=True)
+        self._after_motion()
+
+    def lineto(self, x: float, y: float):
+        self.nd.lineto(*self._to_session(x, y))
+        self._moved_to(x, y, pen_up=False)
+        self._after_motion()
+
+    def draw_path(self, vertex_list: list):
+        if self._session_offset == (0.0, 0.0):
+            self.nd.draw_path(vertex_list)
+        else:
+            self.nd.draw_path([list(self._to_session(x, y)) for x, y in vertex_list])
+        if len(vertex_list) >= 2:
+            x, y = vertex_list[-1]
+            self._moved_to(x, y, pen_up=True)
+            self._after_motion()
+
+    def usb_command(self, command: str):
+        self.nd.usb_command(command)
+        name, *args = command.strip().split(",")
+        name = name.upper()
+        if name == "SM":
+            steps2 = int(args[2]) if len(args) > 2 else 0
+            self._set_motor((self._motor[0] + int(args[1]), self._motor[1] + steps2))
+        elif name == "XM":
+            axis_a, axis_b = int(args[1]), int(args[2])
+            self._set_motor((self._motor[0] + axis_a + axis_b, self._motor[1] + axis_a - axis_b))
+        elif name == "HM":
+            target = (int(args[1]), int(args[2])) if len(args) > 2 else (0, 0)
+            self._set_motor((self._qs_origin[0] + target[0], self._qs_origin[1] + target[1]))
+        elif name == "CS":
+            with self._lock:
+                self._qs_origin = self._motor
+        elif name == "SP":
+            self._pen_up = args[0] == "1"
+        elif name == "TP":
+            self._pen_up = not self._pen_up
+        else:
+            return
+        self._after_motion()
+
+    def usb_query(self, query: str) -> str:
+        return self.nd.usb_query(query)
+
+    # Reconciliation ---------------------------------------------------------
+
+    def reconcile(self) -> tuple[int, int] | None:
+        """
+        Compare the tracked steps with the board's (QS), adopting the board's on a mismatch.
+
+        Returns the drift in steps (tracked minus board), or None while the
+        motors are still running queued moves and the counters are expected
+        to lag. Only a completed comparison counts as a reconciliation.
+        """
+        motion = self.nd.usb_query("QM").strip().split(",")
+        if any(value != "0" for value in motion[1:]):
+            return None
+        self.last_reconciled = time.monotonic()
+        self.reconciliations += 1
+        board = parse_steps(self.nd.usb_query("QS"))
+        expected = self.expected_steps
+        drift = (expected[0] - board[0], expected[1] - board[1])
+        self.drift_steps = drift
+        if max(abs(drift[0]), abs(drift[1])) > self.tolerance_steps:
+            self.corrections += 1
+            self._set_motor((board[0] + self._qs_origin[0], board[1] + self._qs_origin[1]))
+        return drift
@@ -1,98 +1,297 @@
 """
 Draw a sine wave of increasing amplitude and eccentricity so that it resembles
 a Christmas tree. Output the result as an SVG file.
+
+    python tree.py                                  # adaptive sampling
+    python tree.py --tolerance 0.25 --simplify 0.2  # coarser, then simplified
+    python tree.py --fixed                          # POINTS_PER_WAVE per wave
+    python tree.py --bezier                         # sine as cubic Bezier curves
 """
 
+import argparse
+from dataclasses import dataclass
+import io
 import math
 
+import numpy as np
 
-def generate_christmas_tree_svg(filename="./output/christmas_tree.svg"):
-    # SVG dimensions
-    width = 400
-    height = 500
+from drawing import Layer
+from paths import simplify_polyline
+from pipeline import write_svg
+from svgstream import SVGStreamWriter
 
-    # Tree parameters
+# SVG dimensions
+WIDTH = 400
+HEIGHT = 500
+
+# SVG style of each component, drawn in this order
+COMPONENT_STYLES = {
+    "star": {"stroke": "#DAA520", "stroke_width": "2", "fill": "none"},
+    "tree": {
+        "stroke": "#228B22",
+        "stroke_width": "2.5",
+        "fill": "none",
+        "stroke_linecap": "round",
+        "stroke_linejoin": "round",
+    },
+    "trunk": {"stroke": "#8B4513", "stroke_width": "2", "fill": "none"},
+}
+
+
+# Tree parameters
+START_Y = 50  # Top of tree
+END_Y = 420  # Bottom of tree
+
+# Sine wave parameters
+NUM_WAVES = 12  # Number of complete sine cycles
+POINTS_PER_WAVE = 50  # Resolution of the fixed-resolution sine wave
+
+# Adaptive sampling: largest distance (SVG pixels) between the sine and the
+# polyline drawn for it, starting from this many samples per wave
+CHORD_TOLERANCE = 0.1
+INITIAL_SAMPLES_PER_WAVE = 8
+MAX_REFINEMENTS = 16
+
+# Bezier output: largest distance (SVG pixels) between the sine and its cubic
+# Bezier fit, checked at this many points per cubic
+BEZIER_TOLERANCE = 0.1
+BEZIER_CHECK_SAMPLES = 32
+MAX_BEZIER_SPLITS = 8
+
+
+def tree_curve(t, width=WIDTH) -> np.ndarray:
+    """Points of the tree's sine wave at progress t (0 at the top, 1 at the bottom), (N, 2)."""
+    t = np.asarray(t, dtype=np.float64)
     center_x = width / 2
-    start_y = 50  # Top of tree
-    end_y = 420  # Bottom of tree
 
-    # Sine wave parameters
-    num_waves = 12  # Number of complete sine cycles
-    points_per_wave = 50  # Resolution of the sine wave
-    total_points = num_waves * points_per_wave
+    # Y position (linear from top to bottom)
+    y = START_Y + t * (END_Y - START_Y)
 
-    # Generate the tree path using sine wave with increasing amplitude
-    path_points = []
+    # Amplitude increases as we go down (creates tree shape)
+    # Use exponential growth for more natural tree shape
+    base_amplitude = 5
+    max_amplitude = 150
+    amplitude = base_amplitude + (max_amplitude - base_amplitude) * (t**1.5)
+
+    # Add some eccentricity - vary the amplitude slightly with each wave
+    eccentricity = 1 + 0.15 * np.sin(t * np.pi * 3)
+    amplitude *= eccentricity
+
+    # Sine wave oscillation
+    angle = t * NUM_WAVES * 2 * np.pi
+    x = center_x + amplitude * np.sin(angle)
+
+    return np.column_stack([x, y])
+
+
+def sample_tree_curve(width=WIDTH, tolerance: float | None = CHORD_TOLERANCE) -> np.ndarray:
+    """
+    The tree's sine wave as a (K, 2) polyline.
+
+    With a tolerance (SVG pixels), intervals are split until every chord stays
+    within tolerance of the curve, so the narrow top of the tree gets few
+    vertices and the wide base more. Without one, every wave gets
+    POINTS_PER_WAVE samples.
+    """
+    if tolerance is None:
+        total_points = NUM_WAVES * POINTS_PER_WAVE
+        return tree_curve(np.arange(total_points + 1) / total_points, width)
+
+    t = np.linspace(0, 1, NUM_WAVES * INITIAL_SAMPLES_PER_WAVE + 1)
+    for _ in range(MAX_REFINEMENTS):
+        points = tree_curve(t, width)
+        mid_t = (t[:-1] + t[1:]) / 2
+        mid = tree_curve(mid_t, width)
+
+        # Chord error, measured at each interval's midpoint
+        chord = points[1:] - points[:-1]
+        offset = mid - points[:-1]
+        cross = chord[:, 0] * offset[:, 1] - chord[:, 1] * offset[:, 0]
+        error = np.abs(cross) / np.maximum(np.hypot(chord[:, 0], chord[:, 1]), 1e-12)
+
+        split = error > tolerance
+        if not split.any():
+            return points
+        t = np.sort(np.concatenate([t, mid_t[split]]))
+    return tree_curve(t, width)
+
+
+def _curve_velocity(t: np.ndarray, width=WIDTH) -> np.ndarray:
+    """Derivative of tree_curve with respect to t, by central differences."""
+    h = 1e-6
+    lo = np.clip(t - h, 0.0, 1.0)
+    hi = np.clip(t + h, 0.0, 1.0)
+    return (tree_curve(hi, width) - tree_curve(lo, width)) / (hi - lo)[:, None]
+
+
+def _distance_to_polyline(points: np.ndarray, polyline: np.ndarray) -> np.ndarray:
+    """Distance from each of the (N, 2) points to the nearest segment of a polyline."""
+    a = polyline[:-1][None]
+    ab = polyline[1:][None] - a
+    ap = points[:, None] - a
+    t = np.clip((ap * ab).sum(-1) / np.maximum((ab * ab).sum(-1), 1e-12), 0.0, 1.0)
+    d = ap - t[..., None] * ab
+    return np.hypot(d[..., 0], d[..., 1]).min(axis=1)
 
-    for i in range(total_points + 1):
-        # Progress from 0 to 1 (top to bottom)
-        t = i / total_points
 
-        # Y position (linear from top to bottom)
-        y = start_y + t * (end_y - start_y)
+def fit_tree_beziers(width=WIDTH, tolerance: float = BEZIER_TOLERANCE) -> np.ndarray:
+    """
+    The tree's sine wave as cubic Bezier control points, (3n + 1, 2).
 
-        # Amplitude increases as we go down (creates tree shape)
-        # Use exponential growth for more natural tree shape
-        base_amplitude = 5
-        max_amplitude = 150
-        amplitude = base_amplitude + (max_amplitude - base_amplitude) * (t**1.5)
+    Each half-period starts as one cubic matching the curve's end points and
+    tangents, and is split in half until the cubic and the curve stay within
+    tolerance (SVG pixels) of each other.
+    """
+    u = np.linspace(0, 1, BEZIER_CHECK_SAMPLES + 1)[:, None]
+    basis = np.hstack([(1 - u) ** 3, 3 * (1 - u) ** 2 * u, 3 * (1 - u) * u**2, u**3])
 
-        # Add some eccentricity - vary the amplitude slightly with each wave
-        eccentricity = 1 + 0.15 * math.sin(t * math.pi * 3)
-        amplitude *= eccentricity
+    knots = np.linspace(0, 1, 2 * NUM_WAVES + 1)
+    # Spans still to fit, last one on top, with their split depth
+    stack = [(t0, t1, 0) for t0, t1 in zip(knots[-2::-1], knots[:0:-1], strict=True)]
+    controls = [tree_curve([0.0], width)[0]]
+    while stack:
+        t0, t1, depth = stack.pop()
+        p0, p3 = tree_curve([t0, t1], width)
+        v0, v3 = _curve_velocity(np.array([t0, t1]), width) * (t1 - t0) / 3
+        cubic = np.array([p0, p0 + v0, p3 - v3, p3])
 
-        # Sine wave oscillation
-        angle = i / points_per_wave * 2 * math.pi
-        x = center_x + amplitude * math.sin(angle)
+        if depth < MAX_BEZIER_SPLITS:
+            bezier = basis @ cubic
+            curve = tree_curve(t0 + u[:, 0] * (t1 - t0), width)
+            error = max(
+                _distance_to_polyline(bezier, curve).max(),
+                _distance_to_polyline(curve, bezier).max(),
+            )
+            if error > tolerance:
+                tm = (t0 + t1) / 2
+                stack.append((tm, t1, depth + 1))
+                stack.append((t0, tm, depth + 1))
+                continue
+        controls.extend(cubic[1:])
+    return np.array(controls)
 
-        path_points.append((x, y))
 
-    # Create SVG path string
-    path_d = f"M {path_points[0][0]:.2f} {path_points[0][1]:.2f}"
-    for point in path_points[1:]:
-        path_d += f" L {point[0]:.2f} {point[1]:.2f}"
+def generate_christmas_tree_paths(
+    width=WIDTH,
+    height=HEIGHT,
+    tolerance: float | None = CHORD_TOLERANCE,
+    simplify_tolerance: float | None = None,
+):
+    """
+    Generate the tree geometry as point lists, keyed by component.
 
-    # Generate trunk points (simple rectangle as a path)
+    Returns {"star": ..., "tree": ..., "trunk": ...}; the star and trunk are
+    closed outlines, so their last point repeats the first. The tree is sampled
+    as in sample_tree_curve, then optionally simplified (Douglas-Peucker) with
+    simplify_tolerance.
+    """
+    # Tree parameters
+    center_x = width / 2
+
+    # Generate the tree path using sine wave with increasing amplitude
+    path_points = sample_tree_curve(width, tolerance)
+    if simplify_tolerance is not None:
+        path_points = simplify_polyline(path_points, simplify_tolerance)
+
+    # Generate trunk points (simple rectangle)
     trunk_width = 30
     trunk_height = 50
     trunk_x = center_x - trunk_width / 2
-    trunk_y = end_y
-    trunk_path = (
-        f"M {trunk_x:.2f} {trunk_y:.2f} L {trunk_x + trunk_width:.2f} {trunk_y:.2f} "
-        f"L {trunk_x + trunk_width:.2f} {trunk_y + trunk_height:.2f} "
-        f"L {trunk_x:.2f} {trunk_y + trunk_height:.2f} Z"
-    )
+    trunk_y = END_Y
+    trunk_points = [
+        (trunk_x, trunk_y),
+        (trunk_x + trunk_width, trunk_y),
+        (trunk_x + trunk_width, trunk_y + trunk_height),
+        (trunk_x, trunk_y + trunk_height),
+        (trunk_x, trunk_y),
+    ]
 
     # Generate star at top
-    star_points = generate_star(center_x, start_y - 15, 15, 7, 5)
-    star_path = f"M {star_points[0][0]:.2f} {star_points[0][1]:.2f}"
-    for point in star_points[1:]:
-        star_path += f" L {point[0]:.2f} {point[1]:.2f}"
-    star_path += " Z"
+    star_points = generate_star(center_x, START_Y - 15, 15, 7, 5)
+    star_points.append(star_points[0])
 
-    # Create SVG content
-    svg_content = f"""<?xml version="1.0" encoding="UTF-8"?>
-<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">
-  <rect width="100%" height="100%" fill="white"/>
+    return {"star": star_points, "tree": path_points, "trunk": trunk_points}
 
-  <!-- Star at top -->
-  <path d="{star_path}" fill="none" stroke="#DAA520" stroke-width="2"/>
 
-  <!-- Tree (sine wave) -->
-  <path d="{path_d}" fill="none" stroke="#228B22" stroke-width="2.5" stroke-linecap="round" stroke-linejoin="round"/>
+@dataclass
+class ChristmasTree:
+    """The tree as a Drawing: one layer per component, in SVG pixels."""
 
-  <!-- Trunk -->
-  <path d="{trunk_path}" fill="none" stroke="#8B4513" stroke-width="2"/>
-</svg>"""
+    width: float = WIDTH
+    height: float = HEIGHT
+    units: str = "px"
 
-    # Write to file
-    with open(filename, "w") as f:
-        f.write(svg_content)
+    # Sine sampling, see generate_christmas_tree_paths
+    tolerance: float | None = CHORD_TOLERANCE
+    simplify_tolerance: float | None = None
 
+    # Write the sine to SVG as cubic Beziers within this tolerance (see fit_tree_beziers)
+    bezier_tolerance: float | None = None
+
+    def layers(self) -> list[Layer]:
+        paths = generate_christmas_tree_paths(
+            self.width, self.height, self.tolerance, self.simplify_tolerance
+        )
+        layers = [
+            Layer(name, [np.asarray(paths[name], dtype=np.float64)], dict(style))
+            for name, style in COMPONENT_STYLES.items()
+        ]
+        if self.bezier_tolerance is not None:
+            tree = next(layer for layer in layers if layer.name == "tree")
+            tree.curves = [fit_tree_beziers(self.width, self.bezier_tolerance)]
+        return layers
+
+
+def generate_christmas_tree_svg(
+    filename="./output/christmas_tree.svg",
+    precision=2,
+    tolerance: float | None = CHORD_TOLERANCE,
+    simplify_tolerance: float | None = None,
+    bezier_tolerance: float | None = None,
+):
+    tree = ChristmasTree(
+        tolerance=tolerance,
+        simplify_tolerance=simplify_tolerance,
+        bezier_tolerance=bezier_tolerance,
+    )
+    write_svg(tree, filename, precision=precision, background="white")
     print(f"Christmas tree SVG saved to {filename}")
     return filename
 
 
+def report_vertex_counts(
+    tolerance: float | None = CHORD_TOLERANCE, simplify_tolerance: float | None = None
+) -> str:
+    """Vertex counts of the tree's sine wave: fixed resolution, sampled, simplified."""
+    fixed = NUM_WAVES * POINTS_PER_WAVE + 1
+    counts = [f"{fixed} at fixed resolution"]
+    if tolerance is not None:
+        sampled = sample_tree_curve(WIDTH, tolerance)
+        counts.append(f"{len(sampled)} adaptive ({tolerance:g}px chord tolerance)")
+    else:
+        sampled = sample_tree_curve(WIDTH, None)
+    if simplify_tolerance is not None:
+        simplified = simplify_polyline(sampled, simplify_tolerance)
+        counts.append(f"{len(simplified)} simplified ({simplify_tolerance:g}px)")
+    return "Tree vertices: " + " -> ".join(counts)
+
+
+def report_path_data(
+    tolerance: float | None = CHORD_TOLERANCE,
+    bezier_tolerance: float = BEZIER_TOLERANCE,
+    precision: int = 2,
+) -> str:
+    """Size of the sine's SVG path data as a polyline and as cubic Beziers."""
+    svg = SVGStreamWriter(io.StringIO(), WIDTH, HEIGHT, precision=precision)
+    polyline = svg.polyline_d(sample_tree_curve(WIDTH, tolerance))
+    cubics = fit_tree_beziers(WIDTH, bezier_tolerance)
+    cubic = svg.cubic_d(cubics)
+    return (
+        f"Tree path data: {len(polyline)} chars as a polyline -> {len(cubic)} chars "
+        f"as {(len(cubics) - 1) // 3} cubic Beziers ({bezier_tolerance:g}px tolerance)"
+    )
+
+
 def generate_star(cx, cy, outer_radius, inner_radius, num_points):
     """Generate points for a star shape."""
     points = []
@@ -105,5 +304,49 @@ def generate_star(cx, cy, outer_radius, inner_radius, num_points):
     return points
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Sine-wave Christmas tree SVG")
+    parser.add_argument(
+        "output", nargs="?", default="./output/christmas_tree.svg", help="Output filename"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=CHORD_TOLERANCE,
+        help=f"Chord error of the adaptive sine sampling, px (default: {CHORD_TOLERANCE})",
+    )
+    parser.add_argument(
+        "--fixed",
+        action="store_true",
+        help=f"Sample the sine at a fixed {POINTS_PER_WAVE} points per wave instead",
+    )
+    parser.add_argument(
+        "--simplify",
+        type=float,
+        default=None,
+        help="Douglas-Peucker tolerance applied after sampling, px (default: off)",
+    )
+    parser.add_argument(
+        "--bezier",
+        type=float,
+        nargs="?",
+        const=BEZIER_TOLERANCE,
+        default=None,
+        metavar="TOLERANCE",
+        help=f"Write the sine as cubic Bezier curves within TOLERANCE px "
+        f"(default when given: {BEZIER_TOLERANCE}); plotting still uses the polyline",
+    )
+    parser.add_argument(
+        "--precision", type=int, default=2, help="Decimals in the SVG path data (default: 2)"
+    )
+    args = parser.parse_args()
+
+    tolerance = None if args.fixed else args.tolerance
+    print(report_vertex_counts(tolerance, args.simplify))
+    if args.bezier is not None:
+        print(report_path_data(tolerance, args.bezier, args.precision))
+    generate_christmas_tree_svg(args.output, args.precision, tolerance, args.simplify, args.bezier)
+
+
 if __name__ == "__main__":
-    generate_christmas_tree_svg()
+    main()
@@ -0,0 +1,113 @@
+"""
+vpype integration for drawing generators.
+
+Builds a vpype Document straight from a Drawing's layer arrays (see drawing.py),
+runs vpype commands on it in process, and reads the result back as a Drawing,
+so linemerge, linesort, linesimplify and reloop can be applied with no SVG
+written and parsed in between:
+
+    drawing = process(create_drawing("sol11"), "linemerge linesort")
+    write_svg(drawing, "sol11.svg")
+
+vpype and vpype_cli are imported on first use; the other modes do not need them.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from drawing import MM_PER_UNIT, Drawing, Layer
+from paths import MIN_GAP_INCHES
+
+# vpype works in CSS pixels
+PX_PER_MM = 96 / 25.4
+
+# Join ends closer than the NextDraw min_gap, order the paths, let closed paths
+# start anywhere, then drop vertices that move the line by less than 0.01 mm
+DEFAULT_PIPELINE = (
+    f"linemerge --tolerance {MIN_GAP_INCHES * 25.4:.4f}mm "
+    "linesort reloop linesimplify --tolerance 0.01mm"
+)
+
+
+@dataclass
+class VpypeDrawing:
+    """The layers of a vpype Document as a Drawing, in mm."""
+
+    width: float
+    height: float
+    layer_list: list[Layer] = field(default_factory=list)
+    units: str = "mm"
+
+    def layers(self) -> list[Layer]:
+        return self.layer_list
+
+
+def _complex_lines(layer: Layer, scale: float):
+    """A layer's paths as vpype lines: complex arrays of x + 1j * y, multiplied by scale."""
+    if layer.segments is not None:
+        points = np.asarray(layer.paths) * scale
+        return points[..., 0] + 1j * points[..., 1]
+    lines = []
+    for path in layer.paths:
+        path = np.asarray(path, dtype=np.float64).reshape(-1, 2) * scale
+        lines.append(path[:, 0] + 1j * path[:, 1])
+    return lines
+
+
+def _pen_width_px(value, scale: float) -> float:
+    """SVG stroke width in px; bare numbers are in drawing units."""
+    import vpype as vp
+
+    try:
+        return float(value) * scale
+    except ValueError:
+        return vp.convert_length(value)
+
+
+def to_document(drawing: Drawing):
+    """Build a vpype Document holding one vpype layer per drawing layer."""
+    import vpype as vp
+
+    scale = MM_PER_UNIT[drawing.units] * PX_PER_MM
+    document = vp.Document(page_size=(drawing.width * scale, drawing.height * scale))
+    for layer_id, layer in enumerate(drawing.layers(), start=1):
+        lines = vp.LineCollection(_complex_lines(layer, scale))
+        lines.set_property(vp.METADATA_FIELD_NAME, layer.name)
+        if (color := layer.style.get("stroke")) is not None:
+            lines.set_property(vp.METADATA_FIELD_COLOR, vp.Color(color))
+        if (width := layer.style.get("stroke_width")) is not None:
+            lines.set_property(vp.METADATA_FIELD_PEN_WIDTH, _pen_width_px(width, scale))
+        document.add(lines, layer_id, with_metadata=True)
+    return document
+
+
+def from_document(document) -> VpypeDrawing:
+    """Read a vpype Document back as a Drawing in mm; layer names and pens are kept."""
+    import vpype as vp
+
+    scale = 1 / PX_PER_MM
+    if document.page_size is not None:
+        width, height = document.page_size
+    else:
+        bounds = document.bounds() or (0, 0, 0, 0)
+        width, height = bounds[2], bounds[3]
+
+    layers = []
+    for layer_id, lines in sorted(document.layers.items()):
+        style = {"fill": "none"}
+        if (color := lines.property(vp.METADATA_FIELD_COLOR)) is not None:
+            style["stroke"] = color.as_hex()
+        if (pen_width := lines.property(vp.METADATA_FIELD_PEN_WIDTH)) is not None:
+            style["stroke_width"] = f"{pen_width * scale:g}"
+        paths = [np.column_stack([line.real, line.imag]) * scale for line in lines]
+        name = lines.property(vp.METADATA_FIELD_NAME) or f"layer{layer_id}"
+        layers.append(Layer(name, paths, style))
+    return VpypeDrawing(width * scale, height * scale, layers)
+
+
+def process(drawing: Drawing, pipeline: str = DEFAULT_PIPELINE) -> VpypeDrawing:
+    """Run a vpype command pipeline on a drawing, in process, and return the result."""
+    from vpype_cli import execute
+
+    return from_document(execute(pipeline, to_document(drawing)))
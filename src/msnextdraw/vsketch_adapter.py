@@ -0,0 +1,42 @@
+"""
+Helpers shared by the vsketch sketches (sketch_sol11.py and sketch_tree.py).
+
+Run a sketch in the live viewer, or save a parameter sweep, with the vsk tool:
+
+    vsk run src/msnextdraw/sketch_sol11.py
+    vsk save src/msnextdraw/sketch_sol11.py --param frame 0..60
+
+vsk re-runs a sketch file on every parameter change and reload, but modules it
+imports stay loaded, so the geometry cache lives here: a drawing's vpype
+Document is kept per set of geometry parameters, and changing only the page
+layout (page size, orientation) reuses it instead of regenerating it.
+"""
+
+from collections.abc import Callable, Hashable
+
+from cache import LRUCache
+from drawing import Drawing
+from vpype_adapter import to_document
+
+# Documents kept across sketch re-runs, keyed by sketch name and geometry parameters
+GEOMETRY_CACHE = LRUCache(maxsize=64)
+
+
+def cached_document(key: Hashable, build: Callable[[], Drawing]):
+    """vpype Document of build(), reused while key (the geometry parameters) is unchanged."""
+    return GEOMETRY_CACHE.get_or_compute(key, lambda: to_document(build()))
+
+
+def draw_document(vsk, document):
+    """
+    Add a cached Document's layers, with their names, colors and pen widths, to a sketch.
+
+    The lines are copied: vsketch translates its own document in place when
+    centering it on the page.
+    """
+    import vpype as vp
+
+    for layer_id, lines in document.layers.items():
+        vsk.document.add(lines.clone(lines), layer_id, with_metadata=True)
+        if (pen_width := lines.property(vp.METADATA_FIELD_PEN_WIDTH)) is not None:
+            vsk.penWidth(pen_width, layer_id)